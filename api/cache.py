@@ -0,0 +1,164 @@
+"""
+Response Cache
+TTL + write-invalidated cache for read-heavy dashboard endpoints, with
+single-flight computation and ETags for conditional requests
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+class CachedResponse:
+    """Serialized payload shared by every request that hits the same entry"""
+
+    __slots__ = ("body", "etag", "expires_at", "tags")
+
+    def __init__(self, body: bytes, expires_at: float, tags: Set[str]):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.expires_at = expires_at
+        self.tags = tags
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header already names this payload"""
+        if not if_none_match:
+            return False
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in candidates or self.etag in candidates or f"W/{self.etag}" in candidates
+
+
+class ResponseCache:
+    """
+    Cache of endpoint payloads keyed by (endpoint, parameters).
+
+    Entries expire after their TTL or when one of their tags (the tables
+    they read) is invalidated by a write. Concurrent misses on the same key
+    wait for a single computation instead of each querying the database.
+    Used from the event loop only.
+    """
+
+    def __init__(self, max_entries: int = 256, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[Hashable, Tuple[asyncio.Future, Tuple[int, ...]]] = {}
+        # Bumped per table on invalidation; results computed across one are not stored
+        self._generations: Dict[str, int] = {}
+        self._generation = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.invalidations = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             ttl_seconds: float, tags: Iterable[str] = ()) -> CachedResponse:
+        """
+        Return the cached payload for key, computing it at most once at a time
+
+        Args:
+            key: Endpoint name plus parameters
+            compute: Coroutine function producing the JSON-serializable payload
+            ttl_seconds: Time to live of the computed entry
+            tags: Tables the payload depends on
+
+        Returns:
+            Cached response (body and ETag)
+        """
+        tags = set(tags)
+        if not self.enabled:
+            return CachedResponse(self._serialize(await compute()), 0.0, tags)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        shared = False
+        while True:
+            inflight = self._inflight.get(key)
+            # A computation started before an invalidation would hand out stale data
+            if inflight is None or inflight[1] != self._snapshot(tags):
+                break
+            if not shared:
+                shared = True
+                self.shared += 1
+            try:
+                # Shielded so one waiter disconnecting does not cancel the others
+                return await asyncio.shield(inflight[0])
+            except asyncio.CancelledError:
+                if not inflight[0].cancelled():
+                    raise
+                # The leader's request was cancelled: a waiter takes over
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        generations = self._snapshot(tags)
+        self._inflight[key] = (future, generations)
+        try:
+            entry = CachedResponse(self._serialize(await compute()), time.monotonic() + ttl_seconds, tags)
+        except asyncio.CancelledError:
+            self._release(key, future)
+            future.cancel()
+            raise
+        except BaseException as exc:
+            self._release(key, future)
+            future.set_exception(exc)
+            # Retrieve it so an error nobody else waited for is not logged as unhandled
+            future.exception()
+            raise
+
+        self._release(key, future)
+        if generations == self._snapshot(tags):
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(entry)
+        return entry
+
+    def invalidate(self, *tags: str):
+        """
+        Drop entries depending on any of the given tables (all entries if none given)
+
+        Args:
+            tags: Tables that were written
+        """
+        self.invalidations += 1
+        if not tags:
+            self._generation += 1
+            self._entries.clear()
+            return
+        changed = set(tags)
+        for tag in changed:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        for key in [key for key, entry in self._entries.items() if entry.tags & changed]:
+            del self._entries[key]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "invalidations": self.invalidations,
+        }
+
+    def _release(self, key: Hashable, future: asyncio.Future):
+        # A newer computation may have replaced this one after an invalidation
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is future:
+            del self._inflight[key]
+
+    def _snapshot(self, tags: Set[str]) -> Tuple[int, ...]:
+        return (self._generation,) + tuple(self._generations.get(tag, 0) for tag in sorted(tags))
+
+    @staticmethod
+    def _serialize(payload: Any) -> bytes:
+        return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,150 @@
+"""
+Async Database Access
+Runs blocking sqlite3 work off the event loop: a pool of reader threads with
+one connection each, a single writer thread, and per-endpoint-class limits
+"""
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncDatabase:
+    """
+    SQLite access for async handlers.
+
+    Query functions receive a connection (or None when the database cannot
+    be opened, so they can serve fallback data) and run on a dedicated
+    thread pool instead of the server's shared one. Each endpoint class has
+    its own concurrency limit, so a burst of heavy aggregations cannot take
+    every reader away from light queries.
+    """
+
+    def __init__(self, db_path: str, readers: int = 4,
+                 limits: Optional[Dict[str, int]] = None,
+                 prepare: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 timeout: float = 5.0):
+        """
+        Initialize database access
+
+        Args:
+            db_path: Path to SQLite database file
+            readers: Number of reader threads (one connection each)
+            limits: Maximum concurrent queries per endpoint class
+            prepare: Schema/seed setup run once on the first connection
+            timeout: Seconds to wait for a locked database
+        """
+        self.db_path = db_path
+        self.readers = readers
+        self.limits = dict(limits or {})
+        self.prepare = prepare
+        self.timeout = timeout
+
+        self._reader_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-read")
+        self._writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._prepared = False
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def read(self, fn: Callable[..., T], *args: Any, endpoint_class: str = "light") -> T:
+        """
+        Run a read-only query function on a reader thread
+
+        Args:
+            fn: Function called as fn(conn, *args)
+            args: Extra arguments for fn
+            endpoint_class: Concurrency class the query counts against
+
+        Returns:
+            Result of fn
+        """
+        async with self._semaphore(endpoint_class):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._reader_pool, self._call, fn, args, False)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a write function on the single writer thread, committing on success
+
+        Args:
+            fn: Function called as fn(conn, *args)
+            args: Extra arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer_pool, self._call, fn, args, True)
+
+    def close(self):
+        """Stop the worker threads and close every connection"""
+        self._reader_pool.shutdown(wait=True)
+        self._writer_pool.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "readers": self.readers,
+            "connections": len(self._connections),
+            "limits": {name: self._limit(name) for name in set(self.limits) | set(self._semaphores)},
+        }
+
+    def _semaphore(self, endpoint_class: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint_class)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._limit(endpoint_class))
+            self._semaphores[endpoint_class] = semaphore
+        return semaphore
+
+    def _limit(self, endpoint_class: str) -> int:
+        return max(1, self.limits.get(endpoint_class, self.readers))
+
+    def _call(self, fn: Callable[..., T], args: Tuple[Any, ...], commit: bool) -> T:
+        conn = self._connection()
+        if conn is None:
+            return fn(None, *args)
+        try:
+            result = fn(conn, *args)
+        except BaseException:
+            if commit:
+                conn.rollback()
+            raise
+        if commit:
+            conn.commit()
+        return result
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection, opened (and the schema prepared) on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # WAL lets readers run while the writer (or the detector) writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            with self._lock:
+                if not self._prepared and self.prepare is not None:
+                    self.prepare(conn)
+                    conn.commit()
+                self._prepared = True
+                self._connections.append(conn)
+        except Exception:
+            if conn is not None:
+                conn.close()
+            return None
+
+        self._local.conn = conn
+        return conn
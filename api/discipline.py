@@ -0,0 +1,250 @@
+"""
+Worker Discipline Aggregates
+Per-worker daily summary tables kept up to date by SQLite triggers, and the
+leaderboard query built on them
+"""
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+TOP_VIOLATIONS = 3
+
+# Same fallbacks the leaderboard always used for missing values
+WORKER_EXPR = "COALESCE(NULLIF({prefix}worker_id, ''), 'Unknown')"
+TYPE_EXPR = "COALESCE(NULLIF({prefix}violation_type, ''), 'unknown_violation')"
+
+
+def ensure_worker_summary(conn: sqlite3.Connection):
+    """
+    Create the daily summary tables and their triggers, backfilling from
+    existing rows the first time. Needs the worker_id columns on
+    detections/violations (see ensure_alert_tables).
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'worker_daily_stats'"
+    ).fetchone()
+
+    conn.commit()
+    # Triggers and backfill in one transaction so concurrent inserts are counted exactly once
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_violations_worker_timestamp ON violations(worker_id, timestamp)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_detections_worker_timestamp ON detections(worker_id, timestamp)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS worker_daily_stats (
+                worker_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                detections INTEGER NOT NULL DEFAULT 0,
+                violation_events INTEGER NOT NULL DEFAULT 0,
+                violations INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (worker_id, day)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS worker_daily_violation_types (
+                worker_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                violation_type TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (worker_id, day, violation_type)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_worker_daily_stats_day ON worker_daily_stats(day)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_worker_daily_types_day ON worker_daily_violation_types(day)"
+        )
+
+        worker = WORKER_EXPR.format(prefix="NEW.")
+        violation_type = TYPE_EXPR.format(prefix="NEW.")
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_worker_summary_detection
+            AFTER INSERT ON detections
+            BEGIN
+                INSERT INTO worker_daily_stats (worker_id, day, detections, violation_events)
+                VALUES ({worker}, date(NEW.timestamp), 1, COALESCE(NEW.violations, 0))
+                ON CONFLICT(worker_id, day) DO UPDATE SET
+                    detections = detections + 1,
+                    violation_events = violation_events + excluded.violation_events;
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_worker_summary_violation
+            AFTER INSERT ON violations
+            BEGIN
+                INSERT INTO worker_daily_stats (worker_id, day, violations)
+                VALUES ({worker}, date(NEW.timestamp), 1)
+                ON CONFLICT(worker_id, day) DO UPDATE SET violations = violations + 1;
+                INSERT INTO worker_daily_violation_types (worker_id, day, violation_type, count)
+                VALUES ({worker}, date(NEW.timestamp), {violation_type}, 1)
+                ON CONFLICT(worker_id, day, violation_type) DO UPDATE SET count = count + 1;
+            END
+            """
+        )
+
+        # Deletes (retention cleanup) take their rows back out of the summaries
+        old_worker = WORKER_EXPR.format(prefix="OLD.")
+        old_type = TYPE_EXPR.format(prefix="OLD.")
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_worker_summary_detection_delete
+            AFTER DELETE ON detections
+            BEGIN
+                UPDATE worker_daily_stats SET
+                    detections = detections - 1,
+                    violation_events = violation_events - COALESCE(OLD.violations, 0)
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp);
+                DELETE FROM worker_daily_stats
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp)
+                    AND detections <= 0 AND violation_events <= 0 AND violations <= 0;
+            END
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_worker_summary_violation_delete
+            AFTER DELETE ON violations
+            BEGIN
+                UPDATE worker_daily_stats SET violations = violations - 1
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp);
+                DELETE FROM worker_daily_stats
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp)
+                    AND detections <= 0 AND violation_events <= 0 AND violations <= 0;
+                UPDATE worker_daily_violation_types SET count = count - 1
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp)
+                    AND violation_type = {old_type};
+                DELETE FROM worker_daily_violation_types
+                WHERE worker_id = {old_worker} AND day = date(OLD.timestamp)
+                    AND violation_type = {old_type} AND count <= 0;
+            END
+            """
+        )
+
+        if not exists:
+            _backfill(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _backfill(conn: sqlite3.Connection):
+    worker = WORKER_EXPR.format(prefix="")
+    violation_type = TYPE_EXPR.format(prefix="")
+    conn.execute(
+        f"""
+        INSERT INTO worker_daily_stats (worker_id, day, detections, violation_events)
+        SELECT {worker}, date(timestamp), COUNT(*), COALESCE(SUM(violations), 0)
+        FROM detections
+        WHERE timestamp IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO worker_daily_stats (worker_id, day, violations)
+        SELECT {worker}, date(timestamp), COUNT(*)
+        FROM violations
+        WHERE timestamp IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT(worker_id, day) DO UPDATE SET violations = excluded.violations
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO worker_daily_violation_types (worker_id, day, violation_type, count)
+        SELECT {worker}, date(timestamp), {violation_type}, COUNT(*)
+        FROM violations
+        WHERE timestamp IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def query_leaderboard(conn: sqlite3.Connection, days: int = 7) -> Dict[str, Any]:
+    """
+    Discipline leaderboard over the last N days from the daily summaries
+
+    The summaries are per calendar day, so the window covers whole days:
+    today plus the N previous days from midnight, not N x 24 hours back
+    from now.
+
+    Args:
+        conn: Database connection
+        days: Lookback window in days
+
+    Returns:
+        Leaderboard payload for /api/discipline
+    """
+    since = (datetime.now() - timedelta(days=days)).date().isoformat()
+
+    rows = conn.execute(
+        """
+        SELECT worker_id, detections, violations,
+               MAX(0.0, 100 - (violations * 100.0 / detections)) AS compliance
+        FROM (
+            SELECT worker_id,
+                   SUM(detections) AS detections,
+                   SUM(violations) + SUM(violation_events) AS violations
+            FROM worker_daily_stats
+            WHERE day >= ?
+            GROUP BY worker_id
+        )
+        WHERE detections > 0
+        ORDER BY compliance DESC, worker_id
+        """,
+        (since,),
+    ).fetchall()
+
+    top_rows = conn.execute(
+        """
+        SELECT worker_id, violation_type
+        FROM (
+            SELECT worker_id, violation_type,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY worker_id ORDER BY SUM(count) DESC, violation_type
+                   ) AS rank
+            FROM worker_daily_violation_types
+            WHERE day >= ?
+            GROUP BY worker_id, violation_type
+        )
+        WHERE rank <= ?
+        ORDER BY worker_id, rank
+        """,
+        (since, TOP_VIOLATIONS),
+    ).fetchall()
+
+    top_by_worker: Dict[str, List[str]] = {}
+    for worker_id, violation_type in top_rows:
+        top_by_worker.setdefault(worker_id, []).append(violation_type)
+
+    leaderboard = []
+    total_compliance = 0.0
+    for worker_id, detections, violations, compliance in rows:
+        total_compliance += compliance
+        leaderboard.append({
+            "worker": worker_id,
+            "detections": detections,
+            "violations": violations,
+            "complianceRate": round(compliance, 2),
+            "topViolations": top_by_worker.get(worker_id, []),
+        })
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "summary": {
+            "total_workers": len(leaderboard),
+            "average_compliance": round(total_compliance / max(len(leaderboard), 1), 2),
+        },
+        "leaderboard": leaderboard,
+    }
@@ -0,0 +1,104 @@
+"""
+Detector Event Server
+Consumes events published by the detector (src/event_bus.py) over a local
+socket and pushes them to dashboard clients through the WebSocket manager
+"""
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from api.websocket import ConnectionManager
+
+MAX_EVENT_BYTES = 1024 * 1024
+
+
+class EventBusServer:
+    """Local event bus endpoint (Unix socket, or TCP where unavailable)"""
+
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.events_received = 0
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Register a callback run with (event_type, data) for every event"""
+        self._listeners.append(callback)
+
+    async def start(self, socket_path: Optional[str], host: str, port: int):
+        if self._server is not None:
+            return
+        if socket_path and sys.platform != "win32":
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+            self._server = await asyncio.start_unix_server(
+                self._handle_publisher, path=socket_path, limit=MAX_EVENT_BYTES
+            )
+            print(f"📡 Event bus listening on {socket_path}")
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_publisher, host, port, limit=MAX_EVENT_BYTES
+            )
+            print(f"📡 Event bus listening on {host}:{port}")
+
+    async def stop(self):
+        for task in list(self._handlers):
+            task.cancel()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def dispatch(self, event: Dict[str, Any]):
+        """Route one detector event to WebSocket clients"""
+        event_type = event.get("type")
+        data = event.get("data") or {}
+        self.events_received += 1
+
+        for callback in self._listeners:
+            try:
+                callback(event_type, data)
+            except Exception as e:
+                print(f"Event listener error ({event_type}): {e}")
+
+        if event_type == "violation":
+            await self.manager.send_violation_alert(data)
+        elif event_type == "stats":
+            await self.manager.send_stats_update(data)
+        elif event_type == "camera_status":
+            await self.manager.send_camera_status(data.get("camera_id", ""), data.get("status", "unknown"))
+        elif event_type == "detection":
+            await self.manager.broadcast({
+                "type": "detection",
+                "data": data,
+                "timestamp": event.get("timestamp"),
+            }, topic={"camera": data.get("camera_id")})
+
+    async def _handle_publisher(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                try:
+                    await self.dispatch(event)
+                except Exception as e:
+                    print(f"Event dispatch error: {e}")
+        except (asyncio.CancelledError, ConnectionError, ValueError):
+            # ValueError: line longer than MAX_EVENT_BYTES
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
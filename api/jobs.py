@@ -0,0 +1,180 @@
+"""
+Report Job Runner
+Runs report generation on a bounded worker pool instead of the event loop,
+with job IDs, progress reporting and result reuse per (type, period)
+"""
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Finished jobs remembered for status queries
+MAX_JOBS = 200
+
+ProgressCallback = Callable[[int, str], None]
+ReportFunction = Callable[..., Dict[str, Any]]
+PeriodKey = Tuple[str, date, date]
+
+
+class ReportJob:
+    """State of one report generation job"""
+
+    def __init__(self, key: PeriodKey):
+        self.id = uuid.uuid4().hex
+        self.report_type, self.start, self.end = key
+        self.key = key
+        self.status = "queued"
+        self.progress = 0
+        self.stage = "queued"
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Monotonic completion time, for result expiry
+        self.completed: Optional[float] = None
+
+    def set_progress(self, progress: int, stage: str):
+        self.progress = max(self.progress, min(progress, 100))
+        self.stage = stage
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "report_type": self.report_type,
+            "period": {"start": self.start.isoformat(), "end": self.end.isoformat()},
+            "status": self.status,
+            "progress": self.progress,
+            "stage": self.stage,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ReportJobRunner:
+    """
+    Report jobs on a thread pool with a fixed number of workers.
+
+    Submitting a report whose (type, period) is already queued or running
+    returns that job; a finished report is reused until it expires (reports
+    for periods that are over never change and are kept until evicted).
+    Thread-safe; submit() never blocks on report work.
+    """
+
+    def __init__(self, report_fn: ReportFunction, max_workers: int = 2, result_ttl: float = 600.0):
+        """
+        Initialize job runner
+
+        Args:
+            report_fn: Called as report_fn(report_type, start, end, progress=callback)
+            max_workers: Maximum reports generated at the same time
+            result_ttl: Seconds a finished report covering today is reused
+        """
+        self.report_fn = report_fn
+        self.max_workers = max(1, max_workers)
+        self.result_ttl = result_ttl
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._by_key: Dict[PeriodKey, ReportJob] = {}
+
+        # Statistics
+        self.submitted = 0
+        self.reused = 0
+        self.failed = 0
+
+    def submit(self, report_type: str, start: date, end: date) -> Tuple[ReportJob, bool]:
+        """
+        Queue a report, or return the matching queued/running/finished job
+
+        Args:
+            report_type: Report type
+            start: First day of the report period
+            end: Last day of the report period
+
+        Returns:
+            (job, whether an existing job was reused)
+        """
+        key = (report_type, start, end)
+        with self._lock:
+            existing = self._by_key.get(key)
+            if existing is not None and self._reusable(existing):
+                self.reused += 1
+                return existing, True
+
+            job = ReportJob(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self.submitted += 1
+            self._evict()
+        self._pool.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 50) -> List[ReportJob]:
+        """Most recent jobs first"""
+        with self._lock:
+            return list(itertools.islice(reversed(self._jobs.values()), limit))
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "jobs": statuses,
+            "submitted": self.submitted,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
+
+    def _run(self, job: ReportJob):
+        job.status = "running"
+        job.started_at = datetime.now()
+        job.set_progress(5, "starting")
+        try:
+            job.result = self.report_fn(job.report_type, job.start, job.end, progress=job.set_progress)
+            job.set_progress(100, "done")
+            job.status = "success"
+        except Exception as exc:
+            job.error = str(exc)
+            job.stage = "failed"
+            job.status = "failed"
+            self.failed += 1
+            print(f"❌ Report job {job.id} failed: {exc}")
+        finally:
+            job.finished_at = datetime.now()
+            job.completed = time.monotonic()
+
+    def _reusable(self, job: ReportJob) -> bool:
+        if job.status in {"queued", "running"}:
+            return True
+        if job.status != "success":
+            return False
+        # A period that is over cannot change any more
+        if job.end < job.finished_at.date():
+            return True
+        return time.monotonic() - job.completed < self.result_ttl
+
+    def _evict(self):
+        while len(self._jobs) > MAX_JOBS:
+            job_id, job = next(iter(self._jobs.items()))
+            if job.status in {"queued", "running"}:
+                break
+            del self._jobs[job_id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
@@ -0,0 +1,215 @@
+"""
+Pulse KPI Service
+Keeps the /api/pulse indicators up to date as violations and resolve actions
+are written, with a SQL recomputation used only to reconcile the state
+"""
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from api.taxonomy import SEVERITY_HIGH, taxonomy
+
+Timestamp = Union[str, datetime, None]
+
+
+def is_critical(violation_type: Optional[str]) -> bool:
+    """Critical (LTI proxy) violations: high-severity types"""
+    return taxonomy.severity(violation_type) >= SEVERITY_HIGH
+
+
+def _parse_timestamp(value: Timestamp) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class PulseKPIs:
+    """
+    Incrementally maintained pulse indicators.
+
+    Tracks violations per day, response-time sums per violation day, the
+    last critical violation and the number of unresolved critical ones, so a
+    pulse request reads a few dictionary entries instead of scanning the
+    violations table. Writes that bypass record_* (or race with a
+    reconciliation) are corrected by the next reconcile(). Thread-safe.
+    """
+
+    def __init__(self, history_days: int = 90):
+        """
+        Initialize KPI state
+
+        Args:
+            history_days: Number of days of per-day counters kept
+        """
+        self.history_days = history_days
+        self._lock = threading.Lock()
+        self._daily: Dict[date, int] = {}
+        # violation day -> [sum of response seconds, resolved violations]
+        self._response: Dict[date, List[float]] = {}
+        self._last_critical: Optional[datetime] = None
+        self._unresolved_critical = 0
+
+        # Statistics
+        self.reconciled_at: Optional[datetime] = None
+        self.reconciliations = 0
+        self.updates = 0
+
+    def record_violation(self, timestamp: Timestamp, violation_type: Optional[str]):
+        """
+        Count a newly written (unresolved) violation
+
+        Args:
+            timestamp: Violation timestamp (now if missing)
+            violation_type: Violation type
+        """
+        occurred = _parse_timestamp(timestamp) or datetime.now()
+        with self._lock:
+            self.updates += 1
+            day = occurred.date()
+            self._daily[day] = self._daily.get(day, 0) + 1
+            if is_critical(violation_type):
+                self._unresolved_critical += 1
+                if self._last_critical is None or occurred > self._last_critical:
+                    self._last_critical = occurred
+            self._prune()
+
+    def record_resolution(self, violation_timestamp: Timestamp, violation_type: Optional[str],
+                          resolved_at: Timestamp, first_resolve: bool, was_unresolved: bool):
+        """
+        Account for a resolve action written for a violation
+
+        Args:
+            violation_timestamp: Timestamp of the resolved violation
+            violation_type: Violation type
+            resolved_at: Creation time of the resolve action (same clock as the violation)
+            first_resolve: Whether this is the first resolve action of the violation
+            was_unresolved: Whether the violation was unresolved before this action
+        """
+        occurred = _parse_timestamp(violation_timestamp)
+        resolved = _parse_timestamp(resolved_at)
+        with self._lock:
+            self.updates += 1
+            if was_unresolved and is_critical(violation_type):
+                self._unresolved_critical = max(0, self._unresolved_critical - 1)
+            if not first_resolve or occurred is None or resolved is None:
+                return
+            seconds = (resolved - occurred).total_seconds()
+            if seconds < 0:
+                return
+            entry = self._response.setdefault(occurred.date(), [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def snapshot(self, days: int = 7, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        KPI values for a lookback of N days (including today)
+
+        Args:
+            days: Lookback window in days
+            now: Reference time (defaults to now)
+
+        Returns:
+            total_today, avg_per_day, avg_response_time_sec, lti_free_days, unresolved_high
+        """
+        now = now or datetime.now()
+        today = now.date()
+        window_start = today - timedelta(days=max(days, 1) - 1)
+        with self._lock:
+            total_today = self._daily.get(today, 0)
+            in_window = sum(count for day, count in self._daily.items() if day >= window_start)
+            response_sum = 0.0
+            response_count = 0
+            for day, (seconds, count) in self._response.items():
+                if day >= window_start:
+                    response_sum += seconds
+                    response_count += int(count)
+            last_critical = self._last_critical
+            unresolved_high = self._unresolved_critical
+
+        return {
+            "total_today": total_today,
+            "avg_per_day": round(in_window / float(days), 2) if days else in_window,
+            "avg_response_time_sec": int(response_sum / response_count) if response_count else 0,
+            "lti_free_days": max(0, (now - last_critical).days) if last_critical else 0,
+            "unresolved_high": unresolved_high,
+        }
+
+    def reconcile(self, conn: sqlite3.Connection):
+        """
+        Recompute the state from the database and replace it
+
+        Args:
+            conn: Database connection (violations and alert_actions tables)
+        """
+        since = (date.today() - timedelta(days=self.history_days - 1)).isoformat()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT date(timestamp) AS day, COUNT(*) AS cnt
+            FROM violations
+            WHERE timestamp >= ?
+            GROUP BY day
+            """,
+            (since,),
+        )
+        daily = {date.fromisoformat(day): count for day, count in cursor.fetchall() if day}
+
+        # First resolve action per violation, differenced in SQL
+        cursor.execute(
+            """
+            SELECT day, SUM(seconds) AS total, COUNT(*) AS cnt
+            FROM (
+                SELECT date(v.timestamp) AS day,
+                       ROUND((julianday(MIN(aa.created_at)) - julianday(v.timestamp)) * 86400.0, 3) AS seconds
+                FROM violations v
+                JOIN alert_actions aa ON aa.violation_id = v.id AND aa.action = 'resolve'
+                WHERE v.timestamp >= ?
+                GROUP BY v.id
+            )
+            WHERE seconds >= 0
+            GROUP BY day
+            """,
+            (since,),
+        )
+        response = {date.fromisoformat(day): [total, count] for day, total, count in cursor.fetchall() if day}
+
+        cursor.execute(
+            """
+            SELECT MAX(timestamp) AS last_crit,
+                   SUM(CASE WHEN status = 'unresolved' OR resolved = 0 THEN 1 ELSE 0 END) AS unresolved
+            FROM violations
+            WHERE violation_type_id IN (SELECT id FROM violation_types WHERE severity >= ?)
+            """,
+            (SEVERITY_HIGH,),
+        )
+        last_crit, unresolved = cursor.fetchone()
+
+        with self._lock:
+            self._daily = daily
+            self._response = response
+            self._last_critical = _parse_timestamp(last_crit)
+            self._unresolved_critical = int(unresolved or 0)
+            self.reconciled_at = datetime.now()
+            self.reconciliations += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "history_days": self.history_days,
+            "updates": self.updates,
+            "reconciliations": self.reconciliations,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+        }
+
+    def _prune(self):
+        cutoff = date.today() - timedelta(days=self.history_days)
+        if len(self._daily) > self.history_days + 1:
+            for day in [day for day in self._daily if day < cutoff]:
+                del self._daily[day]
+        if len(self._response) > self.history_days + 1:
+            for day in [day for day in self._response if day < cutoff]:
+                del self._response[day]
@@ -0,0 +1,294 @@
+"""
+Report Mailer
+SMTP delivery of report emails on a background thread: one connection per
+batch of recipients, per-recipient retry, message encoded once per report
+"""
+import mimetypes
+import os
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formatdate, make_msgid
+from typing import Any, Dict, Iterable, List, Optional
+
+# Deliveries remembered for status queries
+MAX_DELIVERIES = 200
+
+PLAIN_TEXT_BODY = "Laporan keselamatan SmartAPD terlampir. Buka email ini dalam format HTML untuk ringkasannya."
+
+
+class Delivery:
+    """State of one email sent to a list of recipients"""
+
+    def __init__(self, recipients: List[str], subject: str):
+        self.id = uuid.uuid4().hex
+        self.recipients = recipients
+        self.subject = subject
+        self.status = "queued"
+        self.sent: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.connections = 0
+        self.retries = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "delivery_id": self.id,
+            "status": self.status,
+            "recipients": len(self.recipients),
+            "sent": len(self.sent),
+            "failed": dict(self.failed),
+            "connections": self.connections,
+            "retries": self.retries,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class Mailer:
+    """
+    Sends report emails from a single background thread.
+
+    Recipients are split into batches that each share one SMTP connection
+    (40 supervisors are one connection, not 40). Every recipient gets an
+    individual copy; the MIME message including the attachment is encoded
+    once and only the To/Message-ID headers differ. Transient failures
+    (4xx replies, dropped connections) are retried per recipient with
+    backoff, reconnecting when needed; permanent 5xx refusals are not.
+    """
+
+    def __init__(self, host: str, port: int = 587, sender: str = "smartapd@localhost",
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, use_ssl: bool = False, timeout: float = 30.0,
+                 batch_size: int = 50, max_retries: int = 3, retry_delay: float = 2.0):
+        """
+        Initialize mailer
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            sender: Envelope and From address
+            username: Login user (no login if empty)
+            password: Login password
+            starttls: Upgrade plain connections with STARTTLS
+            use_ssl: Connect with implicit TLS (port 465)
+            timeout: Socket timeout in seconds
+            batch_size: Recipients sent over one connection
+            max_retries: Retries per recipient after a transient failure
+            retry_delay: Delay before the first retry, doubled per attempt
+        """
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._lock = threading.Lock()
+        self._deliveries: "OrderedDict[str, Delivery]" = OrderedDict()
+
+        # Statistics
+        self.deliveries = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.connections = 0
+
+    def submit(self, recipients: Iterable[str], subject: str, html_body: str,
+               attachment_path: Optional[str] = None) -> Delivery:
+        """
+        Queue an email to all recipients; returns immediately
+
+        Args:
+            recipients: Email addresses (duplicates are sent once)
+            subject: Subject line
+            html_body: HTML body
+            attachment_path: Optional file to attach (e.g. the report PDF)
+
+        Returns:
+            Delivery, updated as the background thread sends
+        """
+        unique: Dict[str, str] = {}
+        for address in recipients:
+            address = address.strip()
+            if address:
+                unique.setdefault(address.lower(), address)
+        delivery = Delivery(list(unique.values()), subject)
+        with self._lock:
+            self._deliveries[delivery.id] = delivery
+            while len(self._deliveries) > MAX_DELIVERIES:
+                self._deliveries.popitem(last=False)
+            self.deliveries += 1
+        self._pool.submit(self.deliver, delivery, html_body, attachment_path)
+        return delivery
+
+    def get(self, delivery_id: str) -> Optional[Delivery]:
+        with self._lock:
+            return self._deliveries.get(delivery_id)
+
+    def deliver(self, delivery: Delivery, html_body: str, attachment_path: Optional[str] = None) -> Delivery:
+        """Send a delivery now (blocking; normally called on the mailer thread)"""
+        delivery.status = "sending"
+        try:
+            payload = self._encode(delivery.subject, html_body, attachment_path)
+            valid = []
+            for address in delivery.recipients:
+                if "@" not in address or any(char in address for char in "\r\n<>,"):
+                    delivery.failed[address] = "Alamat email tidak valid"
+                else:
+                    valid.append(address)
+            for index in range(0, len(valid), self.batch_size):
+                self._send_batch(delivery, valid[index:index + self.batch_size], payload)
+        except Exception as exc:
+            delivery.error = str(exc)
+            for address in delivery.recipients:
+                if address not in delivery.sent:
+                    delivery.failed.setdefault(address, str(exc))
+            print(f"❌ Report email failed: {exc}")
+        finally:
+            if delivery.failed:
+                delivery.status = "partial" if delivery.sent else "failed"
+            else:
+                delivery.status = "sent"
+            delivery.finished_at = datetime.now()
+            with self._lock:
+                self.messages_sent += len(delivery.sent)
+                self.messages_failed += len(delivery.failed)
+            delivery.done.set()
+        return delivery
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "host": self.host,
+                "deliveries": self.deliveries,
+                "messages_sent": self.messages_sent,
+                "messages_failed": self.messages_failed,
+                "connections": self.connections,
+                "batch_size": self.batch_size,
+            }
+
+    def _encode(self, subject: str, html_body: str, attachment_path: Optional[str]) -> bytes:
+        """Message without To/Message-ID, encoded once; the attachment is read once"""
+        message = EmailMessage(policy=SMTP_POLICY)
+        message["From"] = self.sender
+        message["Subject"] = subject
+        message["Date"] = formatdate(localtime=True)
+        message.set_content(PLAIN_TEXT_BODY)
+        message.add_alternative(html_body, subtype="html")
+        if attachment_path:
+            with open(attachment_path, "rb") as f:
+                data = f.read()
+            content_type = mimetypes.guess_type(attachment_path)[0] or "application/octet-stream"
+            maintype, subtype = content_type.split("/", 1)
+            message.add_attachment(data, maintype=maintype, subtype=subtype,
+                                   filename=os.path.basename(attachment_path))
+        return message.as_bytes()
+
+    def _send_batch(self, delivery: Delivery, batch: List[str], payload: bytes):
+        # (address, failed attempts, not before)
+        pending = deque((address, 0, 0.0) for address in batch)
+        smtp: Optional[smtplib.SMTP] = None
+        try:
+            while pending:
+                address, attempts, not_before = pending.popleft()
+                wait = not_before - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if smtp is None:
+                    try:
+                        smtp = self._connect()
+                        delivery.connections += 1
+                    except smtplib.SMTPResponseException as exc:
+                        if not 400 <= exc.smtp_code < 500:
+                            # Rejected login or connection: every recipient would fail the same way
+                            error = f"{exc.smtp_code} {exc.smtp_error.decode(errors='replace')}"
+                            for failed, _, _ in [(address, attempts, not_before), *pending]:
+                                delivery.failed[failed] = error
+                            return
+                        error, transient = f"{exc.smtp_code} {exc.smtp_error.decode(errors='replace')}", True
+                    except smtplib.SMTPNotSupportedError as exc:
+                        # E.g. login on a server without AUTH: a configuration error
+                        for failed, _, _ in [(address, attempts, not_before), *pending]:
+                            delivery.failed[failed] = str(exc)
+                        return
+                    except (smtplib.SMTPException, OSError) as exc:
+                        error, transient = str(exc) or exc.__class__.__name__, True
+                if smtp is not None:
+                    try:
+                        headers = f"To: {address}\r\nMessage-ID: {make_msgid(domain='smartapd')}\r\n"
+                        smtp.sendmail(self.sender, [address], headers.encode("utf-8") + payload)
+                        delivery.sent.append(address)
+                        continue
+                    except smtplib.SMTPRecipientsRefused as exc:
+                        code, reply = exc.recipients.get(address, (0, b""))
+                        error = f"{code} {reply.decode(errors='replace')}"
+                        transient = 400 <= code < 500
+                    except smtplib.SMTPResponseException as exc:
+                        error = f"{exc.smtp_code} {exc.smtp_error.decode(errors='replace')}"
+                        transient = 400 <= exc.smtp_code < 500
+                        if exc.smtp_code == 421:
+                            # Server is closing the connection
+                            self._close(smtp)
+                            smtp = None
+                    except (smtplib.SMTPException, OSError) as exc:
+                        # Dropped connection or timeout: reconnect on retry
+                        error, transient = str(exc) or exc.__class__.__name__, True
+                        self._close(smtp)
+                        smtp = None
+
+                if transient and attempts < self.max_retries:
+                    delivery.retries += 1
+                    delay = self.retry_delay * (2 ** attempts)
+                    pending.append((address, attempts + 1, time.monotonic() + delay))
+                else:
+                    delivery.failed[address] = error
+        finally:
+            self._close(smtp)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls and not self.use_ssl:
+                smtp.ehlo()
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except BaseException:
+            self._close(smtp)
+            raise
+        with self._lock:
+            self.connections += 1
+        return smtp
+
+    @staticmethod
+    def _close(smtp: Optional[smtplib.SMTP]):
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
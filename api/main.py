@@ -1,18 +1,34 @@
-from fastapi import BackgroundTasks, FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response, StreamingResponse
+import asyncio
+import csv
+import io
+import json
 import os
 import sqlite3
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime
 import threading
-from collections import defaultdict, Counter
 from pydantic import BaseModel
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from api.websocket import manager
-from api.reports import ReportGenerator
+from api.mailer import Mailer
+from api.reports import REPORT_TYPES, ReportGenerator, report_period
+from api.streaming import MJPEG_BOUNDARY, hub as stream_hub
+from api.events import EventBusServer
+from api.cache import ResponseCache
+from api.db import AsyncDatabase
+from api.discipline import ensure_worker_summary, query_leaderboard
+from api.jobs import ReportJobRunner
+from api.kpi import PulseKPIs
+from api.taxonomy import SEVERITY_LEVELS, taxonomy
+from api.pagination import (
+    EXPORT_CHUNK_SIZE, InvalidCursor, clamp_page_size, decode_cursor, encode_cursor, keyset_condition
+)
 
 DB_PATH = os.getenv("DB_PATH", os.path.join("logs", "detections.db"))
 API_TITLE = "SmartAPD API"
@@ -27,6 +43,70 @@ REPORT_SCHEDULE_CRON = os.getenv("REPORT_SCHEDULE_CRON", "0 6 * * MON")  # Defau
 REPORT_RECIPIENTS = [email.strip() for email in os.getenv("REPORT_RECIPIENTS", "").split(",") if email.strip()]
 REPORT_TIMEZONE = os.getenv("REPORT_TIMEZONE", "Asia/Jakarta")
 ENABLE_REPORT_SCHEDULER = os.getenv("ENABLE_REPORT_SCHEDULER", "true").lower() in {"1", "true", "yes"}
+# Reports generated at the same time, and how long a report covering today is reused
+REPORT_MAX_CONCURRENCY = int(os.getenv("REPORT_MAX_CONCURRENCY", "2"))
+REPORT_RESULT_TTL = float(os.getenv("REPORT_RESULT_TTL", "600"))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_SENDER = os.getenv("SMTP_SENDER", SMTP_USERNAME or "smartapd@localhost")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in {"1", "true", "yes"}
+SMTP_SSL = os.getenv("SMTP_SSL", "false").lower() in {"1", "true", "yes"}
+SMTP_BATCH_SIZE = int(os.getenv("SMTP_BATCH_SIZE", "50"))
+SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", "3"))
+
+STREAM_INGEST_HOST = os.getenv("STREAM_INGEST_HOST", "127.0.0.1")
+STREAM_INGEST_PORT = int(os.getenv("STREAM_INGEST_PORT", "8765"))
+ENABLE_STREAM_INGEST = os.getenv("ENABLE_STREAM_INGEST", "true").lower() in {"1", "true", "yes"}
+
+# Detector event bus (must match event_bus in config.yaml)
+EVENT_BUS_SOCKET = os.getenv("EVENT_BUS_SOCKET", os.path.join("logs", "smartapd-events.sock"))
+EVENT_BUS_HOST = os.getenv("EVENT_BUS_HOST", "127.0.0.1")
+EVENT_BUS_PORT = int(os.getenv("EVENT_BUS_PORT", "8766"))
+ENABLE_EVENT_BUS = os.getenv("ENABLE_EVENT_BUS", "true").lower() in {"1", "true", "yes"}
+
+# Response cache for polled dashboard endpoints (seconds)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "10"))
+HR_CACHE_TTL = float(os.getenv("HR_CACHE_TTL", "300"))
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() in {"1", "true", "yes"}
+
+# Database threads and concurrent queries per endpoint class
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+DB_LIGHT_CONCURRENCY = int(os.getenv("DB_LIGHT_CONCURRENCY", str(DB_READERS)))
+DB_HEAVY_CONCURRENCY = int(os.getenv("DB_HEAVY_CONCURRENCY", "2"))
+
+# Pulse KPIs: days of per-day counters kept, and how often they are recomputed from SQL
+PULSE_HISTORY_DAYS = int(os.getenv("PULSE_HISTORY_DAYS", "90"))
+PULSE_RECONCILE_SECONDS = float(os.getenv("PULSE_RECONCILE_SECONDS", "300"))
+
+event_server = EventBusServer(manager)
+response_cache = ResponseCache(enabled=ENABLE_RESPONSE_CACHE)
+pulse_kpis = PulseKPIs(history_days=PULSE_HISTORY_DAYS)
+pulse_reconcile_task: Optional[asyncio.Task] = None
+
+# Tables written as a side effect of each detector event
+EVENT_WRITES = {
+    "violation": ("violations", "detections"),
+    "detection": ("detections",),
+    "camera_status": ("cameras",),
+}
+
+
+def _invalidate_on_event(event_type: str, data: Dict[str, Any]):
+    tables = EVENT_WRITES.get(event_type)
+    if tables:
+        response_cache.invalidate(*tables)
+
+
+def _record_event_kpis(event_type: str, data: Dict[str, Any]):
+    if event_type == "violation":
+        pulse_kpis.record_violation(data.get("timestamp"), data.get("violation") or data.get("violation_type"))
+
+
+event_server.subscribe(_record_event_kpis)
+event_server.subscribe(_invalidate_on_event)
 
 FALLBACK_RISK_MAP = {
     "generated_at": datetime.now().isoformat(),
@@ -100,18 +180,112 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
-def get_conn():
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        ensure_hr_seed(conn)
-        ensure_alert_tables(conn)
-        return conn
-    except Exception:
-        return None
+def prepare_database(conn: sqlite3.Connection):
+    ensure_hr_seed(conn)
+    ensure_alert_tables(conn)
+    taxonomy.ensure_table(conn)
+    taxonomy.load(conn)
+    ensure_worker_summary(conn)
+
+
+def ensure_alert_tables(conn: sqlite3.Connection):
+    """Create the alert workflow tables and the columns the API reads"""
+    cursor = conn.cursor()
+
+    # Core tables, in case the API starts before the detector (same schema as src/database.py)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS detections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            camera_source TEXT,
+            total_persons INTEGER,
+            compliant_persons INTEGER,
+            violations INTEGER,
+            detection_data TEXT,
+            frame_path TEXT
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS violations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            camera_source TEXT,
+            violation_type TEXT,
+            person_id INTEGER,
+            confidence REAL,
+            bbox TEXT,
+            image_path TEXT,
+            alert_sent BOOLEAN DEFAULT 0,
+            resolved BOOLEAN DEFAULT 0,
+            notes TEXT
+        )
+        """
+    )
+
+    # Columns queried by the dashboard endpoints
+    api_columns = {
+        "detections": [
+            ("worker_id", "TEXT"),
+            ("location", "TEXT"),
+            ("violation_type", "TEXT"),
+            ("violation", "INTEGER DEFAULT 0"),
+        ],
+        "violations": [
+            ("worker_id", "TEXT"),
+            ("location", "TEXT"),
+            ("status", "TEXT DEFAULT 'unresolved'"),
+        ],
+    }
+    for table, columns in api_columns.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alert_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            violation_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            notes TEXT,
+            level TEXT,
+            actor TEXT,
+            auto_generated INTEGER DEFAULT 0,
+            evidence TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (violation_id) REFERENCES violations(id)
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_alert_actions_violation ON alert_actions(violation_id, action)"
+    )
+    # Keyset pagination order
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_violations_timestamp ON violations(timestamp, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_alert_actions_created ON alert_actions(created_at, id)")
+    # Report period scans
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON detections(timestamp)")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cameras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            location TEXT,
+            status TEXT DEFAULT 'offline',
+            last_seen DATETIME
+        )
+        """
+    )
+    conn.commit()
 
 
 def ensure_hr_seed(conn: sqlite3.Connection):
@@ -265,14 +439,48 @@ def seed_checklists(cursor: sqlite3.Cursor) -> None:
     )
 
 
+db = AsyncDatabase(
+    DB_PATH,
+    readers=DB_READERS,
+    limits={"light": DB_LIGHT_CONCURRENCY, "heavy": DB_HEAVY_CONCURRENCY},
+    prepare=prepare_database,
+)
+
+
 @app.get("/api/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/api/realtime/stats")
+async def realtime_stats():
+    """WebSocket client, alert deduplication, response cache, database, KPI, report job and mailer metrics"""
+    stats = manager.get_statistics()
+    stats["response_cache"] = response_cache.get_statistics()
+    stats["database"] = db.get_statistics()
+    stats["pulse_kpis"] = pulse_kpis.get_statistics()
+    stats["report_jobs"] = report_jobs.get_statistics()
+    stats["report_mailer"] = report_mailer.get_statistics() if report_mailer else None
+    return stats
+
+
+async def cached_json(request: Request, key: tuple, compute, ttl_seconds: float, tags: tuple) -> Response:
+    """Serve a cached JSON payload, answering 304 when the client already has it"""
+    entry = await response_cache.get_or_compute(key, compute, ttl_seconds, tags)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/stats")
-def get_stats():
-    conn = get_conn()
+async def get_stats(request: Request) -> Response:
+    return await cached_json(
+        request, ("stats",), lambda: db.read(_compute_stats), RESPONSE_CACHE_TTL, ("detections",)
+    )
+
+
+def _compute_stats(conn: Optional[sqlite3.Connection]) -> Dict[str, Any]:
     if conn is None:
         # fallback demo numbers
         return {
@@ -281,204 +489,326 @@ def get_stats():
             "complianceRate": 73.3,
             "compliantWorkers": 33,
         }
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) AS c FROM detections")
-        total = cur.fetchone()[0] if cur.fetchone is not None else 0
-        cur.execute("SELECT COUNT(*) AS c FROM detections WHERE violation = 1")
-        vio = cur.fetchone()[0] if cur.fetchone is not None else 0
-        comp_rate = round(((total - vio) / total * 100.0), 1) if total > 0 else 0.0
-        # demo estimate
-        compliant_workers = max(total - vio, 0)
-        return {
-            "totalDetections": total if total else 45,
-            "violations": vio if total else 12,
-            "complianceRate": comp_rate if total else 73.3,
-            "compliantWorkers": compliant_workers if total else 33,
-        }
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) AS c FROM detections")
+    total = cur.fetchone()[0] if cur.fetchone is not None else 0
+    cur.execute("SELECT COUNT(*) AS c FROM detections WHERE violation = 1")
+    vio = cur.fetchone()[0] if cur.fetchone is not None else 0
+    comp_rate = round(((total - vio) / total * 100.0), 1) if total > 0 else 0.0
+    # demo estimate
+    compliant_workers = max(total - vio, 0)
+    return {
+        "totalDetections": total if total else 45,
+        "violations": vio if total else 12,
+        "complianceRate": comp_rate if total else 73.3,
+        "compliantWorkers": compliant_workers if total else 33,
+    }
 
 
 @app.get("/api/pulse")
-def get_pulse(days: int = 7) -> Dict[str, Any]:
+async def get_pulse(request: Request, days: int = 7) -> Response:
+    return await cached_json(
+        request, ("pulse", days), lambda: db.read(_compute_pulse, days, endpoint_class="heavy"),
+        RESPONSE_CACHE_TTL,
+        ("violations", "alert_actions", "cameras", "pulse_kpis"),
+    )
+
+
+def _compute_pulse(conn: Optional[sqlite3.Connection], days: int = 7) -> Dict[str, Any]:
     """Return HSE Pulse score and key KPIs for the Pulse page.
     Metrics:
     - pulse_score: 0-100 composite
     - total_today: violations today; avg_7d: average per day over lookback
     - avg_response_time_sec: average time from violation to first resolve action
-    - lti_free_days: days since last critical (derived from violation_type containing 'helm' as example proxy)
+    - lti_free_days: days since last critical (high-severity violation type as example proxy)
     - system_health: cameras_online/total, sensors placeholder
     - unresolved_high: count unresolved high/critical
+
+    Violation KPIs come from the incrementally maintained pulse_kpis state;
+    lookbacks longer than its history are recomputed from SQL.
     """
-    conn = get_conn()
     if conn is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
 
-    try:
-        cursor = conn.cursor()
+    kpis = pulse_kpis
+    if days > kpis.history_days:
+        kpis = PulseKPIs(history_days=days)
+        kpis.reconcile(conn)
+    elif kpis.reconciled_at is None:
+        kpis.reconcile(conn)
+
+    now = datetime.now()
+    snapshot = kpis.snapshot(days, now)
+    avg_7d = snapshot["avg_per_day"]
+    avg_response_time_sec = snapshot["avg_response_time_sec"]
+
+    # System health: cameras
+    row = conn.execute(
+        "SELECT COUNT(*) AS total, COALESCE(SUM(status = 'online'), 0) AS online FROM cameras"
+    ).fetchone()
+    total_cameras = int(row["total"])
+    online_cameras = int(row["online"])
+
+    # Composite pulse (heuristic):
+    # Base on average compliance from discipline endpoint fallback if needed
+    # compliance ~ 100 - 100*(violations/detections). Use discipline if available.
+    # Here approximate from last 7d: fewer violations -> higher score.
+    # Normalize violation rate against (avg_7d + 1) and online cameras ratio.
+    camera_ratio = (online_cameras / total_cameras) if total_cameras else 1.0
+    violation_factor = 1.0 / (1.0 + (avg_7d / 10.0))  # more avg violations -> lower factor
+    response_factor = 1.0 / (1.0 + (avg_response_time_sec / 300.0))  # 5min baseline
+    pulse_score = max(0.0, min(1.0, 0.5 * violation_factor + 0.3 * response_factor + 0.2 * camera_ratio)) * 100.0
 
-        now = datetime.now()
-        start_today = datetime(now.year, now.month, now.day)
-        lookback_start = now - timedelta(days=max(days, 1))
+    return {
+        "generated_at": now.isoformat(),
+        "pulse_score": round(pulse_score, 1),
+        "violations": {
+            "total_today": snapshot["total_today"],
+            "avg_per_day": avg_7d,
+        },
+        "avg_response_time_sec": avg_response_time_sec,
+        "lti_free_days": snapshot["lti_free_days"],
+        "system_health": {
+            "cameras_online": online_cameras,
+            "cameras_total": total_cameras,
+            "sensors": {
+                "online": 0,
+                "total": 0,
+            },
+        },
+        "unresolved_high": snapshot["unresolved_high"],
+    }
 
-        # Violations today
-        cursor.execute(
-            """
-            SELECT COUNT(*) as cnt
-            FROM violations
-            WHERE timestamp >= ?
-            """,
-            (start_today.isoformat(),),
-        )
-        row = cursor.fetchone()
-        total_today = int(row["cnt"]) if row else 0
 
-        # Violations in lookback (for average per day)
-        cursor.execute(
-            """
-            SELECT COUNT(*) as cnt
-            FROM violations
-            WHERE timestamp >= ?
-            """,
-            (lookback_start.isoformat(),),
-        )
-        row = cursor.fetchone()
-        violations_lookback = int(row["cnt"]) if row else 0
-        avg_7d = round(violations_lookback / float(days), 2) if days else violations_lookback
+async def reconcile_pulse_kpis():
+    """Periodically replace the incremental pulse KPIs with a SQL recomputation"""
+    while True:
+        try:
+            await db.read(pulse_kpis.reconcile, endpoint_class="heavy")
+            response_cache.invalidate("pulse_kpis")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"Pulse KPI reconciliation failed: {exc}")
+        await asyncio.sleep(PULSE_RECONCILE_SECONDS)
+
+
+# Raw columns included in violation exports (when present in the table)
+VIOLATION_EXPORT_COLUMNS = [
+    "id", "timestamp", "camera_source", "violation_type", "person_id", "confidence",
+    "worker_id", "location", "status", "resolved", "stage", "assigned_to", "due_at",
+    "image_path", "notes",
+]
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, int]]:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+
+def _violation_filters(conn: sqlite3.Connection, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions for the violation listing/export filters"""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if filters.get("camera"):
+        conditions.append("camera_source = ?")
+        params.append(filters["camera"])
+    if filters.get("violation_type"):
+        violation_type = taxonomy.lookup(filters["violation_type"])
+        if violation_type is not None:
+            conditions.append("violation_type_id = ?")
+            params.append(violation_type.id)
+        else:
+            conditions.append("violation_type = ?")
+            params.append(filters["violation_type"])
+    if filters.get("severity"):
+        level = SEVERITY_LEVELS.get(filters["severity"])
+        if level is None:
+            raise HTTPException(status_code=400, detail="Severity tidak valid (low, medium, high)")
+        conditions.append("violation_type_id IN (SELECT id FROM violation_types WHERE severity = ?)")
+        params.append(level)
+    if filters.get("resolved") is not None:
+        conditions.append("resolved = ?")
+        params.append(1 if filters["resolved"] else 0)
+    if filters.get("start"):
+        conditions.append("timestamp >= ?")
+        params.append(filters["start"])
+    if filters.get("end"):
+        conditions.append("timestamp < ?")
+        params.append(filters["end"])
+    if filters.get("stage"):
+        if "stage" not in _table_columns(conn, "violations"):
+            raise HTTPException(status_code=400, detail="Kolom stage belum tersedia (jalankan migrasi)")
+        conditions.append("stage = ?")
+        params.append(filters["stage"])
+    return conditions, params
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
 
-        # Average response time: first resolve action per violation
-        cursor.execute(
-            """
-            SELECT v.id as vid, v.timestamp as vts,
-                   MIN(CASE WHEN aa.action='resolve' THEN aa.created_at END) as rts
-            FROM violations v
-            LEFT JOIN alert_actions aa ON aa.violation_id = v.id
-            WHERE v.timestamp >= ?
-            GROUP BY v.id
-            """,
-            (lookback_start.isoformat(),),
-        )
-        times = []
-        for r in cursor.fetchall():
-            if r["vts"] and r["rts"]:
-                try:
-                    dt_v = datetime.fromisoformat(r["vts"])  # type: ignore
-                    dt_r = datetime.fromisoformat(r["rts"])  # type: ignore
-                    diff = (dt_r - dt_v).total_seconds()
-                    if diff >= 0:
-                        times.append(diff)
-                except Exception:
-                    continue
-        avg_response_time_sec = int(sum(times) / len(times)) if times else 0
-
-        # LTI-free days proxy: days since last critical (e.g., violation_type contains 'helm')
-        cursor.execute(
-            """
-            SELECT MAX(timestamp) as last_crit
-            FROM violations
-            WHERE LOWER(violation_type) LIKE '%helm%' OR LOWER(violation_type) LIKE '%helmet%'
-            """
-        )
-        row = cursor.fetchone()
-        lti_free_days = 0
-        if row and row["last_crit"]:
-            try:
-                last_crit = datetime.fromisoformat(row["last_crit"])  # type: ignore
-                lti_free_days = max(0, (now - last_crit).days)
-            except Exception:
-                lti_free_days = 0
-
-        # System health: cameras
-        cursor.execute("SELECT COUNT(*) as total FROM cameras")
-        total_cameras = int((cursor.fetchone() or {"total": 0})["total"])  # type: ignore
-        cursor.execute("SELECT COUNT(*) as online FROM cameras WHERE status='online'")
-        online_cameras = int((cursor.fetchone() or {"online": 0})["online"])  # type: ignore
-
-        # Unresolved high: unresolved and likely high severity
-        cursor.execute(
-            """
-            SELECT COUNT(*) as cnt
-            FROM violations
-            WHERE (status='unresolved' OR resolved=0)
-              AND (
-                LOWER(violation_type) LIKE '%helm%' OR LOWER(violation_type) LIKE '%helmet%'
-              )
-            """
-        )
-        unresolved_high = int((cursor.fetchone() or {"cnt": 0})["cnt"])  # type: ignore
-
-        # Composite pulse (heuristic):
-        # Base on average compliance from discipline endpoint fallback if needed
-        # compliance ~ 100 - 100*(violations/detections). Use discipline if available.
-        # Here approximate from last 7d: fewer violations -> higher score.
-        # Normalize violation rate against (avg_7d + 1) and online cameras ratio.
-        camera_ratio = (online_cameras / total_cameras) if total_cameras else 1.0
-        violation_factor = 1.0 / (1.0 + (avg_7d / 10.0))  # more avg violations -> lower factor
-        response_factor = 1.0 / (1.0 + (avg_response_time_sec / 300.0))  # 5min baseline
-        pulse_score = max(0.0, min(1.0, 0.5 * violation_factor + 0.3 * response_factor + 0.2 * camera_ratio)) * 100.0
 
-        return {
-            "generated_at": now.isoformat(),
-            "pulse_score": round(pulse_score, 1),
-            "violations": {
-                "total_today": total_today,
-                "avg_per_day": avg_7d,
-            },
-            "avg_response_time_sec": avg_response_time_sec,
-            "lti_free_days": lti_free_days,
-            "system_health": {
-                "cameras_online": online_cameras,
-                "cameras_total": total_cameras,
-                "sensors": {
-                    "online": 0,
-                    "total": 0,
-                },
-            },
-            "unresolved_high": unresolved_high,
-        }
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 @app.get("/api/violations")
-def get_violations(limit: int = 10) -> List[Dict[str, Any]]:
-    conn = get_conn()
+async def get_violations(
+    response: Response,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    camera: Optional[str] = None,
+    violation_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    stage: Optional[str] = None,
+    resolved: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Violations, newest first. Pass the X-Next-Cursor response header back as
+    ?cursor= to get the next page; the header is absent on the last page.
+    """
+    filters = {
+        "camera": camera, "violation_type": violation_type, "severity": severity,
+        "stage": stage, "resolved": resolved,
+    }
+    rows, next_cursor = await db.read(
+        _query_violations, clamp_page_size(limit), _parse_cursor(cursor), filters
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+def _query_violations(conn: Optional[sqlite3.Connection], limit: int = 10,
+                      after: Optional[Tuple[Any, int]] = None,
+                      filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     if conn is None:
         return [
             {"id": 1, "worker": "Worker #A001", "location": "Workshop A", "violation": "No Helmet", "time": "14:23", "status": "unresolved"},
             {"id": 2, "worker": "Worker #B002", "location": "Test Zone", "violation": "No Vest", "time": "13:45", "status": "unresolved"},
             {"id": 3, "worker": "Worker #C003", "location": "Demo Site", "violation": "No Gloves", "time": "12:18", "status": "resolved"},
-        ]
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, worker_id as worker, location, violation_type as violation,
-                   strftime('%H:%M', timestamp) as time,
-                   CASE WHEN violation = 1 THEN 'unresolved' ELSE 'resolved' END as status
-            FROM detections
-            ORDER BY timestamp DESC
-            LIMIT ?
-            """,
-            (limit,),
-        )
-        rows = cur.fetchall()
-        results = [dict(r) for r in rows]
-        return results
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        ], None
+
+    conditions, params = _violation_filters(conn, filters or {})
+    condition, keyset_params = keyset_condition("timestamp", "id", after)
+    if condition:
+        conditions.append(condition)
+        params.extend(keyset_params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT id, timestamp, camera_source as camera,
+               COALESCE(worker_id, 'Person #' || person_id) as worker,
+               COALESCE(location, camera_source) as location,
+               violation_type as violation,
+               strftime('%H:%M', timestamp) as time,
+               CASE WHEN resolved = 1 THEN 'resolved' ELSE 'unresolved' END as status
+        FROM violations
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+        """,
+        params + [limit + 1],
+    )
+    rows = [dict(r) for r in cur.fetchmany(limit + 1)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+@app.get("/api/violations/export")
+async def export_violations(
+    format: str = "ndjson",
+    camera: Optional[str] = None,
+    violation_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    stage: Optional[str] = None,
+    resolved: Optional[bool] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+):
+    """Stream matching violations as NDJSON or CSV, one keyset chunk at a time"""
+    if format not in {"ndjson", "csv"}:
+        raise HTTPException(status_code=400, detail="Format harus ndjson atau csv")
+
+    filters = {
+        "camera": camera, "violation_type": violation_type, "severity": severity,
+        "stage": stage, "resolved": resolved, "start": start, "end": end,
+    }
+    # Validate filters before the response starts streaming
+    first = await db.read(_export_violation_chunk, filters, None, format, True, endpoint_class="heavy")
+
+    async def body():
+        chunk, last_key = first
+        while True:
+            if chunk:
+                yield chunk
+            if last_key is None:
+                return
+            chunk, last_key = await db.read(
+                _export_violation_chunk, filters, last_key, format, False, endpoint_class="heavy"
+            )
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"violations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _export_violation_chunk(conn: Optional[sqlite3.Connection], filters: Dict[str, Any],
+                            after: Optional[Tuple[Any, int]], fmt: str,
+                            include_header: bool) -> Tuple[bytes, Optional[Tuple[Any, int]]]:
+    """
+    Encode the next chunk of an export
+
+    Returns:
+        (encoded bytes, sort key to continue after, or None when finished)
+    """
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database unavailable")
+
+    existing = set(_table_columns(conn, "violations"))
+    columns = [column for column in VIOLATION_EXPORT_COLUMNS if column in existing]
+    conditions, params = _violation_filters(conn, filters)
+    condition, keyset_params = keyset_condition("timestamp", "id", after)
+    if condition:
+        conditions.append(condition)
+        params.extend(keyset_params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cur = conn.execute(
+        f"SELECT {', '.join(columns)} FROM violations {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+        params + [EXPORT_CHUNK_SIZE],
+    )
+    rows = cur.fetchall()
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if include_header:
+            writer.writerow(columns)
+        writer.writerows(tuple(row) for row in rows)
+        data = buffer.getvalue()
+    else:
+        data = "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+
+    last_key = None
+    if len(rows) == EXPORT_CHUNK_SIZE:
+        last = dict(zip(columns, rows[-1]))
+        last_key = (last["timestamp"], last["id"])
+    return data.encode("utf-8"), last_key
 
 
 @app.get("/api/cameras")
-def get_cameras() -> List[Dict[str, Any]]:
+async def get_cameras() -> List[Dict[str, Any]]:
     # Return demo cameras for now. Can be backed by DB table "cameras" later.
     return [
         {"id": 1, "name": "Demo Camera 1", "location": "Test Area", "status": "online", "violations": 2, "workers": 5},
@@ -489,8 +819,14 @@ def get_cameras() -> List[Dict[str, Any]]:
 
 
 @app.get("/api/teams")
-def get_teams(include_members: bool = True) -> List[Dict[str, Any]]:
-    conn = get_conn()
+async def get_teams(request: Request, include_members: bool = True) -> Response:
+    return await cached_json(
+        request, ("teams", include_members), lambda: db.read(_compute_teams, include_members), HR_CACHE_TTL,
+        ("teams", "team_members"),
+    )
+
+
+def _compute_teams(conn: Optional[sqlite3.Connection], include_members: bool = True) -> List[Dict[str, Any]]:
     if conn is None:
         # Fallback to seeded sample data if DB unreachable
         sample = [
@@ -509,38 +845,37 @@ def get_teams(include_members: bool = True) -> List[Dict[str, Any]]:
         ]
         return sample
 
-    try:
-        cursor = conn.cursor()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, name, supervisor, shift_lead, contact, current_shift, last_updated FROM teams ORDER BY name"
+    )
+    teams = [dict(row) for row in cursor.fetchall()]
+
+    if include_members and teams:
+        team_ids = tuple(team["id"] for team in teams)
+        placeholders = ",".join("?" for _ in team_ids)
         cursor.execute(
-            "SELECT id, name, supervisor, shift_lead, contact, current_shift, last_updated FROM teams ORDER BY name"
+            f"SELECT team_id, name, role, shift, phone FROM team_members WHERE team_id IN ({placeholders}) ORDER BY team_id, name",
+            team_ids,
         )
-        teams = [dict(row) for row in cursor.fetchall()]
-
-        if include_members and teams:
-            team_ids = tuple(team["id"] for team in teams)
-            placeholders = ",".join("?" for _ in team_ids)
-            cursor.execute(
-                f"SELECT team_id, name, role, shift, phone FROM team_members WHERE team_id IN ({placeholders}) ORDER BY order_index"  # type: ignore[str-format]
-                if False
-                else "SELECT team_id, name, role, shift, phone FROM team_members ORDER BY team_id, name",
-                team_ids if team_ids else (0,),
-            )
 
-            members_by_team: Dict[int, List[Dict[str, Any]]] = {}
-            for row in cursor.fetchall():
-                members_by_team.setdefault(row["team_id"], []).append(dict(row))
+        members_by_team: Dict[int, List[Dict[str, Any]]] = {}
+        for row in cursor.fetchall():
+            members_by_team.setdefault(row["team_id"], []).append(dict(row))
 
-            for team in teams:
-                team["members"] = members_by_team.get(team["id"], [])
+        for team in teams:
+            team["members"] = members_by_team.get(team["id"], [])
 
-        return teams
-    finally:
-        conn.close()
+    return teams
 
 
 @app.get("/api/checklists")
-def get_checklists() -> List[Dict[str, Any]]:
-    conn = get_conn()
+async def get_checklists(request: Request) -> Response:
+    return await cached_json(request, ("checklists",), lambda: db.read(_compute_checklists), HR_CACHE_TTL,
+                             ("checklists", "checklist_items"))
+
+
+def _compute_checklists(conn: Optional[sqlite3.Connection]) -> List[Dict[str, Any]]:
     if conn is None:
         return [
             {
@@ -558,42 +893,39 @@ def get_checklists() -> List[Dict[str, Any]]:
             }
         ]
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, name, category, frequency, owner, last_updated, instructions FROM checklists ORDER BY name"
-        )
-        checklists = [dict(row) for row in cursor.fetchall()]
-
-        if not checklists:
-            return []
-
-        checklist_ids = tuple(item["id"] for item in checklists)
-        placeholders = ",".join("?" for _ in checklist_ids)
-        cursor.execute(
-            f"""
-            SELECT checklist_id, title, description, mandatory, order_index
-            FROM checklist_items
-            WHERE checklist_id IN ({placeholders})
-            ORDER BY checklist_id, order_index
-            """
-            if checklist_ids
-            else "SELECT checklist_id, title, description, mandatory, order_index FROM checklist_items ORDER BY checklist_id, order_index",
-            checklist_ids if checklist_ids else (0,),
-        )
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, name, category, frequency, owner, last_updated, instructions FROM checklists ORDER BY name"
+    )
+    checklists = [dict(row) for row in cursor.fetchall()]
+
+    if not checklists:
+        return []
+
+    checklist_ids = tuple(item["id"] for item in checklists)
+    placeholders = ",".join("?" for _ in checklist_ids)
+    cursor.execute(
+        f"""
+        SELECT checklist_id, title, description, mandatory, order_index
+        FROM checklist_items
+        WHERE checklist_id IN ({placeholders})
+        ORDER BY checklist_id, order_index
+        """
+        if checklist_ids
+        else "SELECT checklist_id, title, description, mandatory, order_index FROM checklist_items ORDER BY checklist_id, order_index",
+        checklist_ids if checklist_ids else (0,),
+    )
 
-        items_by_checklist: Dict[int, List[Dict[str, Any]]] = {}
-        for row in cursor.fetchall():
-            data = dict(row)
-            data["mandatory"] = bool(data.get("mandatory", 0))
-            items_by_checklist.setdefault(row["checklist_id"], []).append(data)
+    items_by_checklist: Dict[int, List[Dict[str, Any]]] = {}
+    for row in cursor.fetchall():
+        data = dict(row)
+        data["mandatory"] = bool(data.get("mandatory", 0))
+        items_by_checklist.setdefault(row["checklist_id"], []).append(data)
 
-        for checklist in checklists:
-            checklist["items"] = items_by_checklist.get(checklist["id"], [])
+    for checklist in checklists:
+        checklist["items"] = items_by_checklist.get(checklist["id"], [])
 
-        return checklists
-    finally:
-        conn.close()
+    return checklists
 
 
 class ResolveAlertPayload(BaseModel):
@@ -614,271 +946,415 @@ class EscalateAlertPayload(BaseModel):
 
 
 @app.get("/api/discipline")
-def get_discipline_stats(days: int = 7) -> Dict[str, Any]:
-    conn = get_conn()
+async def get_discipline_stats(request: Request, days: int = 7) -> Response:
+    return await cached_json(
+        request, ("discipline", days), lambda: db.read(_compute_discipline_stats, days, endpoint_class="heavy"),
+        RESPONSE_CACHE_TTL,
+        ("violations", "detections"),
+    )
+
+
+def _compute_discipline_stats(conn: Optional[sqlite3.Connection], days: int = 7) -> Dict[str, Any]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
 
-    lookback = datetime.now() - timedelta(days=days)
-
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT worker_id, violation_type, timestamp
-            FROM violations
-            WHERE timestamp >= ?
-            """,
-            (lookback.isoformat(),),
-        )
-        rows = cursor.fetchall()
-
-        cursor.execute(
-            """
-            SELECT worker_id, COUNT(*) as detections, SUM(violations) as violation_events
-            FROM detections
-            WHERE timestamp >= ?
-            GROUP BY worker_id
-            """,
-            (lookback.isoformat(),),
-        )
-        detection_rows = cursor.fetchall()
-
-        worker_stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            "violations": 0,
-            "detections": 0,
-            "topViolations": Counter(),
-        })
-
-        for row in rows:
-            worker = row["worker_id"] or "Unknown"
-            violation_type = row["violation_type"] or "unknown_violation"
-            worker_stats[worker]["violations"] += 1
-            worker_stats[worker]["topViolations"][violation_type] += 1
-
-        for row in detection_rows:
-            worker = row["worker_id"] or "Unknown"
-            detections = row["detections"] or 0
-            violations = row["violation_events"] or 0
-            worker_stats[worker]["detections"] += detections
-            worker_stats[worker]["violations"] += violations
-
-        leaderboard = []
-        total_compliance = 0
-        total_workers = 0
-
-        for worker, stats in worker_stats.items():
-            detections = stats["detections"]
-            violations = stats["violations"]
-            if detections == 0:
-                continue
-            total_workers += 1
-            compliance_rate = max(0.0, 100 - (violations / max(detections, 1)) * 100)
-            total_compliance += compliance_rate
-            leaderboard.append({
-                "worker": worker,
-                "detections": detections,
-                "violations": violations,
-                "complianceRate": round(compliance_rate, 2),
-                "topViolations": [v for v, _ in stats["topViolations"].most_common(3)],
-            })
-
-        leaderboard.sort(key=lambda item: item["complianceRate"], reverse=True)
-
-        return {
-            "generated_at": datetime.now().isoformat(),
-            "summary": {
-                "total_workers": total_workers,
-                "average_compliance": round(total_compliance / max(total_workers, 1), 2),
-            },
-            "leaderboard": leaderboard,
-        }
+        return query_leaderboard(conn, days)
     except Exception as exc:
         print(f"Discipline aggregation failed: {exc}")
         raise HTTPException(status_code=500, detail="Gagal menghitung statistik kedisiplinan")
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 @app.get("/api/alerts/actions")
-def list_alert_actions(limit: int = 100) -> List[Dict[str, Any]]:
-    conn = get_conn()
+async def list_alert_actions(
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    alert_id: Optional[int] = None,
+    action: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Alert actions, newest first, paged like /api/violations (X-Next-Cursor)"""
+    rows, next_cursor = await db.read(
+        _query_alert_actions, clamp_page_size(limit), _parse_cursor(cursor), alert_id, action
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+def _query_alert_actions(conn: Optional[sqlite3.Connection], limit: int = 100,
+                         after: Optional[Tuple[Any, int]] = None, alert_id: Optional[int] = None,
+                         action: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT aa.id, aa.violation_id as alert_id, aa.action, aa.notes, aa.level, aa.actor,
-                   aa.auto_generated as auto, aa.evidence, aa.created_at as timestamp,
-                   v.worker_id as worker, v.violation_type as violation
-            FROM alert_actions aa
-            LEFT JOIN violations v ON aa.violation_id = v.id
-            ORDER BY aa.created_at DESC
-            LIMIT ?
-            """,
-            (limit,),
-        )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+    conditions: List[str] = []
+    params: List[Any] = []
+    if alert_id is not None:
+        conditions.append("aa.violation_id = ?")
+        params.append(alert_id)
+    if action:
+        conditions.append("aa.action = ?")
+        params.append(action)
+    condition, keyset_params = keyset_condition("aa.created_at", "aa.id", after)
+    if condition:
+        conditions.append(condition)
+        params.extend(keyset_params)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT aa.id, aa.violation_id as alert_id, aa.action, aa.notes, aa.level, aa.actor,
+               aa.auto_generated as auto, aa.evidence, aa.created_at as timestamp,
+               v.worker_id as worker, v.violation_type as violation
+        FROM alert_actions aa
+        LEFT JOIN violations v ON aa.violation_id = v.id
+        {where}
+        ORDER BY aa.created_at DESC, aa.id DESC
+        LIMIT ?
+        """,
+        params + [limit + 1],
+    )
+    rows = [dict(row) for row in cursor.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+    return rows, next_cursor
 
 
 @app.post("/api/alerts/resolve")
-def resolve_alert(payload: ResolveAlertPayload):
-    conn = get_conn()
+async def resolve_alert(payload: ResolveAlertPayload):
+    action, resolution = await db.write(_resolve_alert, payload)
+    pulse_kpis.record_resolution(**resolution)
+    response_cache.invalidate("violations", "alert_actions")
+    return action
+
+
+def _resolve_alert(conn: Optional[sqlite3.Connection],
+                   payload: ResolveAlertPayload) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Resolve a violation; returns the action and the details pulse_kpis needs"""
     if conn is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE violations SET resolved = 1 WHERE id = ?",
-            (payload.alert_id,),
-        )
-        if cursor.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Alert tidak ditemukan")
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT v.timestamp, v.violation_type,
+               (v.status = 'unresolved' OR v.resolved = 0) AS was_unresolved,
+               EXISTS (
+                   SELECT 1 FROM alert_actions aa WHERE aa.violation_id = v.id AND aa.action = 'resolve'
+               ) AS resolved_before
+        FROM violations v
+        WHERE v.id = ?
+        """,
+        (payload.alert_id,),
+    )
+    violation = cursor.fetchone()
+    if violation is None:
+        raise HTTPException(status_code=404, detail="Alert tidak ditemukan")
 
-        cursor.execute(
-            """
-            INSERT INTO alert_actions (violation_id, action, notes, actor, auto_generated, evidence)
-            VALUES (?, ?, ?, ?, 0, ?)
-            """,
-            (
-                payload.alert_id,
-                'resolve',
-                payload.notes,
-                payload.actor,
-                payload.evidence,
-            ),
-        )
-        conn.commit()
+    cursor.execute(
+        "UPDATE violations SET resolved = 1, status = 'resolved' WHERE id = ?",
+        (payload.alert_id,),
+    )
 
-        action = {
-            "id": cursor.lastrowid,
-            "alert_id": payload.alert_id,
-            "action": "resolve",
-            "notes": payload.notes,
-            "actor": payload.actor,
-            "evidence": payload.evidence,
-            "timestamp": datetime.now().isoformat(),
-            "auto": False,
-        }
-        return action
-    finally:
-        conn.close()
+    cursor.execute(
+        """
+        INSERT INTO alert_actions (violation_id, action, notes, actor, auto_generated, evidence)
+        VALUES (?, ?, ?, ?, 0, ?)
+        """,
+        (
+            payload.alert_id,
+            'resolve',
+            payload.notes,
+            payload.actor,
+            payload.evidence,
+        ),
+    )
+
+    action = {
+        "id": cursor.lastrowid,
+        "alert_id": payload.alert_id,
+        "action": "resolve",
+        "notes": payload.notes,
+        "actor": payload.actor,
+        "evidence": payload.evidence,
+        "timestamp": datetime.now().isoformat(),
+        "auto": False,
+    }
+    created_at = conn.execute(
+        "SELECT created_at FROM alert_actions WHERE id = ?", (action["id"],)
+    ).fetchone()[0]
+    resolution = {
+        "violation_timestamp": violation["timestamp"],
+        "violation_type": violation["violation_type"],
+        "resolved_at": created_at,
+        "first_resolve": not violation["resolved_before"],
+        "was_unresolved": bool(violation["was_unresolved"]),
+    }
+    return action, resolution
 
 
 @app.post("/api/alerts/actions")
-def escalate_alert(payload: EscalateAlertPayload):
-    conn = get_conn()
+async def escalate_alert(payload: EscalateAlertPayload):
+    action = await db.write(_escalate_alert, payload)
+    response_cache.invalidate("alert_actions")
+    return action
+
+
+def _escalate_alert(conn: Optional[sqlite3.Connection], payload: EscalateAlertPayload) -> Dict[str, Any]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database unavailable")
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id FROM violations WHERE id = ?",
-            (payload.alert_id,),
-        )
-        if cursor.fetchone() is None:
-            raise HTTPException(status_code=404, detail="Alert tidak ditemukan")
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id FROM violations WHERE id = ?",
+        (payload.alert_id,),
+    )
+    if cursor.fetchone() is None:
+        raise HTTPException(status_code=404, detail="Alert tidak ditemukan")
 
-        cursor.execute(
-            """
-            INSERT INTO alert_actions (violation_id, action, notes, level, actor, auto_generated, evidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                payload.alert_id,
-                'escalate',
-                payload.notes,
-                payload.level,
-                payload.actor,
-                1 if payload.auto else 0,
-                payload.evidence,
-            ),
-        )
-        conn.commit()
+    cursor.execute(
+        """
+        INSERT INTO alert_actions (violation_id, action, notes, level, actor, auto_generated, evidence)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            payload.alert_id,
+            'escalate',
+            payload.notes,
+            payload.level,
+            payload.actor,
+            1 if payload.auto else 0,
+            payload.evidence,
+        ),
+    )
 
-        action = {
-            "id": cursor.lastrowid,
-            "alert_id": payload.alert_id,
-            "action": "escalate",
-            "notes": payload.notes,
-            "level": payload.level,
-            "actor": payload.actor,
-            "timestamp": datetime.now().isoformat(),
-            "auto": bool(payload.auto),
-            "evidence": payload.evidence,
-        }
-        return action
-    finally:
-        conn.close()
+    action = {
+        "id": cursor.lastrowid,
+        "alert_id": payload.alert_id,
+        "action": "escalate",
+        "notes": payload.notes,
+        "level": payload.level,
+        "actor": payload.actor,
+        "timestamp": datetime.now().isoformat(),
+        "auto": bool(payload.auto),
+        "evidence": payload.evidence,
+    }
+    return action
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
+    """
+    WebSocket endpoint for real-time updates
+
+    Clients receive everything by default and can narrow it with
+    {"action": "subscribe", "cameras": [...], "zones": [...], "severities": [...], "types": [...]}.
+    With "stats_mode": "delta", stats arrive as a stats_snapshot followed by
+    sequenced stats_delta messages; on a sequence gap send {"action": "resync"}.
+    """
     await manager.connect(websocket)
     try:
         while True:
             # Keep connection alive and listen for client messages
             data = await websocket.receive_text()
-            # Echo back for testing
-            await websocket.send_json({"type": "echo", "message": data})
+            try:
+                request = json.loads(data)
+            except ValueError:
+                request = None
+
+            if isinstance(request, dict) and request.get("action") == "subscribe":
+                filters = manager.subscribe(websocket, request)
+                await manager.send_personal(websocket, {"type": "subscribed", "filters": filters})
+                continue
+
+            if isinstance(request, dict) and request.get("action") == "resync":
+                manager.resync(websocket, request.get("topic"))
+                continue
+
+            # Echo back for testing (through the client's send queue)
+            await manager.send_personal(websocket, {"type": "echo", "message": data})
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
 
+@app.get("/api/stream")
+def list_streams() -> List[Dict[str, Any]]:
+    """Cameras currently publishing (or recently published) live video"""
+    return stream_hub.status()
+
+
+@app.get("/api/stream/{camera_id}/snapshot")
+def stream_snapshot(camera_id: str):
+    """Latest JPEG frame of a camera"""
+    stream = stream_hub.cameras.get(camera_id)
+    if stream is None or stream.latest is None:
+        raise HTTPException(status_code=404, detail="Stream tidak tersedia")
+    return Response(content=stream.latest, media_type="image/jpeg")
+
+
+@app.get("/api/stream/{camera_id}/mjpeg")
+async def stream_mjpeg(camera_id: str):
+    """MJPEG live view; slow viewers skip frames instead of buffering them"""
+    stream = stream_hub.find(camera_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream tidak tersedia")
+
+    async def frames():
+        subscriber = stream.subscribe()
+        try:
+            while True:
+                _, part = await subscriber.next_frame()
+                yield part
+        finally:
+            stream.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        frames(),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.websocket("/ws/stream/{camera_id}")
+async def stream_websocket(websocket: WebSocket, camera_id: str):
+    """Live view as binary JPEG WebSocket messages"""
+    stream = stream_hub.find(camera_id)
+    if stream is None:
+        await websocket.close(code=1008)  # Policy violation: unknown camera
+        return
+    await websocket.accept()
+    subscriber = stream.subscribe()
+    try:
+        while True:
+            jpeg, _ = await subscriber.next_frame()
+            await websocket.send_bytes(jpeg)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        stream.unsubscribe(subscriber)
+
+
 @app.post("/api/trigger-alert")
 async def trigger_alert(violation: Dict[str, Any]):
-    """Manually trigger a violation alert (for testing)"""
-    await manager.send_violation_alert(violation)
+    """Manually inject a violation event (for testing; live alerts arrive via the event bus)"""
+    await event_server.dispatch({"type": "violation", "data": violation})
     return {"status": "alert_sent", "violation": violation}
 
 
-def _handle_report_generation(report_type: str = "weekly") -> Dict[str, Any]:
-    generator = ReportGenerator(db_path=DB_PATH)
-    html = generator.generate_weekly_report() if report_type == "weekly" else generator.generate_weekly_report()
-    filename = f"{report_type}_report_{datetime.now().strftime('%Y%m%d')}"
-    pdf_path = generator.save_pdf(html, filename)
-
-    primary_recipient = REPORT_RECIPIENTS[0] if REPORT_RECIPIENTS else None
-    if primary_recipient:
+def _handle_report_generation(report_type: str = "weekly", start: Optional[date] = None,
+                              end: Optional[date] = None, progress=None) -> Dict[str, Any]:
+    """Generate, save and email a report (blocking; runs on the report job pool)"""
+    progress = progress or (lambda percent, stage: None)
+    generator = ReportGenerator(db_path=DB_PATH, mailer=report_mailer)
+    progress(10, "aggregating")
+    report = generator.build_report(report_type, start, end)
+    period_start, period_end = report['start'], report['end']
+    progress(40, "rendering")
+    html = generator.render_report(report['title'], period_start, period_end,
+                                   report['data'], report['trend_title'])
+    progress(60, "writing_pdf")
+    filename = f"{report_type}_report_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}"
+    pdf_path = generator.save_pdf(report, filename)
+
+    delivery = None
+    if REPORT_RECIPIENTS:
+        progress(85, "emailing")
         subject = f"SmartAPD {report_type.title()} Safety Report"
-        generator.send_email(
-            to_email=primary_recipient,
-            subject=subject,
-            html_body=html,
-            pdf_path=pdf_path,
-        )
+        delivery = generator.send_email(REPORT_RECIPIENTS, subject, html, pdf_path)
 
     return {
         "status": "success",
         "report_type": report_type,
+        "period": {"start": period_start.isoformat(), "end": period_end.isoformat()},
         "file_path": pdf_path,
         "generated_at": datetime.now().isoformat(),
-        "email_sent": bool(primary_recipient),
+        "email_sent": delivery is not None,
+        "email": {"delivery_id": delivery.id, "status": delivery.status} if delivery else None,
     }
 
 
+def _report_job_payload(job) -> Dict[str, Any]:
+    """Job state with the current status of its email delivery"""
+    payload = job.to_dict()
+    email = (job.result or {}).get("email")
+    delivery = report_mailer.get(email["delivery_id"]) if email and report_mailer else None
+    if delivery is not None:
+        payload["result"] = {**job.result, "email": delivery.to_dict()}
+    return payload
+
+
+report_mailer = Mailer(
+    SMTP_HOST, SMTP_PORT, sender=SMTP_SENDER, username=SMTP_USERNAME, password=SMTP_PASSWORD,
+    starttls=SMTP_STARTTLS, use_ssl=SMTP_SSL, batch_size=SMTP_BATCH_SIZE, max_retries=SMTP_MAX_RETRIES,
+) if SMTP_HOST else None
+
+report_jobs = ReportJobRunner(
+    _handle_report_generation, max_workers=REPORT_MAX_CONCURRENCY, result_ttl=REPORT_RESULT_TTL
+)
+
+
+def submit_report_job(report_type: str, start: Optional[date] = None, end: Optional[date] = None):
+    """Queue a report on the job pool (never runs report work on the event loop)"""
+    period_start, period_end, _, _ = report_period(report_type, start, end)
+    return report_jobs.submit(report_type, period_start, period_end)
+
+
 @app.get("/api/reports/generate")
-def generate_report(report_type: str = "weekly", background: BackgroundTasks | None = None):
-    """Generate safety report and optionally trigger email delivery"""
-    if report_type not in {"weekly", "monthly"}:
+async def generate_report(report_type: str = "weekly", start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Queue a safety report (and its email delivery); poll /api/reports/jobs/{job_id}.
+    weekly: 7 days up to end (default today); monthly: month of start (default
+    this month, to date); custom: start..end inclusive. A report for the same
+    type and period that is in progress or recently finished is reused.
+    """
+    if report_type not in REPORT_TYPES:
         return {"status": "error", "message": "Invalid report type"}
+    try:
+        job, reused = submit_report_job(report_type, start, end)
+    except ValueError as exc:
+        return {"status": "error", "message": str(exc)}
+
+    return {
+        "status": job.status,
+        "message": "Report already available" if reused and job.status == "success" else "Report generation scheduled",
+        "job_id": job.id,
+        "reused": reused,
+        "status_url": f"/api/reports/jobs/{job.id}",
+    }
 
-    if background:
-        background.add_task(_handle_report_generation, report_type)
-        return {"status": "queued", "message": "Report generation scheduled"}
 
-    return _handle_report_generation(report_type)
+@app.get("/api/reports/jobs")
+async def list_report_jobs(limit: int = 50):
+    return {
+        "jobs": [_report_job_payload(job) for job in report_jobs.list_jobs(max(1, min(limit, 200)))],
+        "statistics": report_jobs.get_statistics(),
+    }
+
+
+@app.get("/api/reports/jobs/{job_id}")
+async def get_report_job(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job laporan tidak ditemukan")
+    return _report_job_payload(job)
+
+
+@app.get("/api/reports/jobs/{job_id}/download")
+async def download_report(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job laporan tidak ditemukan")
+    if job.status != "success" or not job.result:
+        raise HTTPException(status_code=409, detail="Laporan belum selesai")
+    path = job.result["file_path"]
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="File laporan sudah tidak tersedia")
+    return FileResponse(path, filename=os.path.basename(path))
 
 
 def schedule_report_jobs():
@@ -892,7 +1368,7 @@ def schedule_report_jobs():
 
         scheduler = AsyncIOScheduler(timezone=REPORT_TIMEZONE)
         scheduler.add_job(
-            _handle_report_generation,
+            submit_report_job,
             CronTrigger.from_crontab(REPORT_SCHEDULE_CRON, timezone=REPORT_TIMEZONE),
             kwargs={"report_type": "weekly"},
             id="weekly_report_job",
@@ -903,10 +1379,21 @@ def schedule_report_jobs():
 
 @app.on_event("startup")
 async def startup_event():
-    conn = get_conn()
-    if conn:
-        conn.close()
+    # Open the writer connection now so the schema and seed data exist before the first request
+    await db.write(lambda conn: None)
+    global pulse_reconcile_task
+    pulse_reconcile_task = asyncio.create_task(reconcile_pulse_kpis())
     schedule_report_jobs()
+    if ENABLE_STREAM_INGEST:
+        try:
+            await stream_hub.start_ingest(STREAM_INGEST_HOST, STREAM_INGEST_PORT)
+        except OSError as exc:
+            print(f"Stream ingest unavailable: {exc}")
+    if ENABLE_EVENT_BUS:
+        try:
+            await event_server.start(EVENT_BUS_SOCKET, EVENT_BUS_HOST, EVENT_BUS_PORT)
+        except OSError as exc:
+            print(f"Event bus unavailable: {exc}")
 
 
 @app.on_event("shutdown")
@@ -914,6 +1401,15 @@ async def shutdown_event():
     global scheduler
     if scheduler and scheduler.running:
         scheduler.shutdown()
+    if pulse_reconcile_task is not None:
+        pulse_reconcile_task.cancel()
+        await asyncio.gather(pulse_reconcile_task, return_exceptions=True)
+    await stream_hub.stop()
+    await event_server.stop()
+    await asyncio.to_thread(report_jobs.shutdown)
+    if report_mailer is not None:
+        await asyncio.to_thread(report_mailer.shutdown)
+    await asyncio.to_thread(db.close)
 
 
 # To run locally: uvicorn api.main:app --reload --port 8000
@@ -0,0 +1,67 @@
+"""
+Keyset Pagination
+Opaque cursors over (timestamp, id) ordering, so listing history never
+re-scans the rows of earlier pages
+"""
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Cursor that was not produced by encode_cursor"""
+
+
+def encode_cursor(timestamp: Any, row_id: int) -> str:
+    """
+    Encode the sort key of the last row of a page
+
+    Args:
+        timestamp: Timestamp value of the row
+        row_id: Primary key of the row
+
+    Returns:
+        URL-safe opaque cursor
+    """
+    raw = json.dumps([timestamp, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor back to its (timestamp, id) sort key
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return timestamp, int(row_id)
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def keyset_condition(timestamp_column: str, id_column: str,
+                     after: Optional[Tuple[Any, int]]) -> Tuple[Optional[str], List[Any]]:
+    """
+    WHERE condition selecting rows after a key in (timestamp DESC, id DESC) order
+
+    Args:
+        timestamp_column: Timestamp column name
+        id_column: Primary key column name
+        after: Sort key of the last row already returned, or None
+
+    Returns:
+        (SQL condition or None, parameters)
+    """
+    if after is None:
+        return None, []
+    return f"({timestamp_column}, {id_column}) < (?, ?)", [after[0], after[1]]
+
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
@@ -0,0 +1,579 @@
+"""
+Native PDF Report Renderer
+Pure-Python PDF output for safety reports: no external binary, charts drawn
+once per report as reusable form objects, pages streamed to disk as they
+are laid out
+"""
+import os
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# A4 in points
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 48.0
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+FOOTER_HEIGHT = 28.0
+
+Color = Tuple[float, float, float]
+
+BRAND = (1.0, 0.478, 0.0)          # #FF7A00
+BRAND_GREEN = (0.204, 0.780, 0.349)
+TEXT = (0.118, 0.161, 0.231)       # #1e293b
+MUTED = (0.392, 0.455, 0.545)      # #64748b
+PANEL = (0.945, 0.961, 0.976)      # #f1f5f9
+RULE = (0.886, 0.910, 0.941)       # #e2e8f0
+SEVERITY_COLORS = {
+    "high": (0.863, 0.149, 0.149),
+    "medium": (0.918, 0.345, 0.047),
+    "low": (0.020, 0.588, 0.412),
+}
+
+# Standard Helvetica / Helvetica-Bold advance widths (1/1000 em) for ' '..'~'
+_HELVETICA = (
+    "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 "
+    "556 556 278 278 584 584 584 556 1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+    "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 333 556 556 500 556 556 278 556 "
+    "556 222 222 500 222 833 556 556 556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+)
+_HELVETICA_BOLD = (
+    "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 "
+    "556 556 333 333 584 584 584 611 975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 "
+    "667 778 722 667 611 722 667 944 667 667 611 333 278 333 584 556 333 556 611 556 611 556 333 611 "
+    "611 278 278 556 278 889 611 611 611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+)
+FONT_WIDTHS = {
+    "F1": [int(w) for w in _HELVETICA.split()],
+    "F2": [int(w) for w in _HELVETICA_BOLD.split()],
+}
+DEFAULT_CHAR_WIDTH = 556
+
+
+def _encode_text(text: str) -> str:
+    """Text as WinAnsi code points (one str char per byte); unsupported characters are dropped"""
+    return str(text).encode("cp1252", errors="ignore").decode("latin-1")
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    """Width of text in points for the built-in Helvetica fonts"""
+    widths = FONT_WIDTHS["F2" if bold else "F1"]
+    total = 0
+    for char in _encode_text(text):
+        code = ord(char) - 32
+        total += widths[code] if 0 <= code < len(widths) else DEFAULT_CHAR_WIDTH
+    return total * size / 1000.0
+
+
+def wrap_text(text: str, size: float, width: float, bold: bool = False) -> List[str]:
+    """Greedy word wrap to a maximum line width"""
+    lines: List[str] = []
+    current = ""
+    for word in str(text).split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, size, bold) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+def _literal(text: str) -> str:
+    escaped = _encode_text(text).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped})"
+
+
+def _color(color: Color, stroke: bool = False) -> str:
+    return f"{color[0]:.3f} {color[1]:.3f} {color[2]:.3f} {'RG' if stroke else 'rg'}"
+
+
+class Canvas:
+    """Drawing operations of one page or form, in PDF user space (origin bottom-left)"""
+
+    def __init__(self):
+        self.ops: List[str] = []
+        self.xobjects: Dict[str, int] = {}
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False,
+             color: Color = TEXT, align: str = "left"):
+        if align != "left":
+            width = text_width(text, size, bold)
+            x -= width if align == "right" else width / 2
+        font = "F2" if bold else "F1"
+        self.ops.append(f"{_color(color)} BT /{font} {size:g} Tf {x:.2f} {y:.2f} Td {_literal(text)} Tj ET\n")
+
+    def rect(self, x: float, y: float, width: float, height: float,
+             fill: Optional[Color] = None, stroke: Optional[Color] = None, line_width: float = 1):
+        if fill is not None:
+            self.ops.append(f"{_color(fill)} {x:.2f} {y:.2f} {width:.2f} {height:.2f} re f\n")
+        if stroke is not None:
+            self.ops.append(
+                f"{_color(stroke, True)} {line_width:g} w {x:.2f} {y:.2f} {width:.2f} {height:.2f} re S\n"
+            )
+
+    def line(self, points: Sequence[Tuple[float, float]], color: Color = RULE, line_width: float = 1):
+        if len(points) < 2:
+            return
+        path = [f"{points[0][0]:.2f} {points[0][1]:.2f} m"]
+        path.extend(f"{x:.2f} {y:.2f} l" for x, y in points[1:])
+        self.ops.append(f"{_color(color, True)} {line_width:g} w {' '.join(path)} S\n")
+
+    def place(self, name: str, obj_id: int, x: float, y: float, scale: float = 1.0):
+        """Draw a form object (chart) at x, y"""
+        self.xobjects[name] = obj_id
+        self.ops.append(f"q {scale:g} 0 0 {scale:g} {x:.2f} {y:.2f} cm /{name} Do Q\n")
+
+    def content(self) -> bytes:
+        return "".join(self.ops).encode("latin-1")
+
+
+class PdfWriter:
+    """
+    Incremental PDF file writer.
+
+    Objects are written to the file as soon as they are complete; only their
+    byte offsets (and the page object ids) stay in memory, so a long report
+    is never held in memory as a whole. The document is written to a
+    temporary file that only replaces path once it is complete.
+    """
+
+    def __init__(self, path: str, compress: bool = True):
+        self.path = path
+        self.compress = compress
+        self._partial_path = path + ".part"
+        self._file = open(self._partial_path, "wb")
+        self._offsets: Dict[int, int] = {}
+        self._next_id = 1
+        self._page_ids: List[int] = []
+        self._closed = False
+
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._catalog_id = self._reserve()
+        self._pages_id = self._reserve()
+        self._fonts = {
+            "F1": self._write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                     b"/Encoding /WinAnsiEncoding >>"),
+            "F2": self._write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                                     b"/Encoding /WinAnsiEncoding >>"),
+        }
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def add_form(self, width: float, height: float, canvas: Canvas) -> int:
+        """Write a reusable form object (e.g. a chart); returns its object id"""
+        return self._write_stream(
+            f"/Type /XObject /Subtype /Form /BBox [0 0 {width:.2f} {height:.2f}] "
+            f"/Resources {self._resources(canvas.xobjects)}",
+            canvas.content(),
+        )
+
+    def add_page(self, canvas: Canvas):
+        """Write one finished page"""
+        content_id = self._write_stream("", canvas.content())
+        page_id = self._write_object(
+            f"<< /Type /Page /Parent {self._pages_id} 0 R "
+            f"/MediaBox [0 0 {PAGE_WIDTH:.2f} {PAGE_HEIGHT:.2f}] "
+            f"/Resources {self._resources(canvas.xobjects)} /Contents {content_id} 0 R >>".encode("latin-1")
+        )
+        self._page_ids.append(page_id)
+
+    def close(self, title: str = ""):
+        """Write the page tree, catalog and cross-reference table"""
+        if self._closed:
+            return
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("latin-1"),
+            self._pages_id,
+        )
+        self._write_object(f"<< /Type /Catalog /Pages {self._pages_id} 0 R >>".encode("latin-1"),
+                           self._catalog_id)
+        info_id = self._write_object(
+            f"<< /Title {_literal(title)} /Producer (SmartAPD) >>".encode("latin-1")
+        )
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        self._file.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("ascii"))
+        for obj_id in range(1, size):
+            self._file.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode("ascii"))
+        self._file.write(
+            f"trailer\n<< /Size {size} /Root {self._catalog_id} 0 R /Info {info_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        self._file.close()
+        self._closed = True
+        os.replace(self._partial_path, self.path)
+
+    def abort(self):
+        """Discard the unfinished document"""
+        if not self._closed:
+            self._file.close()
+            self._closed = True
+            try:
+                os.remove(self._partial_path)
+            except OSError:
+                pass
+
+    def _resources(self, xobjects: Dict[str, int]) -> str:
+        fonts = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id in self._fonts.items())
+        resources = f"<< /Font << {fonts} >>"
+        if xobjects:
+            resources += " /XObject << " + " ".join(
+                f"/{name} {obj_id} 0 R" for name, obj_id in sorted(xobjects.items())
+            ) + " >>"
+        return resources + " >>"
+
+    def _reserve(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, body: bytes, obj_id: Optional[int] = None) -> int:
+        if obj_id is None:
+            obj_id = self._reserve()
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode("ascii"))
+        self._file.write(body)
+        self._file.write(b"\nendobj\n")
+        return obj_id
+
+    def _write_stream(self, entries: str, data: bytes) -> int:
+        if self.compress:
+            data = zlib.compress(data, 6)
+            entries += " /Filter /FlateDecode"
+        body = f"<< {entries} /Length {len(data)} >>\nstream\n".encode("latin-1") + data + b"\nendstream"
+        return self._write_object(body)
+
+
+def bar_chart(width: float, height: float, labels: Sequence[str], values: Sequence[float],
+              colors: Optional[Sequence[Color]] = None, value_format: str = "{:g}") -> Canvas:
+    """Vertical bar chart drawn in a width x height box"""
+    canvas = Canvas()
+    canvas.rect(0, 0, width, height, fill=PANEL)
+    if not values:
+        canvas.text(width / 2, height / 2, "Tidak ada data", 9, color=MUTED, align="center")
+        return canvas
+
+    left, bottom, top = 8.0, 22.0, 14.0
+    plot_height = height - bottom - top
+    peak = max(max(values), 1e-9)
+    slot = (width - 2 * left) / len(values)
+    bar_width = min(slot * 0.6, 48.0)
+    canvas.line([(left, bottom), (width - left, bottom)], MUTED, 0.6)
+    for index, (label, value) in enumerate(zip(labels, values)):
+        center = left + slot * (index + 0.5)
+        bar_height = plot_height * value / peak
+        color = colors[index] if colors else BRAND
+        canvas.rect(center - bar_width / 2, bottom, bar_width, bar_height, fill=color)
+        canvas.text(center, bottom + bar_height + 3, value_format.format(value), 7, True, TEXT, "center")
+        short = label
+        while short and text_width(short, 6.5) > slot - 2:
+            short = short[:-1]
+        canvas.text(center, bottom - 10, short, 6.5, color=MUTED, align="center")
+    return canvas
+
+
+def line_chart(width: float, height: float, labels: Sequence[str], values: Sequence[float],
+               color: Color = BRAND) -> Canvas:
+    """Line chart of a daily series drawn in a width x height box"""
+    canvas = Canvas()
+    canvas.rect(0, 0, width, height, fill=PANEL)
+    if not values:
+        canvas.text(width / 2, height / 2, "Tidak ada data", 9, color=MUTED, align="center")
+        return canvas
+
+    left, bottom, top = 24.0, 20.0, 12.0
+    plot_width = width - left - 10
+    plot_height = height - bottom - top
+    peak = max(max(values), 1)
+    for fraction in (0.0, 0.5, 1.0):
+        y = bottom + plot_height * fraction
+        canvas.line([(left, y), (left + plot_width, y)], RULE, 0.5)
+        canvas.text(left - 4, y - 2.5, f"{peak * fraction:.0f}", 6, color=MUTED, align="right")
+
+    step = plot_width / max(len(values) - 1, 1)
+    points = [(left + step * i, bottom + plot_height * value / peak) for i, value in enumerate(values)]
+    canvas.line(points, color, 1.5)
+    label_every = max(1, len(labels) // 8)
+    for index in range(0, len(labels), label_every):
+        canvas.text(points[index][0], bottom - 11, labels[index], 6, color=MUTED, align="center")
+    return canvas
+
+
+class ReportSection(NamedTuple):
+    """One site's report data (see ReportGenerator._get_report_data)"""
+    site: str
+    period: str
+    data: Dict[str, Any]
+
+
+class ReportPdfRenderer:
+    """
+    Lays out report sections into A4 pages.
+
+    A page is written to the file as soon as it is full. Charts are drawn
+    once per report and placed by reference wherever they appear.
+    """
+
+    def __init__(self, path: str, title: str, subtitle: str = ""):
+        self.writer = PdfWriter(path)
+        self.title = title
+        self.subtitle = subtitle
+        self.canvas: Optional[Canvas] = None
+        self.y = 0.0
+        self._charts: Dict[Any, Tuple[str, int]] = {}
+
+        # Statistics
+        self.charts_rendered = 0
+        self.charts_placed = 0
+
+    def chart(self, key: Any, width: float, height: float, draw: Callable[[], Canvas]) -> Tuple[str, int]:
+        """Form object of a chart, drawn on first use only"""
+        chart = self._charts.get(key)
+        if chart is None:
+            obj_id = self.writer.add_form(width, height, draw())
+            chart = (f"C{len(self._charts) + 1}", obj_id)
+            self._charts[key] = chart
+            self.charts_rendered += 1
+        return chart
+
+    def place_chart(self, chart: Tuple[str, int], width: float, height: float):
+        self.ensure(height + 8)
+        self.canvas.place(chart[0], chart[1], MARGIN, self.y - height)
+        self.charts_placed += 1
+        self.y -= height + 12
+
+    def new_page(self):
+        self.finish_page()
+        self.canvas = Canvas()
+        self.canvas.rect(0, PAGE_HEIGHT - 6, PAGE_WIDTH, 6, fill=BRAND)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def finish_page(self):
+        if self.canvas is None:
+            return
+        number = self.writer.page_count + 1
+        self.canvas.line([(MARGIN, MARGIN - 8), (PAGE_WIDTH - MARGIN, MARGIN - 8)], RULE, 0.5)
+        self.canvas.text(MARGIN, MARGIN - 20, f"SmartAPD - {self.title}", 7, color=MUTED)
+        self.canvas.text(PAGE_WIDTH - MARGIN, MARGIN - 20, f"Halaman {number}", 7, color=MUTED, align="right")
+        self.writer.add_page(self.canvas)
+        self.canvas = None
+
+    def ensure(self, height: float) -> bool:
+        """Start a new page unless height points fit; returns whether it did"""
+        if self.canvas is None or self.y - height < MARGIN + FOOTER_HEIGHT - 20:
+            self.new_page()
+            return True
+        return False
+
+    def spacer(self, height: float):
+        self.y -= height
+
+    def heading(self, text: str, size: float = 14, color: Color = TEXT):
+        self.ensure(size + 40)
+        self.canvas.text(MARGIN, self.y - size, text, size, True, color)
+        self.y -= size + 6
+        self.canvas.line([(MARGIN, self.y), (MARGIN + CONTENT_WIDTH, self.y)], BRAND, 1.2)
+        self.y -= 10
+
+    def paragraph(self, text: str, size: float = 9.5, color: Color = TEXT, indent: float = 0,
+                  bullet: Optional[str] = None):
+        leading = size * 1.4
+        for index, line in enumerate(wrap_text(text, size, CONTENT_WIDTH - indent)):
+            self.ensure(leading)
+            if bullet and index == 0:
+                self.canvas.text(MARGIN, self.y - size, bullet, size, True, BRAND_GREEN)
+            self.canvas.text(MARGIN + indent, self.y - size, line, size, color=color)
+            self.y -= leading
+        self.y -= 4
+
+    def kpis(self, items: Sequence[Tuple[str, str]]):
+        height = 54.0
+        self.ensure(height + 10)
+        gap = 10.0
+        width = (CONTENT_WIDTH - gap * (len(items) - 1)) / len(items)
+        for index, (value, label) in enumerate(items):
+            x = MARGIN + index * (width + gap)
+            self.canvas.rect(x, self.y - height, width, height, fill=PANEL)
+            self.canvas.rect(x, self.y - height, 3, height, fill=BRAND)
+            self.canvas.text(x + 12, self.y - 26, value, 18, True, BRAND)
+            self.canvas.text(x + 12, self.y - 42, label, 8, color=MUTED)
+        self.y -= height + 14
+
+    def table(self, columns: Sequence[Tuple[str, float, str]], rows: Sequence[Sequence[Any]],
+              row_colors: Optional[Sequence[Optional[Color]]] = None):
+        """
+        Table with the header repeated on every page it spans
+
+        Args:
+            columns: (title, width fraction, align) per column
+            rows: Cell values
+            row_colors: Optional text color of each row's last cell
+        """
+        row_height = 17.0
+        widths = [fraction * CONTENT_WIDTH for _, fraction, _ in columns]
+
+        def header():
+            self.canvas.rect(MARGIN, self.y - row_height, CONTENT_WIDTH, row_height, fill=PANEL)
+            x = MARGIN
+            for (title, _, align), width in zip(columns, widths):
+                self._cell(x, width, title, align, 8, True, MUTED)
+                x += width
+            self.y -= row_height
+
+        self.ensure(row_height * 3)
+        header()
+        for index, row in enumerate(rows):
+            if self.ensure(row_height):
+                header()
+            x = MARGIN
+            for column, ((_, _, align), width, value) in enumerate(zip(columns, widths, row)):
+                color = TEXT
+                if row_colors and column == len(columns) - 1 and row_colors[index]:
+                    color = row_colors[index]
+                self._cell(x, width, str(value), align, 8.5, column == 0, color)
+                x += width
+            self.canvas.line([(MARGIN, self.y - row_height), (MARGIN + CONTENT_WIDTH, self.y - row_height)],
+                             RULE, 0.5)
+            self.y -= row_height
+        self.y -= 12
+
+    def _cell(self, x: float, width: float, text: str, align: str, size: float, bold: bool, color: Color):
+        padding = 6.0
+        while len(text) > 1 and text_width(text, size, bold) > width - 2 * padding:
+            text = text[:-2] + "."
+        anchor = x + width - padding if align == "right" else x + padding
+        self.canvas.text(anchor, self.y - 12, text, size, bold, color, align)
+
+    def section(self, section: ReportSection, overview_chart: Optional[Tuple[str, int]] = None):
+        """Lay out one site's report, starting on a new page"""
+        data = section.data
+        self.new_page()
+        self.canvas.text(MARGIN, self.y - 20, section.site, 20, True, TEXT)
+        self.canvas.text(MARGIN, self.y - 36, f"{self.title} - Periode: {section.period}", 9, color=MUTED)
+        self.y -= 50
+
+        self.kpis([
+            (str(data['total_detections']), "Total Deteksi"),
+            (str(data['total_violations']), "Total Pelanggaran"),
+            (f"{data['compliance_rate']}%", "Tingkat Kepatuhan"),
+            (str(data['compliant_workers']), "Pekerja Patuh"),
+        ])
+
+        top = data['top_violations']
+        chart_width, chart_height = CONTENT_WIDTH, 130.0
+        self.heading("Jenis Pelanggaran Teratas", 12)
+        self.place_chart(self.chart(
+            ("top", section.site), chart_width, chart_height,
+            lambda: bar_chart(chart_width, chart_height, [v['type'] for v in top], [v['count'] for v in top],
+                              [SEVERITY_COLORS.get(v['severity'], BRAND) for v in top]),
+        ), chart_width, chart_height)
+        self.table(
+            [("Jenis Pelanggaran", 0.46, "left"), ("Jumlah", 0.16, "right"),
+             ("Persentase", 0.18, "right"), ("Tingkat", 0.20, "right")],
+            [(v['type'], v['count'], f"{v['percentage']}%", v['severity'].upper()) for v in top],
+            [SEVERITY_COLORS.get(v['severity']) for v in top],
+        )
+
+        daily = data.get('daily', [])
+        if daily:
+            self.heading("Pelanggaran Harian", 12)
+            self.place_chart(self.chart(
+                ("daily", section.site), chart_width, 110.0,
+                lambda: line_chart(chart_width, 110.0, [d['date'][5:] for d in daily],
+                                   [d['violations'] for d in daily]),
+            ), chart_width, 110.0)
+
+        cameras = data.get('cameras', [])
+        if cameras:
+            self.heading("Pelanggaran per Kamera", 12)
+            total = max(data['total_violations'], 1)
+            self.table(
+                [("Kamera / Area", 0.6, "left"), ("Pelanggaran", 0.2, "right"), ("Porsi", 0.2, "right")],
+                [(c['camera'], c['violations'], f"{round(c['violations'] / total * 100, 1)}%") for c in cameras],
+            )
+
+        self.heading("Rekomendasi", 12)
+        for recommendation in data['recommendations']:
+            self.paragraph(recommendation, indent=14, bullet="-")
+        self.heading("Tren", 12)
+        self.paragraph(data['trend_summary'], color=MUTED)
+
+        if overview_chart is not None:
+            self.heading("Perbandingan Kepatuhan Antar Lokasi", 12)
+            self.place_chart(overview_chart, chart_width, chart_height)
+
+    def overview(self, sections: Sequence[ReportSection]) -> Tuple[str, int]:
+        """Cover page comparing sites; returns the comparison chart for reuse"""
+        width, height = CONTENT_WIDTH, 130.0
+        chart = self.chart(
+            ("overview",), width, height,
+            lambda: bar_chart(width, height, [s.site for s in sections],
+                              [s.data['compliance_rate'] for s in sections],
+                              value_format="{:.1f}%"),
+        )
+        self.new_page()
+        self.canvas.rect(MARGIN, self.y - 80, CONTENT_WIDTH, 80, fill=BRAND)
+        self.canvas.text(PAGE_WIDTH / 2, self.y - 38, f"SmartAPD {self.title}", 20, True, (1, 1, 1), "center")
+        self.canvas.text(PAGE_WIDTH / 2, self.y - 58, self.subtitle, 10, color=(1, 1, 1), align="center")
+        self.y -= 100
+
+        totals = [s.data for s in sections]
+        persons = sum(d['total_detections'] for d in totals)
+        compliant = sum(d['compliant_workers'] for d in totals)
+        self.kpis([
+            (str(len(sections)), "Lokasi"),
+            (str(persons), "Total Deteksi"),
+            (str(sum(d['total_violations'] for d in totals)), "Total Pelanggaran"),
+            (f"{round(compliant / persons * 100, 1) if persons else 0.0}%", "Kepatuhan Rata-rata"),
+        ])
+        self.heading("Kepatuhan per Lokasi", 12)
+        self.place_chart(chart, width, height)
+        self.table(
+            [("Lokasi", 0.5, "left"), ("Pelanggaran", 0.25, "right"), ("Kepatuhan", 0.25, "right")],
+            [(s.site, s.data['total_violations'], f"{s.data['compliance_rate']}%") for s in sections],
+        )
+        return chart
+
+    def close(self):
+        self.finish_page()
+        self.writer.close(self.title)
+
+    def abort(self):
+        self.writer.abort()
+
+
+def render_report_pdf(path: str, title: str, sections: Sequence[ReportSection],
+                      subtitle: str = "") -> Dict[str, Any]:
+    """
+    Render one or more site reports to a PDF file
+
+    Args:
+        path: Output file path
+        title: Report title
+        sections: Site sections; with more than one, a comparison cover page is added
+        subtitle: Cover page subtitle (e.g. the period)
+
+    Returns:
+        Render statistics (path, pages, charts rendered/placed)
+    """
+    renderer = ReportPdfRenderer(path, title, subtitle)
+    try:
+        overview_chart = renderer.overview(sections) if len(sections) > 1 else None
+        for section in sections:
+            renderer.section(section, overview_chart)
+        renderer.close()
+    except BaseException:
+        renderer.abort()
+        raise
+    return {
+        "path": path,
+        "pages": renderer.writer.page_count,
+        "charts_rendered": renderer.charts_rendered,
+        "charts_placed": renderer.charts_placed,
+    }
@@ -2,9 +2,31 @@
 Auto Reports PDF/Email Generator
 Generates weekly/monthly safety reports and sends via email
 """
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from datetime import date, datetime, timedelta
+from html import escape
+from string import Formatter
+from typing import Dict, Iterable, List, Any, Optional, Tuple, Union
 import os
+import sqlite3
+import threading
+
+from api.mailer import Delivery, Mailer
+from api.pdf import ReportSection, render_report_pdf
+from api.taxonomy import taxonomy
+
+# Rows shown in the top violations table
+REPORT_TOP_VIOLATIONS = 5
+
+# Longest custom report range, and days of aggregates kept per database
+MAX_REPORT_DAYS = 366
+DAILY_CACHE_DAYS = 800
+
+REPORT_TYPES = {
+    # type: (title, trend heading, name of the previous period)
+    "weekly": ("Laporan Keselamatan Mingguan", "Tren Mingguan", "minggu lalu"),
+    "monthly": ("Laporan Keselamatan Bulanan", "Tren Bulanan", "bulan lalu"),
+    "custom": ("Laporan Keselamatan Periode", "Tren Periode", "periode sebelumnya"),
+}
 
 # HTML Template for PDF Report
 REPORT_TEMPLATE = """
@@ -155,7 +177,7 @@ REPORT_TEMPLATE = """
             
             <!-- Trend -->
             <div class="section">
-                <h2>📈 Tren Mingguan</h2>
+                <h2>📈 {trend_title}</h2>
                 <p style="color: #64748b; line-height: 1.6;">
                     {trend_summary}
                 </p>
@@ -172,85 +194,561 @@ REPORT_TEMPLATE = """
 </html>
 """
 
+VIOLATION_ROW_TEMPLATE = """
+                <tr>
+                    <td>{type}</td>
+                    <td><strong>{count}</strong></td>
+                    <td>{percentage}%</td>
+                    <td><span class="badge badge-{severity}">{severity_label}</span></td>
+                </tr>
+            """
+
+RECOMMENDATION_TEMPLATE = (
+    "<li style='margin-bottom: 12px; padding-left: 24px; position: relative;'>"
+    "<span style='position: absolute; left: 0;'>✓</span> {text}</li>"
+)
+
+
+class CompiledTemplate:
+    """
+    str.format-style template parsed once into literal/field parts and
+    rendered with a single join, instead of re-parsing the format string or
+    growing a string with += on every report
+    """
+
+    def __init__(self, source: str):
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(source)
+        ]
+
+    def render(self, values: Dict[str, Any]) -> str:
+        out: List[str] = []
+        self.render_into(out, values)
+        return "".join(out)
+
+    def render_into(self, out: List[str], values: Dict[str, Any]):
+        """Append the rendered pieces to a list builder"""
+        append = out.append
+        for literal, field in self.parts:
+            append(literal)
+            if field is not None:
+                append(str(values[field]))
+
+
+COMPILED_REPORT = CompiledTemplate(REPORT_TEMPLATE)
+COMPILED_VIOLATION_ROW = CompiledTemplate(VIOLATION_ROW_TEMPLATE)
+COMPILED_RECOMMENDATION = CompiledTemplate(RECOMMENDATION_TEMPLATE)
+
+
+class DailyAggregate:
+    """Detection and violation totals of one day"""
+
+    __slots__ = ("detections", "persons", "compliant", "violations")
+
+    def __init__(self):
+        self.detections = 0
+        self.persons = 0
+        self.compliant = 0
+        # (camera, violation type id or raw name) -> count
+        self.violations: Dict[Tuple[str, Union[int, str]], int] = {}
+
+
+class PeriodTotals:
+    """Daily aggregates folded over a report period"""
+
+    def __init__(self, days: Iterable[DailyAggregate]):
+        self.detections = 0
+        self.persons = 0
+        self.compliant = 0
+        self.violations = 0
+        self.by_type: Dict[Union[int, str], int] = {}
+        self.by_camera: Dict[str, int] = {}
+        for day in days:
+            self.detections += day.detections
+            self.persons += day.persons
+            self.compliant += day.compliant
+            for (camera, type_key), count in day.violations.items():
+                self.violations += count
+                self.by_type[type_key] = self.by_type.get(type_key, 0) + count
+                self.by_camera[camera] = self.by_camera.get(camera, 0) + count
+
+    @property
+    def compliance_rate(self) -> float:
+        return round(self.compliant / self.persons * 100.0, 1) if self.persons else 0.0
+
+
+def _type_info(type_key: Union[int, str]) -> Tuple[str, str]:
+    """Display name and severity name of a violation type key"""
+    found = taxonomy.get(type_key) if isinstance(type_key, int) else taxonomy.lookup(type_key)
+    if found is None:
+        return str(type_key), "low"
+    return found.display_name, found.severity_name
+
+
+def _change_pct(current: int, previous: int) -> Optional[float]:
+    if previous == 0:
+        return None
+    return round((current - previous) / previous * 100.0, 1)
+
+
+# (rows, max id) of detections and violations for one day
+DayFingerprint = Tuple[int, Optional[int], int, Optional[int]]
+EMPTY_FINGERPRINT: DayFingerprint = (0, None, 0, None)
+
+
+def _days(first_day: date, last_day: date) -> List[date]:
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+
+def _bounds(first_day: date, last_day: date) -> Tuple[str, str]:
+    return first_day.isoformat(), (last_day + timedelta(days=1)).isoformat()
+
+
+def load_daily_aggregates(conn: sqlite3.Connection, first_day: date,
+                          last_day: date) -> Dict[date, DailyAggregate]:
+    """
+    Per-day aggregates for a range of days, one grouped pass per table
+
+    Memory is bounded by days x cameras x violation types, not by the
+    number of rows in the range.
+    """
+    daily: Dict[date, DailyAggregate] = {}
+
+    def day_entry(value: str) -> DailyAggregate:
+        day = date.fromisoformat(value)
+        entry = daily.get(day)
+        if entry is None:
+            entry = daily[day] = DailyAggregate()
+        return entry
+
+    # Timestamps are ISO strings, so the day is their first 10 characters (cheaper than date())
+    bounds = _bounds(first_day, last_day)
+    for day, detections, persons, compliant in conn.execute(
+        """
+        SELECT substr(timestamp, 1, 10) AS day, COUNT(*),
+               COALESCE(SUM(total_persons), 0), COALESCE(SUM(compliant_persons), 0)
+        FROM detections
+        WHERE timestamp >= ? AND timestamp < ?
+        GROUP BY day
+        """,
+        bounds,
+    ):
+        if day:
+            entry = day_entry(day)
+            entry.detections = detections
+            entry.persons = persons
+            entry.compliant = compliant
+
+    for day, camera, type_id, type_name, count in conn.execute(
+        """
+        SELECT substr(timestamp, 1, 10) AS day, COALESCE(camera_source, '-'),
+               violation_type_id, violation_type, COUNT(*)
+        FROM violations
+        WHERE timestamp >= ? AND timestamp < ?
+        GROUP BY day, camera_source, violation_type_id, violation_type
+        """,
+        bounds,
+    ):
+        if day:
+            key = (camera, type_id if type_id is not None else (type_name or "unknown_violation"))
+            violations = day_entry(day).violations
+            violations[key] = violations.get(key, 0) + count
+    return daily
+
+
+class DailyAggregateCache:
+    """
+    Per-day report aggregates of one database, shared by every report.
+
+    Each request first reads a cheap per-day fingerprint (row count and max
+    id, answered from the timestamp indexes alone) and only re-aggregates the
+    days whose fingerprint changed, so a monthly report reuses the days a
+    weekly one already computed. Requests are serialized, so reports started
+    together (e.g. the Monday schedule for several sites) share the work
+    instead of all scanning the same days at once.
+    """
+
+    def __init__(self, db_path: str, max_days: int = DAILY_CACHE_DAYS):
+        self.db_path = db_path
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._days: Dict[date, Tuple[DayFingerprint, DailyAggregate]] = {}
+
+        # Statistics
+        self.reused_days = 0
+        self.computed_days = 0
+
+    def get_days(self, first_day: date, last_day: date) -> Dict[date, DailyAggregate]:
+        """
+        Aggregates of every day in a range (empty aggregates for days without data)
+
+        Args:
+            first_day: First day of the range
+            last_day: Last day of the range (inclusive)
+
+        Returns:
+            Day -> aggregate
+        """
+        days = _days(first_day, last_day)
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {day: DailyAggregate() for day in days}
+            try:
+                fingerprints = self._fingerprints(conn, first_day, last_day)
+                stale = []
+                for day in days:
+                    cached = self._days.get(day)
+                    if cached is None or cached[0] != fingerprints.get(day, EMPTY_FINGERPRINT):
+                        stale.append(day)
+                self.reused_days += len(days) - len(stale)
+                self.computed_days += len(stale)
+
+                # Re-aggregate consecutive stale days with one query per run
+                for run_first, run_last in self._runs(stale):
+                    loaded = load_daily_aggregates(conn, run_first, run_last)
+                    for day in _days(run_first, run_last):
+                        self._days[day] = (
+                            fingerprints.get(day, EMPTY_FINGERPRINT),
+                            loaded.get(day) or DailyAggregate(),
+                        )
+            finally:
+                conn.close()
+
+            result = {day: self._days[day][1] for day in days}
+            self._evict()
+        return result
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "days": len(self._days),
+            "reused_days": self.reused_days,
+            "computed_days": self.computed_days,
+        }
+
+    def _fingerprints(self, conn: sqlite3.Connection, first_day: date,
+                      last_day: date) -> Dict[date, DayFingerprint]:
+        # One range seek per day on the covering timestamp indexes; much
+        # cheaper than GROUP BY substr(timestamp), which needs a temp B-tree
+        fingerprints: Dict[date, DayFingerprint] = {}
+        for day in _days(first_day, last_day):
+            bounds = _bounds(day, day)
+            detections = conn.execute(
+                "SELECT COUNT(*), MAX(id) FROM detections WHERE timestamp >= ? AND timestamp < ?", bounds
+            ).fetchone()
+            violations = conn.execute(
+                "SELECT COUNT(*), MAX(id) FROM violations WHERE timestamp >= ? AND timestamp < ?", bounds
+            ).fetchone()
+            fingerprint = (detections[0], detections[1], violations[0], violations[1])
+            if fingerprint != EMPTY_FINGERPRINT:
+                fingerprints[day] = fingerprint
+        return fingerprints
+
+    @staticmethod
+    def _runs(days: List[date]) -> List[Tuple[date, date]]:
+        runs: List[Tuple[date, date]] = []
+        for day in days:
+            if runs and runs[-1][1] + timedelta(days=1) == day:
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+        return runs
+
+    def _evict(self):
+        if len(self._days) > self.max_days:
+            for day in sorted(self._days)[:len(self._days) - self.max_days]:
+                del self._days[day]
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return None
+
+
+_daily_caches: Dict[str, DailyAggregateCache] = {}
+_daily_caches_lock = threading.Lock()
+
+
+def get_daily_cache(db_path: str) -> DailyAggregateCache:
+    """Shared aggregate cache of a database"""
+    key = os.path.abspath(db_path)
+    with _daily_caches_lock:
+        cache = _daily_caches.get(key)
+        if cache is None:
+            cache = _daily_caches[key] = DailyAggregateCache(db_path)
+        return cache
+
+
+def format_period(start_date: date, end_date: date) -> str:
+    """Report period as shown in headings, e.g. '10 Jun - 16 Jun 2024'"""
+    return f"{start_date.strftime('%d %b')} - {end_date.strftime('%d %b %Y')}"
+
+
+def report_period(report_type: str, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None,
+                  today: Optional[date] = None) -> Tuple[date, date, date, date]:
+    """
+    Period and comparison period of a report
+
+    Args:
+        report_type: weekly, monthly or custom
+        start_date: First day (custom; for monthly any day of the month)
+        end_date: Last day (weekly and custom)
+        today: Reference day (defaults to today)
+
+    Returns:
+        (start, end, previous start, previous end), all inclusive
+
+    Raises:
+        ValueError: Unknown type or invalid range
+    """
+    today = today or datetime.now().date()
+    if report_type == "weekly":
+        end = end_date or today
+        start = end - timedelta(days=6)
+    elif report_type == "monthly":
+        # Month to date (or the whole month if it is over), compared with
+        # the same days of the month before
+        start = (start_date or today).replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        end = min(next_month - timedelta(days=1), today)
+        if end < start:
+            raise ValueError("Bulan laporan belum dimulai")
+        previous_start = (start - timedelta(days=1)).replace(day=1)
+        previous_end = min(previous_start + (end - start), start - timedelta(days=1))
+        return start, end, previous_start, previous_end
+    elif report_type == "custom":
+        if start_date is None or end_date is None:
+            raise ValueError("Laporan custom membutuhkan tanggal mulai dan selesai")
+        start, end = start_date, end_date
+    else:
+        raise ValueError("Jenis laporan tidak valid")
+
+    if end < start:
+        raise ValueError("Tanggal selesai sebelum tanggal mulai")
+    if (end - start).days + 1 > MAX_REPORT_DAYS:
+        raise ValueError(f"Periode laporan maksimal {MAX_REPORT_DAYS} hari")
+    length = (end - start).days + 1
+    return start, end, start - timedelta(days=length), start - timedelta(days=1)
+
 
 class ReportGenerator:
-    def __init__(self, db_path: str = "logs/detections.db"):
+    def __init__(self, db_path: str = "logs/detections.db", mailer: Optional[Mailer] = None):
         self.db_path = db_path
+        self.daily_cache = get_daily_cache(db_path)
+        self.mailer = mailer
     
-    def generate_weekly_report(self) -> str:
-        """Generate weekly safety report HTML"""
-        # Calculate period
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        period = f"{start_date.strftime('%d %b')} - {end_date.strftime('%d %b %Y')}"
+    def generate_report(self, report_type: str = "weekly", start_date: Optional[date] = None,
+                        end_date: Optional[date] = None) -> Tuple[str, date, date]:
+        """
+        Generate a weekly, monthly or custom-range safety report
         
-        # Get data (mock for now, will query DB later)
-        data = self._get_report_data(start_date, end_date)
+        Args:
+            report_type: weekly, monthly or custom
+            start_date: First day (custom) or a day of the month (monthly)
+            end_date: Last day (weekly and custom)
+            
+        Returns:
+            (HTML, period start, period end)
+            
+        Raises:
+            ValueError: Unknown type or invalid range
+        """
+        report = self.build_report(report_type, start_date, end_date)
+        html = self.render_report(report['title'], report['start'], report['end'],
+                                  report['data'], report['trend_title'])
+        return html, report['start'], report['end']
+    
+    def build_report(self, report_type: str = "weekly", start_date: Optional[date] = None,
+                     end_date: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Report data of a period, for rendering as HTML or PDF
         
-        # Build violation rows
-        violation_rows = ""
+        Returns:
+            Dict with title, trend_title, start, end and data
+            
+        Raises:
+            ValueError: Unknown type or invalid range
+        """
+        start, end, previous_start, previous_end = report_period(report_type, start_date, end_date)
+        title, trend_title, previous_label = REPORT_TYPES[report_type]
+        return {
+            'title': title,
+            'trend_title': trend_title,
+            'start': start,
+            'end': end,
+            'data': self._get_report_data(start, end, previous_label, previous_start, previous_end),
+        }
+    
+    def generate_weekly_report(self, end_date: Optional[date] = None) -> str:
+        """Generate weekly safety report HTML (the 7 days up to and including end_date)"""
+        return self.generate_report("weekly", end_date=end_date)[0]
+    
+    def generate_monthly_report(self, month: Optional[date] = None) -> str:
+        """Generate monthly safety report HTML (month to date for the current month)"""
+        return self.generate_report("monthly", start_date=month)[0]
+    
+    def render_report(self, title: str, start_date: date, end_date: date, data: Dict[str, Any],
+                      trend_title: str = "Tren Mingguan") -> str:
+        """Render report data through the compiled HTML template"""
+        violation_rows: List[str] = []
         for v in data['top_violations']:
-            severity_class = f"badge-{v['severity']}"
-            violation_rows += f"""
-                <tr>
-                    <td>{v['type']}</td>
-                    <td><strong>{v['count']}</strong></td>
-                    <td>{v['percentage']}%</td>
-                    <td><span class="badge {severity_class}">{v['severity'].upper()}</span></td>
-                </tr>
-            """
+            COMPILED_VIOLATION_ROW.render_into(violation_rows, {
+                'type': escape(v['type']),
+                'count': v['count'],
+                'percentage': v['percentage'],
+                'severity': v['severity'],
+                'severity_label': v['severity'].upper(),
+            })
         
-        # Build recommendations
-        recommendations = ""
+        recommendations: List[str] = []
         for rec in data['recommendations']:
-            recommendations += f"<li style='margin-bottom: 12px; padding-left: 24px; position: relative;'>"
-            recommendations += f"<span style='position: absolute; left: 0;'>✓</span> {rec}</li>"
+            COMPILED_RECOMMENDATION.render_into(recommendations, {'text': escape(rec)})
         
-        # Fill template
-        html = REPORT_TEMPLATE.format(
-            report_title="Laporan Keselamatan Mingguan",
-            period=period,
-            total_detections=data['total_detections'],
-            total_violations=data['total_violations'],
-            compliance_rate=data['compliance_rate'],
-            compliant_workers=data['compliant_workers'],
-            violation_rows=violation_rows,
-            recommendations=recommendations,
-            trend_summary=data['trend_summary'],
-            generated_at=datetime.now().strftime('%d %B %Y, %H:%M WIB')
-        )
+        return COMPILED_REPORT.render({
+            'report_title': title,
+            'period': format_period(start_date, end_date),
+            'total_detections': data['total_detections'],
+            'total_violations': data['total_violations'],
+            'compliance_rate': data['compliance_rate'],
+            'compliant_workers': data['compliant_workers'],
+            'violation_rows': "".join(violation_rows),
+            'recommendations': "".join(recommendations),
+            'trend_title': trend_title,
+            'trend_summary': escape(data['trend_summary']),
+            'generated_at': datetime.now().strftime('%d %B %Y, %H:%M WIB'),
+        })
+    
+    def _get_report_data(self, start_date: date, end_date: date,
+                         previous_label: str = "periode sebelumnya",
+                         previous_start: Optional[date] = None,
+                         previous_end: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Aggregate report data for a period and its comparison period
         
-        return html
+        Args:
+            start_date: First day of the period
+            end_date: Last day of the period (inclusive)
+            previous_label: How the previous period is named in the trend text
+            previous_start: First day of the comparison period (default: the
+                equally long period right before)
+            previous_end: Last day of the comparison period
+            
+        Returns:
+            Report data (totals, top violations, trend and recommendations)
+        """
+        if previous_start is None or previous_end is None:
+            length = (end_date - start_date).days + 1
+            previous_start = start_date - timedelta(days=length)
+            previous_end = start_date - timedelta(days=1)
+        
+        if previous_end + timedelta(days=1) == start_date:
+            daily = self.daily_cache.get_days(previous_start, end_date)
+        else:
+            # Skip the days between e.g. May 1-16 and June 1-16
+            daily = self.daily_cache.get_days(previous_start, previous_end)
+            daily.update(self.daily_cache.get_days(start_date, end_date))
+        current_days = _days(start_date, end_date)
+        current = PeriodTotals(daily[d] for d in current_days)
+        previous = PeriodTotals(daily[d] for d in _days(previous_start, previous_end))
+        data = self._build_report_data(current, previous, previous_label)
+        data['daily'] = [
+            {'date': d.isoformat(), 'violations': sum(daily[d].violations.values())} for d in current_days
+        ]
+        return data
     
-    def _get_report_data(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
-        """Get report data from database (mock for now)"""
-        # TODO: Query actual database
+    def _build_report_data(self, current: PeriodTotals, previous: PeriodTotals,
+                           previous_label: str) -> Dict[str, Any]:
+        top_violations = []
+        ranked = sorted(current.by_type.items(), key=lambda item: (-item[1], str(item[0])))
+        for type_key, count in ranked[:REPORT_TOP_VIOLATIONS]:
+            name, severity = _type_info(type_key)
+            top_violations.append({
+                'type': name,
+                'count': count,
+                'percentage': round(count / current.violations * 100.0, 1),
+                'severity': severity,
+            })
+        
+        compliance_change = (
+            round(current.compliance_rate - previous.compliance_rate, 1) if previous.persons else None
+        )
+        violations_change = _change_pct(current.violations, previous.violations)
+        
         return {
-            'total_detections': 245,
-            'total_violations': 42,
-            'compliance_rate': 82.9,
-            'compliant_workers': 203,
-            'top_violations': [
-                {'type': 'Tidak Pakai Helm', 'count': 18, 'percentage': 42.9, 'severity': 'high'},
-                {'type': 'Tidak Pakai Rompi', 'count': 12, 'percentage': 28.6, 'severity': 'medium'},
-                {'type': 'Tidak Pakai Sarung Tangan', 'count': 8, 'percentage': 19.0, 'severity': 'medium'},
-                {'type': 'Tidak Pakai Kacamata', 'count': 4, 'percentage': 9.5, 'severity': 'low'},
-            ],
-            'recommendations': [
-                "Tingkatkan pengawasan di area Workshop A (18 pelanggaran helm)",
-                "Adakan briefing keselamatan setiap pagi shift",
-                "Pasang signage peringatan APD di pintu masuk area kerja",
-                "Berikan reward untuk tim dengan compliance rate >95%"
+            'total_detections': current.persons,
+            'total_violations': current.violations,
+            'compliance_rate': current.compliance_rate,
+            'compliant_workers': current.compliant,
+            'top_violations': top_violations,
+            'cameras': [
+                {'camera': camera, 'violations': count}
+                for camera, count in sorted(current.by_camera.items(), key=lambda item: (-item[1], item[0]))
             ],
-            'trend_summary': "Tingkat kepatuhan meningkat 5.2% dibanding minggu lalu. "
-                           "Pelanggaran helm menurun 23%, namun pelanggaran rompi masih tinggi di shift malam. "
-                           "Rekomendasi: fokus monitoring shift 19:00-23:00."
+            'recommendations': self._recommendations(current, top_violations),
+            'trend': {
+                'compliance_change': compliance_change,
+                'violations_change_pct': violations_change,
+                'previous_violations': previous.violations,
+            },
+            'trend_summary': self._trend_summary(current, previous, compliance_change, previous_label),
         }
     
-    def save_pdf(self, html: str, filename: str) -> str:
-        """Save HTML as PDF (requires wkhtmltopdf or pdfkit)"""
-        # TODO: Implement PDF conversion
-        # For now, save as HTML
+    def _trend_summary(self, current: PeriodTotals, previous: PeriodTotals,
+                       compliance_change: Optional[float], previous_label: str) -> str:
+        if not previous.persons and not previous.violations:
+            return f"Belum ada data {previous_label} untuk perbandingan."
+        
+        sentences = []
+        if compliance_change is not None:
+            if compliance_change > 0:
+                sentences.append(f"Tingkat kepatuhan meningkat {compliance_change}% dibanding {previous_label}.")
+            elif compliance_change < 0:
+                sentences.append(f"Tingkat kepatuhan menurun {abs(compliance_change)}% dibanding {previous_label}.")
+            else:
+                sentences.append(f"Tingkat kepatuhan stabil dibanding {previous_label}.")
+        
+        # Violation type that changed the most
+        changes = []
+        for type_key in set(current.by_type) | set(previous.by_type):
+            now_count = current.by_type.get(type_key, 0)
+            before = previous.by_type.get(type_key, 0)
+            if now_count != before:
+                changes.append((abs(now_count - before), str(type_key), type_key, now_count, before))
+        if changes:
+            _, _, type_key, now_count, before = max(changes)
+            name, _ = _type_info(type_key)
+            pct = _change_pct(now_count, before)
+            if pct is None:
+                sentences.append(f"Pelanggaran {name} muncul {now_count} kali, tidak ada pada {previous_label}.")
+            else:
+                direction = "meningkat" if pct > 0 else "menurun"
+                sentences.append(f"Pelanggaran {name} {direction} {abs(pct)}%.")
+        return " ".join(sentences) or f"Tidak ada perubahan dibanding {previous_label}."
+    
+    def _recommendations(self, current: PeriodTotals, top_violations: List[Dict[str, Any]]) -> List[str]:
+        if not current.violations:
+            return ["Pertahankan kepatuhan APD dan lanjutkan pemantauan rutin"]
+        
+        recommendations = []
+        camera, count = max(current.by_camera.items(), key=lambda item: (item[1], item[0]))
+        recommendations.append(f"Tingkatkan pengawasan di area {camera} ({count} pelanggaran)")
+        top = top_violations[0]
+        recommendations.append(
+            f"Fokuskan inspeksi pada pelanggaran {top['type']} ({top['percentage']}% dari total)"
+        )
+        if current.compliance_rate < 90:
+            recommendations.append("Adakan briefing keselamatan setiap pagi shift")
+            recommendations.append("Pasang signage peringatan APD di pintu masuk area kerja")
+        if current.compliance_rate >= 95:
+            recommendations.append("Berikan reward untuk tim dengan compliance rate >95%")
+        return recommendations
+    
+    def save_html(self, html: str, filename: str) -> str:
+        """Save report HTML to logs/reports"""
         output_path = f"logs/reports/{filename}.html"
         os.makedirs("logs/reports", exist_ok=True)
         
@@ -259,18 +757,44 @@ class ReportGenerator:
         
         return output_path
     
-    def send_email(self, to_email: str, subject: str, html_body: str, pdf_path: str = None):
-        """Send email with report (requires SMTP config)"""
-        # TODO: Implement email sending
-        print(f"📧 Email would be sent to: {to_email}")
-        print(f"   Subject: {subject}")
-        print(f"   PDF: {pdf_path}")
-        pass
+    def save_pdf(self, report: Dict[str, Any], filename: str, site: str = "SmartAPD") -> str:
+        """
+        Render a report (see build_report) to logs/reports as PDF
+        
+        Args:
+            report: Report from build_report
+            filename: File name without extension
+            site: Site name shown in the report heading
+            
+        Returns:
+            Path of the PDF file
+        """
+        os.makedirs("logs/reports", exist_ok=True)
+        output_path = f"logs/reports/{filename}.pdf"
+        period = format_period(report['start'], report['end'])
+        render_report_pdf(output_path, report['title'], [ReportSection(site, period, report['data'])], period)
+        return output_path
+    
+    def send_email(self, recipients: Iterable[str], subject: str, html_body: str,
+                   pdf_path: Optional[str] = None) -> Optional[Delivery]:
+        """
+        Queue the report email to all recipients (sent on the mailer thread)
+        
+        Returns:
+            Delivery to follow progress, or None when SMTP is not configured
+        """
+        recipients = list(recipients)
+        if self.mailer is None:
+            print(f"📧 SMTP not configured, email not sent to {len(recipients)} recipient(s)")
+            print(f"   Subject: {subject}")
+            print(f"   PDF: {pdf_path}")
+            return None
+        return self.mailer.submit(recipients, subject, html_body, pdf_path)
 
 
 # Example usage
 if __name__ == "__main__":
     generator = ReportGenerator()
-    html = generator.generate_weekly_report()
-    pdf_path = generator.save_pdf(html, f"weekly_report_{datetime.now().strftime('%Y%m%d')}")
+    report = generator.build_report("weekly")
+    pdf_path = generator.save_pdf(report, f"weekly_report_{datetime.now().strftime('%Y%m%d')}")
     print(f"✅ Report generated: {pdf_path}")
@@ -0,0 +1,236 @@
+"""
+Live Video Streaming Hub
+Receives JPEG frames from detector processes and fans the same bytes out to
+every MJPEG/WebSocket viewer, dropping frames per client instead of queueing
+"""
+import asyncio
+import json
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+# Wire format between detector (src/stream_publisher.py) and API:
+#   publisher -> hub: one JSON hello line, then frames as !I length + JPEG bytes
+#   hub -> publisher: JSON control lines {"active", "max_width", "quality"}
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+
+MJPEG_BOUNDARY = "frame"
+
+# (max_width, jpeg_quality) from best to cheapest
+QUALITY_LADDER: List[Tuple[int, int]] = [(1280, 80), (960, 70), (640, 60), (480, 50)]
+ADAPT_EVERY_FRAMES = 30
+DEGRADE_DROP_RATIO = 0.5
+UPGRADE_DROP_RATIO = 0.1
+
+
+class StreamSubscriber:
+    """Single viewer holding at most one pending frame"""
+
+    def __init__(self):
+        self._pending: Optional[Tuple[bytes, bytes]] = None
+        self._event = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, jpeg: bytes, part: bytes):
+        """Replace the pending frame; an unsent older frame counts as dropped"""
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = (jpeg, part)
+        self._event.set()
+
+    async def next_frame(self) -> Tuple[bytes, bytes]:
+        """Wait for the newest frame as (jpeg, multipart part)"""
+        while self._pending is None:
+            self._event.clear()
+            await self._event.wait()
+        frame, self._pending = self._pending, None
+        self.sent += 1
+        return frame
+
+
+class CameraStream:
+    """Frames of one camera, encoded once by the publisher and shared by all viewers"""
+
+    def __init__(self, camera_id: str):
+        self.camera_id = camera_id
+        self.subscribers: Set[StreamSubscriber] = set()
+        self.latest: Optional[bytes] = None
+        self.latest_at: Optional[float] = None
+        self.frames_received = 0
+        self.tier = 0
+        self._publisher: Optional[asyncio.StreamWriter] = None
+        self._window_sent = 0
+        self._window_dropped = 0
+
+    @property
+    def online(self) -> bool:
+        return self._publisher is not None
+
+    def subscribe(self) -> StreamSubscriber:
+        subscriber = StreamSubscriber()
+        self.subscribers.add(subscriber)
+        if self.latest is not None:
+            subscriber.offer(self.latest, self._build_part(self.latest))
+        if len(self.subscribers) == 1:
+            self.send_control()
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber):
+        self.subscribers.discard(subscriber)
+        if not self.subscribers:
+            self.send_control()
+
+    def attach_publisher(self, writer: asyncio.StreamWriter):
+        self._publisher = writer
+        self.send_control()
+
+    def detach_publisher(self, writer: asyncio.StreamWriter):
+        if self._publisher is writer:
+            self._publisher = None
+
+    def publish_frame(self, jpeg: bytes):
+        """Fan one encoded frame out to every viewer"""
+        self.latest = jpeg
+        self.latest_at = time.time()
+        self.frames_received += 1
+
+        # Multipart chunk is built once and shared by all MJPEG viewers
+        part = self._build_part(jpeg)
+        for subscriber in self.subscribers:
+            before = subscriber.dropped
+            subscriber.offer(jpeg, part)
+            self._window_dropped += subscriber.dropped - before
+            self._window_sent += 1
+
+        if self.frames_received % ADAPT_EVERY_FRAMES == 0:
+            self._adapt()
+
+    def send_control(self):
+        """Tell the publisher whether to encode and at which size/quality"""
+        if self._publisher is None:
+            return
+        max_width, quality = QUALITY_LADDER[self.tier]
+        control = {
+            "active": bool(self.subscribers),
+            "max_width": max_width,
+            "quality": quality,
+        }
+        try:
+            self._publisher.write((json.dumps(control) + "\n").encode("utf-8"))
+        except Exception as e:
+            print(f"Error sending stream control to {self.camera_id}: {e}")
+
+    def status(self) -> Dict[str, object]:
+        max_width, quality = QUALITY_LADDER[self.tier]
+        return {
+            "camera_id": self.camera_id,
+            "online": self.online,
+            "viewers": len(self.subscribers),
+            "frames_received": self.frames_received,
+            "last_frame_at": self.latest_at,
+            "max_width": max_width,
+            "quality": quality,
+        }
+
+    def _adapt(self):
+        """Step down the quality ladder when viewers fall behind, up when they keep up"""
+        offered = self._window_sent
+        drop_ratio = self._window_dropped / offered if offered else 0.0
+        self._window_sent = 0
+        self._window_dropped = 0
+
+        tier = self.tier
+        if drop_ratio > DEGRADE_DROP_RATIO and tier < len(QUALITY_LADDER) - 1:
+            tier += 1
+        elif drop_ratio < UPGRADE_DROP_RATIO and tier > 0:
+            tier -= 1
+
+        if tier != self.tier:
+            self.tier = tier
+            self.send_control()
+
+    @staticmethod
+    def _build_part(jpeg: bytes) -> bytes:
+        header = (
+            f"--{MJPEG_BOUNDARY}\r\n"
+            "Content-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n"
+        ).encode("ascii")
+        return header + jpeg + b"\r\n"
+
+
+class StreamHub:
+    """Registry of camera streams plus the local ingest server for publishers"""
+
+    def __init__(self):
+        self.cameras: Dict[str, CameraStream] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    def find(self, camera_id: str) -> Optional[CameraStream]:
+        """Stream of a camera that has published, without registering unknown ids"""
+        return self.cameras.get(camera_id)
+
+    def get(self, camera_id: str) -> CameraStream:
+        """Stream of a camera, registered on first use (publishers only)"""
+        stream = self.cameras.get(camera_id)
+        if stream is None:
+            stream = CameraStream(camera_id)
+            self.cameras[camera_id] = stream
+        return stream
+
+    def status(self) -> List[Dict[str, object]]:
+        return [stream.status() for stream in self.cameras.values()]
+
+    async def start_ingest(self, host: str, port: int):
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle_publisher, host, port)
+        print(f"📹 Stream ingest listening on {host}:{port}")
+
+    async def stop(self):
+        for task in list(self._handlers):
+            task.cancel()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_publisher(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        stream: Optional[CameraStream] = None
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            hello = json.loads((await reader.readline()).decode("utf-8") or "{}")
+            camera_id = str(hello.get("camera_id") or "")
+            if not camera_id:
+                return
+
+            stream = self.get(camera_id)
+            stream.attach_publisher(writer)
+            print(f"📹 Stream publisher connected: {camera_id}")
+
+            while True:
+                (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                if size > MAX_FRAME_BYTES:
+                    print(f"Stream frame too large from {camera_id}: {size} bytes")
+                    return
+                stream.publish_frame(await reader.readexactly(size))
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"Stream ingest error: {e}")
+        finally:
+            self._handlers.discard(task)
+            if stream is not None:
+                stream.detach_publisher(writer)
+                print(f"📹 Stream publisher disconnected: {stream.camera_id}")
+            writer.close()
+
+
+# Global stream hub
+hub = StreamHub()
@@ -0,0 +1,150 @@
+"""
+Violation Taxonomy
+In-memory view of the violation_types dimension table (integer code,
+display name, severity) shared by alert routing, KPIs and filters
+"""
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+# Types, codes and table schema are defined once, next to the detector's database
+from src.taxonomy import (
+    SEVERITY_HIGH, SEVERITY_LOW, SEVERITY_MEDIUM, SEVERITY_NAMES,
+    VIOLATION_TYPES as DEFAULT_VIOLATION_TYPES, create_violation_types, keyword_code,
+    normalize_code, resolve_code_sql,
+)
+
+SEVERITY_LEVELS = {name: level for level, name in SEVERITY_NAMES.items()}
+
+# Raw names remembered per taxonomy; events repeat a handful of spellings
+MAX_LOOKUP_CACHE = 1024
+
+
+class ViolationType(NamedTuple):
+    id: int
+    code: str
+    display_name: str
+    severity: int
+
+    @property
+    def severity_name(self) -> str:
+        return SEVERITY_NAMES.get(self.severity, "low")
+
+
+class ViolationTaxonomy:
+    """
+    Violation types by integer id and by code.
+
+    Lookups by raw name are memoized, so alert routing and KPI updates do
+    one dictionary hit per event instead of normalizing strings. Raw labels
+    that are not a code fall back to keyword matching ('Tidak Pakai Helm' ->
+    no_helmet); other types the table does not know are low severity.
+    """
+
+    def __init__(self, types=DEFAULT_VIOLATION_TYPES):
+        self._lock = threading.Lock()
+        self._replace([ViolationType(*row) for row in types])
+
+    def lookup(self, value: Optional[str]) -> Optional[ViolationType]:
+        """
+        Find a violation type by its code or a raw name
+
+        Args:
+            value: Violation type as stored or sent by the detector
+
+        Returns:
+            Violation type, or None if unknown
+        """
+        if not value:
+            return None
+        lookups = self._lookups
+        if value in lookups:
+            return lookups[value]
+        found = self._by_code.get(normalize_code(value))
+        if found is None:
+            code = keyword_code(value)
+            found = self._by_code.get(code) if code else None
+        if len(lookups) < MAX_LOOKUP_CACHE:
+            lookups[value] = found
+        return found
+
+    def get(self, type_id: int) -> Optional[ViolationType]:
+        return self._by_id.get(type_id)
+
+    def severity(self, value: Optional[str]) -> int:
+        """Severity level of a violation type name (low if unknown)"""
+        found = self.lookup(value)
+        return found.severity if found else SEVERITY_LOW
+
+    def severity_name(self, value: Optional[str]) -> str:
+        return SEVERITY_NAMES.get(self.severity(value), "low")
+
+    def ids_with_severity(self, minimum: int) -> List[int]:
+        """Integer codes of the types at or above a severity level"""
+        return sorted(t.id for t in self._by_id.values() if t.severity >= minimum)
+
+    def ensure_table(self, conn: sqlite3.Connection):
+        """
+        Create and seed violation_types, add violations.violation_type_id
+        and fill it for rows written without one
+        """
+        cursor = conn.cursor()
+        create_violation_types(cursor)
+
+        cursor.execute("PRAGMA table_info(violations)")
+        if "violation_type_id" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE violations ADD COLUMN violation_type_id INTEGER")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_violations_type ON violations(violation_type_id, timestamp)"
+        )
+
+        # Writers that only set violation_type (older detectors, scripts) still get a code,
+        # resolved like lookup() (keywords included); recreated so it follows the taxonomy
+        new_code = resolve_code_sql("NEW.violation_type")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_violations_type_id")
+        cursor.execute(
+            f"""
+            CREATE TRIGGER trg_violations_type_id
+            AFTER INSERT ON violations
+            WHEN NEW.violation_type_id IS NULL AND NEW.violation_type IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO violation_types (code, display_name, severity)
+                VALUES ({new_code}, NEW.violation_type, {SEVERITY_LOW});
+                UPDATE violations
+                SET violation_type_id = (SELECT id FROM violation_types WHERE code = {new_code})
+                WHERE id = NEW.id;
+            END
+            """
+        )
+
+        code = resolve_code_sql("violation_type")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO violation_types (code, display_name, severity)
+            SELECT DISTINCT {code}, violation_type, {SEVERITY_LOW}
+            FROM violations
+            WHERE violation_type_id IS NULL AND violation_type IS NOT NULL
+            """
+        )
+        cursor.execute(
+            f"""
+            UPDATE violations
+            SET violation_type_id = (SELECT id FROM violation_types WHERE code = {code})
+            WHERE violation_type_id IS NULL AND violation_type IS NOT NULL
+            """
+        )
+
+    def load(self, conn: sqlite3.Connection):
+        """Replace the in-memory types with the rows of violation_types"""
+        rows = conn.execute("SELECT id, code, display_name, severity FROM violation_types").fetchall()
+        self._replace([ViolationType(row[0], row[1], row[2] or row[1], row[3]) for row in rows])
+
+    def _replace(self, types: List[ViolationType]):
+        with self._lock:
+            # Swapped as whole dicts so readers never see a half-built state
+            self._by_id: Dict[int, ViolationType] = {t.id: t for t in types}
+            self._by_code: Dict[str, ViolationType] = {t.code: t for t in types}
+            self._lookups: Dict[str, Optional[ViolationType]] = {}
+
+
+taxonomy = ViolationTaxonomy()
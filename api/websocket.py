@@ -3,63 +3,430 @@ WebSocket Real-time Event Pipeline
 Handles real-time violation alerts with deduplication and cooldown
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set, List
+from typing import Any, Deque, Dict, Iterable, Set, List, Optional, Tuple
+from collections import deque
 import asyncio
+import heapq
 import json
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
+
+from api.taxonomy import taxonomy
+
+# Per-client outgoing queue limit and send timeout
+CLIENT_QUEUE_SIZE = 100
+CLIENT_SEND_TIMEOUT = 10.0
+
+# Alert cooldown and maximum number of alert IDs remembered
+ALERT_COOLDOWN_SECONDS = 60
+ALERT_CACHE_SIZE = 10000
+
+# Subscription filter name -> message topic key
+TOPIC_DIMENSIONS = {
+    "cameras": "camera",
+    "zones": "zone",
+    "severities": "severity",
+    "types": "type",
+}
+
+# stats_update delivery: "full" sends every update as is, "delta" sends
+# batched changed fields with a per-topic sequence number
+STATS_MODES = ("full", "delta")
+STATS_MODE_DIMENSION = "stats_mode"
+STATS_GLOBAL_TOPIC = "*"
+STATS_TICK_SECONDS = 1.0
+
+
+class ClientConnection:
+    """Dashboard connection with its own bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, max_queue: int = CLIENT_QUEUE_SIZE):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        # Topic key -> accepted values; None accepts everything
+        self.filters: Dict[str, Optional[Set[str]]] = {dim: None for dim in TOPIC_DIMENSIONS.values()}
+        self.filters[STATS_MODE_DIMENSION] = {"full"}
+        # Entries are [coalesce_key, payload]; payload is None once sent or dropped
+        self._queue: Deque[List[Any]] = deque()
+        self._coalesce: Dict[str, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def matches(self, dimension: str, value: str) -> bool:
+        accepted = self.filters.get(dimension)
+        return accepted is None or value in accepted
+
+    def start(self, on_close):
+        self._task = asyncio.create_task(self._writer(on_close))
+
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None):
+        """
+        Queue an already serialized message without waiting for the client.
+        A newer message with the same coalesce key replaces the queued one.
+        """
+        if self.closed:
+            return
+
+        if coalesce_key is not None:
+            entry = self._coalesce.get(coalesce_key)
+            if entry is not None and entry[1] is not None:
+                entry[1] = payload
+                return
+
+        if len(self._queue) >= self.max_queue:
+            self._drop_one()
+
+        entry = [coalesce_key, payload]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._coalesce[coalesce_key] = entry
+        self._wakeup.set()
+
+    async def close(self):
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def _drop_one(self):
+        """Drop the oldest replaceable message, or the oldest message if none is"""
+        victim = next((entry for entry in self._queue if entry[0] is not None), None)
+        if victim is None:
+            victim = self._queue[0]
+        self._queue.remove(victim)
+        self._forget(victim)
+        self.dropped += 1
+
+    def _forget(self, entry: List[Any]):
+        if entry[0] is not None and self._coalesce.get(entry[0]) is entry:
+            del self._coalesce[entry[0]]
+        entry[1] = None
+
+    async def _writer(self, on_close):
+        try:
+            while not self.closed:
+                while self._queue:
+                    entry = self._queue.popleft()
+                    payload = entry[1]
+                    self._forget(entry)
+                    await asyncio.wait_for(self.websocket.send_text(payload), CLIENT_SEND_TIMEOUT)
+                self._wakeup.clear()
+                await self._wakeup.wait()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error sending to client: {e}")
+        finally:
+            self.closed = True
+            on_close(self)
+
+
+class AlertDedupCache:
+    """Alert IDs suppressed until their cooldown expires, bounded in size"""
+
+    def __init__(self, max_size: int = ALERT_CACHE_SIZE):
+        self.max_size = max_size
+        self._expires: Dict[str, float] = {}
+        # (expiry, alert_id), soonest expiry first
+        self._heap: List[Tuple[float, str]] = []
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def __contains__(self, alert_id: str) -> bool:
+        expiry = self._expires.get(alert_id)
+        return expiry is not None and expiry > time.monotonic()
+
+    def check_and_add(self, alert_id: str, ttl_seconds: float) -> bool:
+        """
+        Record an alert unless it is still cooling down
+
+        Args:
+            alert_id: Alert identifier
+            ttl_seconds: Cooldown for this alert
+
+        Returns:
+            True if the alert is new (should be sent), False if suppressed
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        if alert_id in self._expires:
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        expiry = now + ttl_seconds
+        self._expires[alert_id] = expiry
+        heapq.heappush(self._heap, (expiry, alert_id))
+
+        # Over capacity: forget the alerts closest to expiring
+        while len(self._expires) > self.max_size:
+            self._pop()
+            self.evicted += 1
+        return True
+
+    def get_statistics(self) -> Dict[str, int]:
+        return {
+            "size": len(self._expires),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    def _expire(self, now: float):
+        while self._heap and self._heap[0][0] <= now:
+            if self._pop():
+                self.expired += 1
+
+    def _pop(self) -> bool:
+        """Remove the soonest-expiring entry; False if the heap entry was stale"""
+        expiry, alert_id = heapq.heappop(self._heap)
+        if self._expires.get(alert_id) == expiry:
+            del self._expires[alert_id]
+            return True
+        return False
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.alert_cache: Dict[str, datetime] = {}  # For cooldown
-        self.sent_alerts: Set[str] = set()  # For deduplication
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.alert_cache = AlertDedupCache()  # Deduplication within the cooldown
+        # Subscribers indexed by topic value, plus clients accepting any value
+        dimensions = list(TOPIC_DIMENSIONS.values()) + [STATS_MODE_DIMENSION]
+        self._topic_index: Dict[str, Dict[str, Set[ClientConnection]]] = {dim: {} for dim in dimensions}
+        self._wildcards: Dict[str, Set[ClientConnection]] = {dim: set() for dim in dimensions}
+        # Delta stats: last flushed snapshot, sequence and pending update per topic
+        self._stats_state: Dict[str, Dict[str, Any]] = {}
+        self._stats_seq: Dict[str, int] = {}
+        self._stats_pending: Dict[str, Dict[str, Any]] = {}
+        self._stats_flush: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        print(f"✅ Client connected. Total: {len(self.active_connections)}")
+        client = ClientConnection(websocket)
+        self.clients[websocket] = client
+        self._index(client)
+        client.start(self._on_client_closed)
+        print(f"✅ Client connected. Total: {len(self.clients)}")
         
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        print(f"❌ Client disconnected. Total: {len(self.active_connections)}")
-        
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                disconnected.append(connection)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            self._unindex(client)
+            client.closed = True
+            if client._task is not None:
+                client._task.cancel()
+        print(f"❌ Client disconnected. Total: {len(self.clients)}")
+
+    def _on_client_closed(self, client: ClientConnection):
+        # Writer failed or timed out: the client is gone or too slow
+        if self.clients.get(client.websocket) is client:
+            del self.clients[client.websocket]
+            self._unindex(client)
+            print(f"❌ Client dropped. Total: {len(self.clients)}")
         
-        # Clean up disconnected clients
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
+    async def broadcast(self, message: dict, coalesce_key: Optional[str] = None,
+                        topic: Optional[Dict[str, Any]] = None):
+        """
+        Broadcast message to subscribed clients (serialized once, queued per client)
+
+        Args:
+            message: Message to send
+            coalesce_key: Key under which a newer message replaces a queued one
+            topic: Routing values, e.g. {"camera": ..., "zone": ..., "severity": ...}
+        """
+        route = {"type": message.get("type")}
+        if topic:
+            route.update(topic)
+
+        recipients = list(self._route(route))
+        if not recipients:
+            return
+        payload = json.dumps(message, default=str)
+        for client in recipients:
+            client.enqueue(payload, coalesce_key)
+
+    def subscribe(self, websocket: WebSocket, request: Dict[str, Any]) -> Dict[str, Optional[List[str]]]:
+        """
+        Replace a client's subscription filters
+
+        Args:
+            websocket: Client connection
+            request: {"cameras": [...], "zones": [...], "severities": [...], "types": [...]};
+                     a missing or empty filter accepts everything. An optional
+                     "stats_mode" ("full" or "delta") selects stats delivery.
+
+        Returns:
+            Filters now in effect
+        """
+        client = self.clients.get(websocket)
+        if client is None:
+            return {}
+
+        previous_mode = self._stats_mode(client)
+        self._unindex(client)
+        for name, dim in TOPIC_DIMENSIONS.items():
+            values = request.get(name)
+            if isinstance(values, str):
+                values = [values]
+            client.filters[dim] = {str(v) for v in values} if values else None
+        if request.get("stats_mode") in STATS_MODES:
+            client.filters[STATS_MODE_DIMENSION] = {request["stats_mode"]}
+        self._index(client)
+
+        # Delta clients start from a snapshot of every topic they can see
+        if self._stats_mode(client) == "delta" and previous_mode != "delta":
+            self._send_stats_snapshots(client)
+
+        filters: Dict[str, Any] = {
+            name: sorted(client.filters[dim]) if client.filters[dim] is not None else None
+            for name, dim in TOPIC_DIMENSIONS.items()
+        }
+        filters["stats_mode"] = self._stats_mode(client)
+        return filters
+
+    def resync(self, websocket: WebSocket, topic: Optional[str] = None):
+        """
+        Resend stats snapshots after a client detected a sequence gap
+
+        Args:
+            websocket: Client connection
+            topic: Stats topic to resend, or None for all
+        """
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._send_stats_snapshots(client, topic)
+
+    @staticmethod
+    def _stats_mode(client: ClientConnection) -> str:
+        return next(iter(client.filters[STATS_MODE_DIMENSION]))
+
+    def _send_stats_snapshots(self, client: ClientConnection, topic: Optional[str] = None):
+        topics = [topic] if topic is not None else list(self._stats_state)
+        for name in topics:
+            if name not in self._stats_state:
+                continue
+            if name != STATS_GLOBAL_TOPIC and not client.matches("camera", name):
+                continue
+            client.enqueue(json.dumps({
+                "type": "stats_snapshot",
+                "topic": name,
+                "seq": self._stats_seq[name],
+                "data": self._stats_state[name],
+                "timestamp": datetime.now().isoformat()
+            }, default=str))
+
+    def _flush_stats(self):
+        """Send one delta per changed stats topic since the last tick"""
+        self._stats_flush = None
+        pending, self._stats_pending = self._stats_pending, {}
+
+        for name, stats in pending.items():
+            previous = self._stats_state.get(name, {})
+            changes = {key: value for key, value in stats.items()
+                       if key not in previous or previous[key] != value}
+            removed = [key for key in previous if key not in stats]
+            if not changes and not removed and name in self._stats_state:
+                continue
+
+            self._stats_state[name] = stats
+            seq = self._stats_seq.get(name, 0) + 1
+            self._stats_seq[name] = seq
+
+            route = {"type": "stats_update", STATS_MODE_DIMENSION: "delta"}
+            if name != STATS_GLOBAL_TOPIC:
+                route["camera"] = name
+            recipients = list(self._route(route))
+            if not recipients:
+                continue
+
+            payload = json.dumps({
+                "type": "stats_delta",
+                "topic": name,
+                "seq": seq,
+                "changes": changes,
+                "removed": removed,
+                "timestamp": datetime.now().isoformat()
+            }, default=str)
+            for client in recipients:
+                # Never coalesced: a dropped delta shows up as a sequence gap
+                client.enqueue(payload)
+
+    def _index(self, client: ClientConnection):
+        for dim, accepted in client.filters.items():
+            if accepted is None:
+                self._wildcards[dim].add(client)
+            else:
+                for value in accepted:
+                    self._topic_index[dim].setdefault(value, set()).add(client)
+
+    def _unindex(self, client: ClientConnection):
+        for dim, accepted in client.filters.items():
+            if accepted is None:
+                self._wildcards[dim].discard(client)
+                continue
+            index = self._topic_index[dim]
+            for value in accepted:
+                subscribers = index.get(value)
+                if subscribers is not None:
+                    subscribers.discard(client)
+                    if not subscribers:
+                        del index[value]
+
+    def _route(self, route: Dict[str, Any]) -> Iterable[ClientConnection]:
+        """Clients whose filters accept every routing value of a message"""
+        route = {dim: str(value) for dim, value in route.items()
+                 if dim in self._wildcards and value is not None}
+        if not route:
+            return self.clients.values()
+
+        # Walk the narrowest dimension and check the rest per candidate
+        def candidates(dim):
+            return self._wildcards[dim], self._topic_index[dim].get(route[dim], ())
+
+        lead = min(route, key=lambda dim: sum(len(group) for group in candidates(dim)))
+        others = [(dim, value) for dim, value in route.items() if dim != lead]
+        return [
+            client
+            for group in candidates(lead)
+            for client in group
+            if all(client.matches(dim, value) for dim, value in others)
+        ]
+
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client"""
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(json.dumps(message, default=str))
     
-    def should_send_alert(self, alert_id: str, cooldown_seconds: int = 60) -> bool:
+    def should_send_alert(self, alert_id: str, cooldown_seconds: int = ALERT_COOLDOWN_SECONDS) -> bool:
         """
-        Check if alert should be sent based on:
-        1. Deduplication (not sent in this session)
-        2. Cooldown (not sent in last N seconds)
+        Check if alert should be sent: suppressed only while the same
+        alert ID is within its cooldown window
         """
-        now = datetime.now()
-        
-        # Check if already sent in this session
-        if alert_id in self.sent_alerts:
-            return False
-        
-        # Check cooldown
-        if alert_id in self.alert_cache:
-            last_sent = self.alert_cache[alert_id]
-            if now - last_sent < timedelta(seconds=cooldown_seconds):
-                return False
-        
-        # Mark as sent
-        self.sent_alerts.add(alert_id)
-        self.alert_cache[alert_id] = now
-        return True
+        return self.alert_cache.check_and_add(alert_id, cooldown_seconds)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Connection and alert deduplication metrics"""
+        return {
+            "clients": len(self.clients),
+            "dropped_messages": sum(client.dropped for client in self.clients.values()),
+            "alert_cache": self.alert_cache.get_statistics(),
+        }
     
     async def send_violation_alert(self, violation: dict):
         """
@@ -71,12 +438,12 @@ class ConnectionManager:
         alert_id = f"{violation.get('worker')}_{violation.get('violation')}_{violation.get('location')}"
         
         # Apply cooldown (60s default)
-        if not self.should_send_alert(alert_id, cooldown_seconds=60):
+        if not self.should_send_alert(alert_id):
             print(f"⏸️  Alert suppressed (cooldown): {alert_id}")
             return
         
         # Determine severity
-        severity = self._calculate_severity(violation)
+        severity = taxonomy.severity_name(violation.get('violation'))
         
         # Build alert message
         alert = {
@@ -87,33 +454,31 @@ class ConnectionManager:
             "alert_id": alert_id
         }
         
-        # Broadcast to all connected clients
-        await self.broadcast(alert)
+        # Route to clients subscribed to this camera/zone/severity
+        await self.broadcast(alert, topic={
+            "camera": violation.get("camera_id"),
+            "zone": violation.get("location"),
+            "severity": severity,
+        })
         print(f"🚨 Alert sent: {severity} - {alert_id}")
     
-    def _calculate_severity(self, violation: dict) -> str:
-        """Calculate severity based on violation type"""
-        violation_type = violation.get('violation', '').lower()
-        
-        # High severity
-        if 'helmet' in violation_type or 'no helmet' in violation_type:
-            return 'high'
-        
-        # Medium severity
-        if 'vest' in violation_type or 'goggles' in violation_type:
-            return 'medium'
-        
-        # Low severity
-        return 'low'
-    
     async def send_stats_update(self, stats: dict):
-        """Send real-time stats update"""
+        """Send real-time stats update (full to full-mode clients, batched deltas to the rest)"""
+        camera_id = stats.get("camera_id")
         message = {
             "type": "stats_update",
             "data": stats,
             "timestamp": datetime.now().isoformat()
         }
-        await self.broadcast(message)
+        name = str(camera_id) if camera_id is not None else STATS_GLOBAL_TOPIC
+        # Clients that fall behind only need the newest stats of each camera
+        await self.broadcast(message, coalesce_key=f"stats_update:{name}",
+                             topic={"camera": camera_id, STATS_MODE_DIMENSION: "full"})
+
+        self._stats_pending[name] = dict(stats)
+        if self._stats_flush is None:
+            loop = asyncio.get_running_loop()
+            self._stats_flush = loop.call_later(STATS_TICK_SECONDS, self._flush_stats)
     
     async def send_camera_status(self, camera_id: str, status: str):
         """Send camera status update"""
@@ -123,7 +488,8 @@ class ConnectionManager:
             "status": status,
             "timestamp": datetime.now().isoformat()
         }
-        await self.broadcast(message)
+        await self.broadcast(message, coalesce_key=f"camera_status:{camera_id}",
+                             topic={"camera": camera_id})
 
 # Global connection manager
 manager = ConnectionManager()
@@ -0,0 +1,145 @@
+"""
+Benchmark - Frame transport capture -> inference process: multiprocessing.Queue vs FrameRing
+Jalankan dari root project: python benchmarks/frame_transport.py [--frames 600] [--width 1280] [--height 720] [--fps 30]
+"""
+
+import argparse
+import multiprocessing as mp
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from frame_ring import FrameRing
+
+SLOTS = 4
+
+
+def queue_producer(queue, frames, shape, fps, cpu):
+    """Grabber sending each decoded frame through a Queue (pickled per frame)"""
+    source = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    started = time.perf_counter()
+    for index in range(frames):
+        if fps:
+            time.sleep(max(0.0, started + index / fps - time.perf_counter()))
+        frame = np.empty(shape, dtype=np.uint8)
+        np.copyto(frame, source)  # stands in for cap.read()
+        queue.put((time.perf_counter(), frame))
+    queue.put(None)
+    cpu.value = time.process_time()
+
+
+def ring_producer(ring, frames, shape, fps, cpu):
+    """Grabber decoding each frame straight into a shared-memory slot"""
+    source = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    started = time.perf_counter()
+    for index in range(frames):
+        if fps:
+            time.sleep(max(0.0, started + index / fps - time.perf_counter()))
+        # Wait for a slot instead of dropping, so both transports deliver every frame
+        slot = ring.acquire()
+        while slot is None:
+            time.sleep(0.0002)
+            slot = ring.acquire()
+        np.copyto(ring.buffer(slot, shape), source)  # stands in for cap.read(buffer)
+        ring.publish(slot, time.perf_counter())
+    ring.close_producer()
+    cpu.value = time.process_time()
+    ring.close()
+
+
+def consume(receive):
+    """Reads every frame like the detector would; returns elapsed time, latencies and CPU time"""
+    latencies = []
+    checksum = 0
+    cpu_started = time.process_time()
+    started = None
+    while True:
+        item = receive()
+        if item is None:
+            break
+        sent, frame, done = item
+        latencies.append(time.perf_counter() - sent)
+        checksum += int(frame[::64, ::64, 0].sum())
+        done()
+        if started is None:
+            started = time.perf_counter()
+    return time.perf_counter() - started, latencies, time.process_time() - cpu_started
+
+
+def run_queue(ctx, frames, shape, fps):
+    queue = ctx.Queue(maxsize=SLOTS)
+    cpu = ctx.Value('d', 0.0)
+    producer = ctx.Process(target=queue_producer, args=(queue, frames, shape, fps, cpu))
+    producer.start()
+
+    def receive():
+        item = queue.get()
+        return None if item is None else (item[0], item[1], lambda: None)
+
+    result = consume(receive)
+    producer.join()
+    return result + (cpu.value,)
+
+
+def run_ring(ctx, frames, shape, fps):
+    ring = FrameRing(slots=SLOTS, slot_bytes=int(np.prod(shape)), ctx=ctx)
+    cpu = ctx.Value('d', 0.0)
+    producer = ctx.Process(target=ring_producer, args=(ring, frames, shape, fps, cpu))
+    producer.start()
+
+    def receive():
+        view = ring.get()
+        return None if view is None else (view.timestamp, view.array, view.release)
+
+    try:
+        result = consume(receive)
+        producer.join()
+    finally:
+        ring.close()
+    return result + (cpu.value,)
+
+
+def report(name, frames, result):
+    elapsed, latencies, consumer_cpu, producer_cpu = result
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:<10} {(frames - 1) / elapsed:8.0f} fps  "
+          f"latency p50 {statistics.median(latencies) * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms  "
+          f"CPU/frame {(consumer_cpu + producer_cpu) / frames * 1000:5.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame transport benchmark")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30, help="Camera rate of the paced run")
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    shape = (args.height, args.width, 3)
+
+    print("=" * 60)
+    print("  🎞️  BENCHMARK - FRAME TRANSPORT (Queue vs FrameRing)")
+    print("=" * 60)
+    print(f"Frame {args.width}x{args.height}x3 ({np.prod(shape) / 1e6:.1f} MB), "
+          f"{args.frames} frame, {SLOTS} slot")
+
+    print("\nThroughput maksimum (grabber secepatnya):")
+    report("Queue", args.frames, run_queue(ctx, args.frames, shape, 0))
+    report("FrameRing", args.frames, run_ring(ctx, args.frames, shape, 0))
+
+    paced = min(args.frames, int(args.fps * 5))
+    print(f"\nKamera {args.fps:g} FPS ({paced} frame):")
+    report("Queue", paced, run_queue(ctx, paced, shape, args.fps))
+    report("FrameRing", paced, run_ring(ctx, paced, shape, args.fps))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
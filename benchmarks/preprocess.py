@@ -0,0 +1,84 @@
+"""
+Benchmark - Letterbox preprocessing: allocating per frame vs LetterboxPreprocessor buffers
+Jalankan dari root project: python benchmarks/preprocess.py [--frames 300] [--width 1280] [--height 720] [--batch 1]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from preprocess import LetterboxPreprocessor, letterbox_geometry
+
+
+def allocating_letterbox(frames, size=640, stride=32):
+    """Per-frame resize, border, channel flip, transpose and normalize (new arrays each step)"""
+    rect = len({frame.shape[:2] for frame in frames}) == 1
+    prepared = []
+    for frame in frames:
+        geometry = letterbox_geometry(frame.shape[0], frame.shape[1], size, stride, rect)
+        resized = cv2.resize(frame, (geometry.width, geometry.height), interpolation=cv2.INTER_LINEAR)
+        bottom = geometry.input_height - geometry.height - geometry.pad_top
+        right = geometry.input_width - geometry.width - geometry.pad_left
+        padded = cv2.copyMakeBorder(resized, geometry.pad_top, bottom, geometry.pad_left, right,
+                                    cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        prepared.append(padded[..., ::-1].transpose(2, 0, 1))
+    return np.ascontiguousarray(np.stack(prepared)).astype(np.float32) / 255
+
+
+def measure(prepare, frames, count):
+    """Time per batch and peak traced allocations over count batches"""
+    prepare(frames)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(count):
+        prepare(frames)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / count, peak
+
+
+def report(name, result):
+    per_batch, peak = result
+    print(f"  {name:<22} {per_batch * 1000:6.2f} ms/batch  "
+          f"peak alokasi {peak / 1e6:6.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Letterbox preprocessing benchmark")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--size", type=int, default=640)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+              for _ in range(args.batch)]
+    preprocessor = LetterboxPreprocessor(args.size)
+
+    print("=" * 60)
+    print("  📐  BENCHMARK - LETTERBOX PREPROCESSING")
+    print("=" * 60)
+    print(f"Frame {args.width}x{args.height} -> input {args.size}, batch {args.batch}, "
+          f"{args.frames} batch")
+
+    report("Alokasi per frame", measure(lambda f: allocating_letterbox(f, args.size), frames, args.frames))
+    report("LetterboxPreprocessor", measure(preprocessor.prepare, frames, args.frames))
+
+    stats = preprocessor.get_statistics()
+    print(f"\nBuffer dipakai ulang: {stats['allocations']} alokasi untuk {stats['frames']} frame "
+          f"({stats['buffer_bytes'] / 1e6:.1f} MB)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,17 @@ from config import config
 from detector import PPEDetector
 from database import Database
 from telegram_bot import TelegramBot
+from clip_recorder import ClipRecorder
+from rules_engine import SafetyLogicEngine
+from stream_publisher import StreamPublisher
+from event_bus import (
+    EventPublisher, InProcessEventBus,
+    EVENT_DETECTION, EVENT_VIOLATION, EVENT_CAMERA_STATUS, EVENT_STATS
+)
+from supervisor import ProcessSupervisor, WorkerSpec
+from frame_ring import FrameRing, grab_frames
+from inference_server import InferenceClient, InferenceServer, yolo_backend
+from batch_scheduler import DEFAULT_CLASSES, EdfBatchScheduler, PriorityClass
 from utils import save_frame, format_timestamp
 
 
@@ -34,11 +45,103 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def open_capture(source):
+    """Open a video source; returns None if it cannot be opened"""
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    return cap
+
+
+def reconnect_capture(source, stop_event=None, heartbeat=None):
+    """
+    Reopen a failed live stream (advanced.error_recovery)
+    
+    Returns:
+        New capture, or None once the attempts are used up
+    """
+    attempts = config.get('advanced.supervisor.reconnect_attempts', 3)
+    delay = config.get('advanced.supervisor.reconnect_delay', 2)
+    for attempt in range(1, attempts + 1):
+        if stop_event is not None and stop_event.wait(delay):
+            return None
+        if stop_event is None:
+            time.sleep(delay)
+        logger.info(f"Reconnecting to {source} (attempt {attempt}/{attempts})")
+        cap = open_capture(source)
+        if cap is not None:
+            ret, _ = cap.read()
+            if ret:
+                return cap
+            cap.release()
+        if heartbeat is not None:
+            # Still making progress: the supervisor should not count this as a stall
+            heartbeat.beat()
+    return None
+
+
+def inference_client_from_config(camera_id: str = None):
+    """Connection to the shared inference server, or None to load the model in-process"""
+    if not config.get('inference_server.enabled', False):
+        return None
+    client = InferenceClient(
+        socket_path=config.get('inference_server.socket_path'),
+        host=config.get('inference_server.host', '127.0.0.1'),
+        port=config.get('inference_server.port', 8767),
+        connect_timeout=config.get('advanced.supervisor.startup_timeout', 120),
+        camera_id=camera_id or ''
+    )
+    # Wait for the server during startup rather than on the first frame
+    client.connect()
+    return client
+
+
+def batch_scheduler_from_config() -> EdfBatchScheduler:
+    """Inference scheduler with camera priority classes from the area risk scores"""
+    settings = config.get('inference_server.scheduler', {}) or {}
+    risk_scores = dict(settings.get('risk_scores') or {})
+    for camera in configured_cameras():
+        if camera.get('risk_score') is not None:
+            risk_scores[camera['id']] = camera['risk_score']
+    classes = settings.get('classes')
+    return EdfBatchScheduler(
+        max_batch=config.get('inference_server.max_batch', 8),
+        max_wait_ms=config.get('inference_server.max_wait_ms', 5),
+        classes=tuple(PriorityClass(**c) for c in classes) if classes else DEFAULT_CLASSES,
+        risk_scores=risk_scores,
+        default_risk=settings.get('default_risk', 60),
+        miss_tolerance=settings.get('miss_tolerance', 0.02),
+        headroom=settings.get('headroom', 0.7)
+    )
+
+
+def inference_server_from_config() -> InferenceServer:
+    """Load the configured model(s) into an inference server"""
+    device = config.get('model.device', 'cpu')
+    img_size = config.get('model.img_size', 640)
+    backends = {'default': yolo_backend(config.model_path, device, img_size)}
+    for name, weights in (config.get('inference_server.models') or {}).items():
+        backends[name] = yolo_backend(weights, device, img_size)
+    return InferenceServer(
+        backends,
+        socket_path=config.get('inference_server.socket_path'),
+        host=config.get('inference_server.host', '127.0.0.1'),
+        port=config.get('inference_server.port', 8767),
+        scheduler=batch_scheduler_from_config()
+    )
+
+
 class SmartSafetyVision:
     """Main application class for PPE detection system"""
     
-    def __init__(self):
-        """Initialize Smart Safety Vision system"""
+    def __init__(self, camera_id: str = None):
+        """
+        Initialize Smart Safety Vision system
+        
+        Args:
+            camera_id: Camera this instance monitors (its inference priority)
+        """
         logger.info("Initializing Smart Safety Vision...")
         
         # Create necessary directories
@@ -49,7 +152,9 @@ class SmartSafetyVision:
             model_path=config.model_path,
             confidence=config.confidence,
             iou_threshold=config.get('model.iou_threshold', 0.45),
-            device=config.get('model.device', 'cpu')
+            device=config.get('model.device', 'cpu'),
+            client=inference_client_from_config(camera_id),
+            img_size=config.get('model.img_size', 640)
         )
         
         self.database = Database(config.database_path)
@@ -66,6 +171,29 @@ class SmartSafetyVision:
         self.save_violations = config.get('database.save_violation_images', True)
         self.skip_frames = config.get('performance.skip_frames', 0)
         
+        # Evidence clip recorders (one rolling buffer per camera), triggered by
+        # alerts the rules engine has confirmed over several frames
+        self.clips_enabled = config.get('clips.enabled', False)
+        self.clip_recorders = {}
+        self.alert_engines = {}
+        
+        # Live stream publishers (frames are encoded only while someone watches)
+        self.live_feed_enabled = config.get('dashboard.show_live_feed', False)
+        self.stream_publishers = {}
+        
+        # Event bus to the API; local subscribers keep working without it
+        if config.get('event_bus.enabled', False):
+            self.event_bus = EventPublisher(
+                socket_path=config.get('event_bus.socket_path'),
+                host=config.get('event_bus.host', '127.0.0.1'),
+                port=config.get('event_bus.port', 8766)
+            )
+        else:
+            self.event_bus = InProcessEventBus()
+        self.stats_interval = config.get('event_bus.stats_interval', 5)
+        self._last_stats_publish = 0.0
+        self._last_detection_summary = {}
+        
         # Statistics
         self.frame_count = 0
         self.start_time = time.time()
@@ -81,10 +209,17 @@ class SmartSafetyVision:
             camera_source: Camera identifier
             
         Returns:
-            Annotated frame and detection results
+            Lazy annotated frame view and detection results
         """
-        # Perform detection
-        annotated_frame, results = self.detector.detect(frame, visualize=True)
+        # Perform detection; boxes are drawn only when a consumer needs them
+        _, results = self.detector.detect(frame, visualize=False)
+        annotated_frame = self.detector.annotate(frame, results)
+        
+        # Feed rolling buffer for evidence clips (renders only sampled frames)
+        if self.clips_enabled:
+            self._get_clip_recorder(camera_source).add_frame(annotated_frame)
+            self._get_alert_engine(camera_source).process_detections(
+                self._rule_detections(results))
         
         # Log detection to database
         self.database.log_detection(
@@ -95,18 +230,94 @@ class SmartSafetyVision:
             detection_data=results
         )
         
+        # Publish detection summary when it changes
+        summary = {
+            'camera_id': camera_source,
+            'total_persons': results['total_persons'],
+            'compliant_persons': results['compliant_persons'],
+            'violation_count': results['violation_count'],
+            'compliance_rate': round(results['compliance_rate'], 1)
+        }
+        if self._last_detection_summary.get(camera_source) != summary:
+            self._last_detection_summary[camera_source] = summary
+            self.event_bus.publish(EVENT_DETECTION, summary)
+        
         # Handle violations
         if results['violations']:
             self._handle_violations(annotated_frame, results, camera_source)
         
+        # Offer to the live stream (renders only while viewers are connected)
+        if self.live_feed_enabled:
+            self._get_stream_publisher(camera_source).publish(annotated_frame)
+        
         return annotated_frame, results
     
+    def _get_stream_publisher(self, camera_source: str) -> StreamPublisher:
+        """Get or create the live stream publisher for a camera"""
+        publisher = self.stream_publishers.get(camera_source)
+        if publisher is None:
+            publisher = StreamPublisher(
+                camera_id=camera_source,
+                host=config.get('streaming.host', '127.0.0.1'),
+                port=config.get('streaming.port', 8765),
+                fps=config.get('streaming.fps', 15)
+            ).start()
+            self.stream_publishers[camera_source] = publisher
+        return publisher
+    
+    def _get_clip_recorder(self, camera_source: str) -> ClipRecorder:
+        """Get or create the clip recorder for a camera"""
+        recorder = self.clip_recorders.get(camera_source)
+        if recorder is None:
+            recorder = ClipRecorder(
+                camera_id=camera_source,
+                pre_seconds=config.get('clips.pre_seconds', 5),
+                post_seconds=config.get('clips.post_seconds', 5),
+                fps=config.get('clips.fps', 10),
+                jpeg_quality=config.get('clips.jpeg_quality', 80),
+                max_buffer_mb=config.get('clips.max_buffer_mb', 32),
+                cooldown_seconds=config.get('clips.cooldown_seconds', 60),
+                output_dir=config.get('clips.output_folder', 'logs/clips')
+            )
+            self.clip_recorders[camera_source] = recorder
+        return recorder
+    
+    def _get_alert_engine(self, camera_source: str) -> SafetyLogicEngine:
+        """Get or create the rules engine whose confirmed alerts start clips for a camera"""
+        engine = self.alert_engines.get(camera_source)
+        if engine is None:
+            engine = SafetyLogicEngine(
+                min_violation_duration=config.get('clips.min_violation_seconds', 3.0),
+                on_alert=self._get_clip_recorder(camera_source).on_alert
+            )
+            self.alert_engines[camera_source] = engine
+        return engine
+    
+    @staticmethod
+    def _rule_detections(results) -> list:
+        """Persons of a frame as rules engine detections"""
+        violating = {tuple(v['person_bbox']) for v in results['violations']}
+        now = time.time()
+        detections = []
+        for detection in results['all_detections']:
+            if detection['class'] != 'person':
+                continue
+            x1, y1, x2, y2 = (int(v) for v in detection['bbox'])
+            detections.append({
+                'person_id': str(detection['id']),
+                'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2},
+                'has_ppe': tuple(detection['bbox']) not in violating,
+                'confidence': detection['confidence'],
+                'timestamp': now
+            })
+        return detections
+    
     def _handle_violations(self, frame, results, camera_source):
         """
         Handle detected violations
         
         Args:
-            frame: Current frame
+            frame: Current frame (lazy annotated view)
             results: Detection results
             camera_source: Camera identifier
         """
@@ -118,7 +329,7 @@ class SmartSafetyVision:
             # Save violation image
             image_path = None
             if self.save_violations:
-                image_path = save_frame(frame, prefix=f"{violation_type}")
+                image_path = save_frame(frame.image, prefix=f"{violation_type}")
             
             # Log to database
             violation_id = self.database.log_violation(
@@ -130,6 +341,18 @@ class SmartSafetyVision:
                 image_path=image_path
             )
             
+            # Push live alert to the dashboard
+            self.event_bus.publish(EVENT_VIOLATION, {
+                'id': violation_id,
+                'worker': f"Person #{violation.get('id', 0)}",
+                'violation': violation_type,
+                'location': camera_source,
+                'camera_id': camera_source,
+                'confidence': round(confidence, 3),
+                'image_path': image_path,
+                'timestamp': format_timestamp()
+            })
+            
             # Send Telegram alert
             if self.telegram_bot and self.telegram_bot.enabled:
                 alert_sent = self.telegram_bot.send_violation_alert(
@@ -149,13 +372,23 @@ class SmartSafetyVision:
                         message=f"{violation_type} detected"
                     )
     
-    def run(self, source=None, show_preview: bool = True):
+    def run(self, source=None, show_preview: bool = True, camera_id: str = None,
+            heartbeat=None, stop_event=None, notify_status: bool = True,
+            frames: FrameRing = None) -> int:
         """
         Run the detection system
         
         Args:
             source: Video source (camera index, file path, or URL)
             show_preview: Whether to show live preview window
+            camera_id: Camera identifier (default: Camera_<source>)
+            heartbeat: Supervisor heartbeat, beaten once per frame
+            stop_event: Event that ends the loop (set by the supervisor)
+            notify_status: Send Telegram start/stop notifications
+            frames: Frame ring filled by a capture process; replaces opening the source here
+            
+        Returns:
+            Exit code: 0 when stopped or the video ended, 1 when the source failed
         """
         # Use configured source if not provided
         if source is None:
@@ -164,34 +397,82 @@ class SmartSafetyVision:
         logger.info(f"Starting detection with source: {source}")
         
         # Send system start notification
-        if self.telegram_bot and self.telegram_bot.enabled:
+        if notify_status and self.telegram_bot and self.telegram_bot.enabled:
             self.telegram_bot.send_system_status(
                 'started',
                 f'PPE detection system started with source: {source}'
             )
         
-        # Open video capture
-        cap = cv2.VideoCapture(source)
+        # Files end; cameras and streams are reconnected when a read fails
+        is_file = isinstance(source, str) and Path(source).is_file()
+        error_recovery = config.get('advanced.error_recovery', True) and not is_file
         
-        if not cap.isOpened():
-            logger.error(f"Failed to open video source: {source}")
-            return
-        
-        # Get video properties
-        fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap = None
+        view = None
+        width = 0
+        if frames is not None:
+            # The capture process owns the source; slots it released before a crash are reclaimed
+            frames.recover(producer=False)
+            logger.info(f"Receiving frames from capture process (ring {frames.name})")
+        else:
+            # Open video capture
+            cap = open_capture(source)
+            
+            if cap is None:
+                logger.error(f"Failed to open video source: {source}")
+                return 1
+            
+            # Get video properties
+            fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            
+            logger.info(f"Video opened: {width}x{height} @ {fps} FPS")
         
-        logger.info(f"Video opened: {width}x{height} @ {fps} FPS")
+        camera_id = camera_id or f"Camera_{source}"
+        camera_status = 'offline'
+        exit_code = 0
+        self.event_bus.publish(EVENT_CAMERA_STATUS, {'camera_id': camera_id, 'status': 'online'})
         
         try:
-            while True:
-                ret, frame = cap.read()
+            while stop_event is None or not stop_event.is_set():
+                if view is not None:
+                    # Done with the previous frame: hand its slot back to the capture process
+                    view.release()
+                    view = None
+                
+                if frames is not None:
+                    # Newest frame only: stale frames are skipped while detection catches up
+                    view = frames.get(timeout=1.0, latest=True)
+                    if view is None:
+                        if frames.closed:
+                            logger.info("End of video")
+                            break
+                        if heartbeat is not None:
+                            # Waiting on a (restarting) capture process is not a stall here
+                            heartbeat.beat()
+                        continue
+                    ret, frame = True, view.array
+                    width = frame.shape[1]
+                else:
+                    ret, frame = cap.read()
                 
                 if not ret:
+                    if is_file:
+                        logger.info("End of video")
+                        break
                     logger.warning("Failed to read frame")
-                    break
+                    cap.release()
+                    cap = reconnect_capture(source, stop_event, heartbeat) if error_recovery else None
+                    if cap is None:
+                        if stop_event is None or not stop_event.is_set():
+                            camera_status = 'error'
+                            exit_code = 1
+                        break
+                    continue
                 
+                if heartbeat is not None:
+                    heartbeat.beat()
                 self.frame_count += 1
                 
                 # Skip frames if configured
@@ -199,25 +480,37 @@ class SmartSafetyVision:
                     continue
                 
                 # Process frame
-                annotated_frame, results = self.process_frame(frame, f"Camera_{source}")
+                annotated_frame, results = self.process_frame(frame, camera_id)
                 
-                # Calculate and display FPS
+                # Calculate FPS
                 elapsed_time = time.time() - self.start_time
                 current_fps = self.frame_count / elapsed_time if elapsed_time > 0 else 0
                 
-                cv2.putText(
-                    annotated_frame,
-                    f"FPS: {current_fps:.1f}",
-                    (width - 150, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (0, 255, 0),
-                    2
-                )
+                # Publish periodic stats
+                if time.time() - self._last_stats_publish >= self.stats_interval:
+                    self._last_stats_publish = time.time()
+                    stats = self.detector.get_statistics()
+                    stats.update({
+                        'camera_id': camera_id,
+                        'frames_processed': self.frame_count,
+                        'fps': round(current_fps, 1)
+                    })
+                    self.event_bus.publish(EVENT_STATS, stats)
                 
                 # Show preview
                 if show_preview:
-                    cv2.imshow('Smart Safety Vision - PPE Detection', annotated_frame)
+                    # The cached render is shared with the stream and clips; draw on a copy
+                    preview_frame = annotated_frame.image.copy()
+                    cv2.putText(
+                        preview_frame,
+                        f"FPS: {current_fps:.1f}",
+                        (width - 150, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.7,
+                        (0, 255, 0),
+                        2
+                    )
+                    cv2.imshow('Smart Safety Vision - PPE Detection', preview_frame)
                     
                     key = cv2.waitKey(1) & 0xFF
                     if key == ord('q'):
@@ -225,7 +518,7 @@ class SmartSafetyVision:
                         break
                     elif key == ord('s'):
                         # Save screenshot
-                        screenshot_path = save_frame(annotated_frame, prefix='screenshot')
+                        screenshot_path = save_frame(preview_frame, prefix='screenshot')
                         logger.info(f"Screenshot saved: {screenshot_path}")
                 
                 # Log progress every 100 frames
@@ -238,17 +531,34 @@ class SmartSafetyVision:
         
         except Exception as e:
             logger.error(f"Error during processing: {e}", exc_info=True)
+            camera_status = 'error'
+            exit_code = 1
             
             if self.telegram_bot and self.telegram_bot.enabled:
                 self.telegram_bot.send_system_status('error', str(e))
         
         finally:
             # Cleanup
-            cap.release()
-            cv2.destroyAllWindows()
+            if view is not None:
+                view.release()
+            if frames is not None:
+                frames.close()
+            if cap is not None:
+                cap.release()
+            if show_preview:
+                cv2.destroyAllWindows()
+            
+            # Write clips that are still collecting post-event frames
+            for recorder in self.clip_recorders.values():
+                recorder.close()
+            for publisher in self.stream_publishers.values():
+                publisher.stop()
+            
+            self.event_bus.publish(EVENT_CAMERA_STATUS, {'camera_id': camera_id, 'status': camera_status})
+            self.event_bus.close()
             
             # Send system stop notification
-            if self.telegram_bot and self.telegram_bot.enabled:
+            if notify_status and self.telegram_bot and self.telegram_bot.enabled:
                 stats = self.detector.get_statistics()
                 self.telegram_bot.send_system_status(
                     'stopped',
@@ -258,6 +568,165 @@ class SmartSafetyVision:
             
             logger.info("Detection system stopped")
             logger.info(f"Final statistics: {self.detector.get_statistics()}")
+        
+        return exit_code
+
+
+def run_camera_worker(camera_id: str, source, frames: FrameRing = None,
+                      heartbeat=None, stop_event=None) -> int:
+    """
+    Camera pipeline (capture -> detect -> rules -> persist) in a supervised worker process
+    
+    Args:
+        camera_id: Camera identifier
+        source: Video source of the camera
+        frames: Frame ring of a separate capture worker (None captures in this process)
+        heartbeat: Supervisor heartbeat
+        stop_event: Supervisor stop event
+        
+    Returns:
+        Exit code (non-zero makes the supervisor restart the worker)
+    """
+    app = SmartSafetyVision(camera_id=camera_id)
+    return app.run(source=source, show_preview=False, camera_id=camera_id,
+                   heartbeat=heartbeat, stop_event=stop_event, notify_status=False,
+                   frames=frames)
+
+
+def run_capture_worker(source, frames: FrameRing, heartbeat=None, stop_event=None) -> int:
+    """
+    Capture stage of a camera in its own process: frames are decoded straight
+    into the slots of the camera's frame ring and picked up by its camera worker
+    
+    Args:
+        source: Video source of the camera
+        frames: Frame ring shared with the camera worker
+        heartbeat: Supervisor heartbeat, beaten per captured frame
+        stop_event: Supervisor stop event
+        
+    Returns:
+        Exit code (non-zero makes the supervisor restart the worker)
+    """
+    frames.recover(producer=True)
+    is_file = isinstance(source, str) and Path(source).is_file()
+    error_recovery = config.get('advanced.error_recovery', True) and not is_file
+    
+    cap = open_capture(source)
+    if cap is None:
+        logger.error(f"Failed to open video source: {source}")
+        frames.close()
+        return 1
+    
+    try:
+        while not grab_frames(cap.read, frames, stop_event, heartbeat):
+            cap.release()
+            cap = None
+            if is_file:
+                logger.info("End of video")
+                frames.close_producer()
+                return 0
+            logger.warning("Failed to read frame")
+            cap = reconnect_capture(source, stop_event, heartbeat) if error_recovery else None
+            if cap is None:
+                return 0 if stop_event is not None and stop_event.is_set() else 1
+        return 0
+    finally:
+        if cap is not None:
+            cap.release()
+        logger.info(f"Capture stopped: {frames.get_statistics()}")
+        frames.close()
+
+
+def run_inference_worker(heartbeat=None, stop_event=None) -> int:
+    """
+    Inference server in a supervised worker process: the only process
+    holding the model weights, shared by every camera worker
+    
+    Returns:
+        Exit code (non-zero makes the supervisor restart the worker)
+    """
+    return inference_server_from_config().serve(stop_event, heartbeat)
+
+
+def configured_cameras(sources=None) -> list:
+    """
+    Cameras to monitor: --source arguments, else the `cameras` list of the
+    config, else camera.source
+    
+    Returns:
+        List of {'id', 'source'} dicts
+    """
+    if sources:
+        entries = [{'source': source} for source in sources]
+    else:
+        entries = config.get('cameras') or [{'source': config.camera_source}]
+    
+    cameras = []
+    for entry in entries:
+        source = entry['source']
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        cameras.append({'id': entry.get('id') or f"Camera_{source}", 'source': source,
+                        'risk_score': entry.get('risk_score')})
+    return cameras
+
+
+def run_supervised(cameras: list):
+    """Run every camera in its own worker process, restarting failed ones"""
+    settings = config.get('advanced.supervisor', {}) or {}
+    supervisor = ProcessSupervisor(
+        auto_restart=config.get('advanced.auto_restart', True),
+        backoff_initial=settings.get('backoff_initial', 1),
+        backoff_max=settings.get('backoff_max', 60),
+        stable_seconds=settings.get('stable_seconds', 60),
+        pin_cores=settings.get('pin_cores', True)
+    )
+    if config.get('inference_server.enabled', False):
+        # Started first: camera workers wait for it while it loads the model
+        supervisor.add(WorkerSpec(
+            'inference',
+            run_inference_worker,
+            stall_timeout=settings.get('stall_timeout', 30),
+            startup_timeout=settings.get('startup_timeout', 120)
+        ))
+    
+    ring_settings = settings.get('frame_ring', {}) or {}
+    rings = []
+    for camera in cameras:
+        source = camera['source']
+        frames = None
+        # Live sources get a separate capture process; files are read in the
+        # camera worker so no frame is dropped
+        if settings.get('capture_process', False) and not (isinstance(source, str) and Path(source).is_file()):
+            frames = FrameRing(
+                slots=ring_settings.get('slots', 4),
+                slot_bytes=ring_settings.get('max_width', 1920) * ring_settings.get('max_height', 1080) * 3,
+                ctx=supervisor.ctx
+            )
+            rings.append(frames)
+            supervisor.add(WorkerSpec(
+                f"{camera['id']}:capture",
+                run_capture_worker,
+                args=(source, frames),
+                stall_timeout=settings.get('stall_timeout', 30),
+                startup_timeout=settings.get('startup_timeout', 120)
+            ))
+        supervisor.add(WorkerSpec(
+            camera['id'],
+            run_camera_worker,
+            args=(camera['id'], source, frames),
+            stall_timeout=settings.get('stall_timeout', 30),
+            startup_timeout=settings.get('startup_timeout', 120)
+        ))
+    
+    logger.info(f"Supervising {len(supervisor.specs)} worker(s) for {len(cameras)} camera(s)")
+    try:
+        supervisor.start()
+        supervisor.run()
+        logger.info(f"Supervisor stopped: {supervisor.get_statistics()}")
+    finally:
+        for frames in rings:
+            frames.close()
 
 
 def main():
@@ -269,8 +738,22 @@ def main():
     parser.add_argument(
         '--source',
         type=str,
+        action='append',
         default=None,
-        help='Video source: camera index (0), video file path, or IP camera URL'
+        help='Video source: camera index (0), video file path, or IP camera URL '
+             '(repeat for several cameras)'
+    )
+    
+    parser.add_argument(
+        '--supervise',
+        action='store_true',
+        help='Run cameras in supervised worker processes (always on for several cameras)'
+    )
+    
+    parser.add_argument(
+        '--inference-server',
+        action='store_true',
+        help='Only run the shared inference server (for detectors started separately)'
     )
     
     parser.add_argument(
@@ -288,17 +771,24 @@ def main():
     
     args = parser.parse_args()
     
-    # Parse source
-    source = args.source
-    if source is not None and source.isdigit():
-        source = int(source)
+    if args.inference_server:
+        sys.exit(inference_server_from_config().serve())
+    
+    cameras = configured_cameras(args.source)
+    supervised = args.supervise or len(cameras) > 1
+    if len(cameras) > 1 and not config.get('advanced.multi_threading', True):
+        logger.warning("advanced.multi_threading is off: only the first camera is monitored")
+        cameras, supervised = cameras[:1], args.supervise
     
     # Print banner
     print("=" * 60)
     print("  🦺 SMART SAFETY VISION - PPE DETECTION SYSTEM 🦺")
     print("=" * 60)
     print(f"  Start Time: {format_timestamp()}")
-    print(f"  Video Source: {source or 'Default from config'}")
+    for camera in cameras:
+        print(f"  Video Source: {camera['source']} ({camera['id']})")
+    if supervised:
+        print(f"  Mode: supervised, {len(cameras)} worker process(es)")
     print(f"  Model: {config.model_path}")
     print(f"  Confidence: {config.confidence}")
     print("=" * 60)
@@ -306,8 +796,12 @@ def main():
     
     # Initialize and run system
     try:
-        app = SmartSafetyVision()
-        app.run(source=source, show_preview=not args.no_preview)
+        if supervised:
+            run_supervised(cameras)
+        else:
+            app = SmartSafetyVision(camera_id=cameras[0]['id'])
+            app.run(source=cameras[0]['source'], show_preview=not args.no_preview,
+                    camera_id=cameras[0]['id'])
     
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
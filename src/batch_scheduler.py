@@ -0,0 +1,269 @@
+"""
+Batch Scheduler Module
+Earliest-deadline-first batching of inference requests, with camera
+priority classes from area risk scores and degradation of low-priority
+cameras (frame rate, then resolution) when the model cannot keep up
+"""
+
+import time
+import bisect
+import logging
+import itertools
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PriorityClass(NamedTuple):
+    """Camera priority class"""
+    name: str
+    min_risk: int  # Lowest riskScore of the class
+    deadline_ms: float  # Latency target from frame submission to detections
+
+
+# Highest priority first; thresholds follow the risk map colors (88, 68, 52 -> high, medium, low)
+DEFAULT_CLASSES = (
+    PriorityClass('high', 80, 150),
+    PriorityClass('medium', 60, 400),
+    PriorityClass('low', 0, 1000),
+)
+
+# Degradation steps of a class: (frame stride, resolution scale)
+DEGRADE_STEPS = ((1, 1.0), (2, 1.0), (2, 0.5), (4, 0.5))
+
+LATENCY_SAMPLES = 1000
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class Pending:
+    """A queued request"""
+
+    __slots__ = ('item', 'camera_id', 'key', 'priority', 'arrived', 'deadline')
+
+    def __init__(self, item: Any, camera_id: str, key: Any, priority: PriorityClass,
+                 arrived: float, deadline: float):
+        self.item = item
+        self.camera_id = camera_id
+        self.key = key
+        self.priority = priority
+        self.arrived = arrived
+        self.deadline = deadline
+
+
+class EdfBatchScheduler:
+    """
+    Forms inference batches by deadline and keeps high-risk cameras on target.
+
+    Every request gets the deadline of its camera's priority class. A batch
+    is made of the earliest-deadline requests sharing a model key and is
+    due when it is full, when every client is waiting in it, when the oldest
+    request has waited max_wait_ms, or when the earliest deadline leaves only
+    the expected batch time. Once per window the scheduler checks the missed
+    deadlines: under overload it degrades the lowest-priority class one step
+    (half rate, then half resolution, then quarter rate), and after several
+    clean windows with spare capacity it restores the highest degraded class.
+    """
+
+    def __init__(self, max_batch: int = 8, max_wait_ms: float = 5.0,
+                 classes: Tuple[PriorityClass, ...] = DEFAULT_CLASSES,
+                 risk_scores: Optional[Dict[str, int]] = None, default_risk: int = 60,
+                 window_seconds: float = 1.0, miss_tolerance: float = 0.02,
+                 headroom: float = 0.7, recover_windows: int = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize scheduler
+
+        Args:
+            max_batch: Maximum requests per batch
+            max_wait_ms: Longest a request waits for its batch to fill
+            classes: Priority classes, highest priority first
+            risk_scores: riskScore per camera id
+            default_risk: riskScore of cameras without one
+            window_seconds: Overload evaluation period
+            miss_tolerance: Share of missed deadlines that counts as overload
+            headroom: Model utilization below which a degraded class is restored
+            recover_windows: Clean windows needed before restoring a step
+            clock: Time source (seconds)
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.classes = tuple(sorted(classes, key=lambda c: -c.min_risk))
+        self.risk_scores = dict(risk_scores or {})
+        self.default_risk = default_risk
+        self.window_seconds = window_seconds
+        self.miss_tolerance = miss_tolerance
+        self.headroom = headroom
+        self.recover_windows = recover_windows
+        self.clock = clock
+
+        # (deadline, submission order, request), kept sorted
+        self._pending: List[Tuple[float, int, Pending]] = []
+        self._order = itertools.count()
+        self._levels = {c.name: 0 for c in self.classes}
+        self._batch_time = 0.0  # Moving average of the model time per batch
+
+        # Current evaluation window
+        self._window_start = clock()
+        self._window_done = 0
+        self._window_missed = 0
+        self._window_busy = 0.0
+        self._clean_windows = 0
+
+        # Statistics
+        self._latencies = {c.name: deque(maxlen=LATENCY_SAMPLES) for c in self.classes}
+        self._requests = {c.name: 0 for c in self.classes}
+        self._missed = {c.name: 0 for c in self.classes}
+        self._cameras: Dict[str, str] = {}
+
+    def classify(self, camera_id: str) -> PriorityClass:
+        """Priority class of a camera from its riskScore"""
+        risk = self.risk_scores.get(camera_id, self.default_risk)
+        for priority in self.classes:
+            if risk >= priority.min_risk:
+                return priority
+        return self.classes[-1]
+
+    def degradation(self, camera_id: str) -> Tuple[int, float]:
+        """
+        Current (frame stride, resolution scale) a camera should submit at
+        """
+        return DEGRADE_STEPS[self._levels[self.classify(camera_id).name]]
+
+    def submit(self, item: Any, camera_id: str, key: Any = None) -> Pending:
+        """
+        Queue a request
+
+        Args:
+            item: Request payload, returned in the batch
+            camera_id: Camera the frame comes from
+            key: Requests are only batched with the same key (model, thresholds)
+        """
+        priority = self.classify(camera_id)
+        now = self.clock()
+        pending = Pending(item, camera_id, key, priority, now, now + priority.deadline_ms / 1000.0)
+        bisect.insort(self._pending, (pending.deadline, next(self._order), pending))
+        self._cameras[camera_id] = priority.name
+        return pending
+
+    def discard(self, predicate: Callable[[Any], bool]) -> List[Pending]:
+        """Remove queued requests whose item matches (e.g. a disconnected client)"""
+        removed = [entry[2] for entry in self._pending if predicate(entry[2].item)]
+        if removed:
+            self._pending = [entry for entry in self._pending if not predicate(entry[2].item)]
+        return removed
+
+    def next_batch(self, waiting: int = 0) -> Tuple[Optional[List[Pending]], Optional[float]]:
+        """
+        Take the next batch if it is due
+
+        Args:
+            waiting: Number of clients that can submit (each has one request
+                in flight, so once all of them are queued nothing can join)
+
+        Returns:
+            (batch, None) when due, else (None, seconds until it is due;
+            None when nothing is queued)
+        """
+        if not self._pending:
+            return None, None
+        head = self._pending[0][2]
+        batch = [entry[2] for entry in self._pending if entry[2].key == head.key][:self.max_batch]
+        now = self.clock()
+        due = min(
+            min(entry[2].arrived for entry in self._pending) + self.max_wait,
+            head.deadline - self._batch_time
+        )
+        if len(batch) >= min(self.max_batch, waiting or self.max_batch) or now >= due:
+            taken = set(map(id, batch))
+            self._pending = [entry for entry in self._pending if id(entry[2]) not in taken]
+            return batch, None
+        return None, due - now
+
+    def complete(self, batch: List[Pending], started: float, finished: Optional[float] = None):
+        """
+        Record a finished batch (latency per class, overload control)
+
+        Args:
+            batch: Batch from next_batch()
+            started: Clock time the model call started
+            finished: Clock time the results were ready (default: now)
+        """
+        finished = self.clock() if finished is None else finished
+        elapsed = finished - started
+        self._batch_time = elapsed if not self._batch_time else 0.8 * self._batch_time + 0.2 * elapsed
+        self._window_busy += elapsed
+        for pending in batch:
+            name = pending.priority.name
+            latency = finished - pending.arrived
+            self._latencies[name].append(latency)
+            self._requests[name] += 1
+            self._window_done += 1
+            if finished > pending.deadline:
+                self._missed[name] += 1
+                self._window_missed += 1
+
+        if finished - self._window_start >= self.window_seconds:
+            self._adapt(finished)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        classes = {}
+        for priority in self.classes:
+            name = priority.name
+            latencies = sorted(self._latencies[name])
+            stride, scale = DEGRADE_STEPS[self._levels[name]]
+            classes[name] = {
+                'cameras': sum(1 for c in self._cameras.values() if c == name),
+                'deadline_ms': priority.deadline_ms,
+                'requests': self._requests[name],
+                'missed': self._missed[name],
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+                'stride': stride,
+                'scale': scale,
+            }
+        return {
+            'queued': len(self._pending),
+            'batch_ms': round(self._batch_time * 1000, 1),
+            'classes': classes,
+        }
+
+    def _adapt(self, now: float):
+        elapsed = max(now - self._window_start, 1e-9)
+        overloaded = self._window_done and self._window_missed / self._window_done > self.miss_tolerance
+        utilization = self._window_busy / elapsed
+
+        if overloaded:
+            self._clean_windows = 0
+            # Lowest priority class that can still give something up
+            for priority in reversed(self.classes):
+                if self._levels[priority.name] < len(DEGRADE_STEPS) - 1:
+                    self._levels[priority.name] += 1
+                    logger.warning(f"Inference overloaded ({self._window_missed}/{self._window_done} "
+                                   f"deadlines missed): degrading '{priority.name}' cameras to "
+                                   f"stride/scale {DEGRADE_STEPS[self._levels[priority.name]]}")
+                    break
+        elif utilization < self.headroom:
+            self._clean_windows += 1
+            if self._clean_windows >= self.recover_windows:
+                self._clean_windows = 0
+                # Highest priority class gets its quality back first
+                for priority in self.classes:
+                    if self._levels[priority.name] > 0:
+                        self._levels[priority.name] -= 1
+                        logger.info(f"Inference load recovered: restoring '{priority.name}' cameras "
+                                    f"to stride/scale {DEGRADE_STEPS[self._levels[priority.name]]}")
+                        break
+        else:
+            self._clean_windows = 0
+
+        self._window_start = now
+        self._window_done = 0
+        self._window_missed = 0
+        self._window_busy = 0.0
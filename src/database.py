@@ -7,9 +7,11 @@ import sqlite3
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
 
+from taxonomy import SEVERITY_LOW, VIOLATION_TYPE_IDS, create_violation_types, resolve_code_sql
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,13 +32,16 @@ class Database:
         
         # Initialize database
         self.conn = None
+        self._violation_type_ids: Dict[str, int] = {}
         self.connect()
         self.create_tables()
     
     def connect(self):
         """Establish database connection"""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Camera worker processes write concurrently: wait for locks, WAL for readers
+            self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
             self.conn.row_factory = sqlite3.Row  # Enable column access by name
             logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
@@ -61,6 +66,12 @@ class Database:
             )
         ''')
         
+        # Period scans for reports
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_detections_timestamp
+            ON detections(timestamp)
+        ''')
+        
         # Violations table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS violations (
@@ -74,10 +85,30 @@ class Database:
                 image_path TEXT,
                 alert_sent BOOLEAN DEFAULT 0,
                 resolved BOOLEAN DEFAULT 0,
-                notes TEXT
+                notes TEXT,
+                violation_type_id INTEGER REFERENCES violation_types(id)
             )
         ''')
         
+        # Violation type dimension (integer code, display name, severity)
+        create_violation_types(cursor)
+        
+        cursor.execute("PRAGMA table_info(violations)")
+        if 'violation_type_id' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE violations ADD COLUMN violation_type_id INTEGER')
+        
+        # Type/severity filters compare integer codes
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_violations_type
+            ON violations(violation_type_id, timestamp)
+        ''')
+        
+        # Newest-first listing and keyset pagination
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_violations_timestamp
+            ON violations(timestamp, id)
+        ''')
+        
         # Statistics table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS statistics (
@@ -155,13 +186,15 @@ class Database:
             ID of inserted record
         """
         cursor = self.conn.cursor()
+        type_id = self._get_violation_type_id(violation_type)
         
         cursor.execute('''
             INSERT INTO violations 
-            (camera_source, violation_type, person_id, confidence, bbox, image_path, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            (camera_source, violation_type, person_id, confidence, bbox, image_path, notes,
+             violation_type_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (camera_source, violation_type, person_id, confidence, 
-              json.dumps(bbox), image_path, notes))
+              json.dumps(bbox), image_path, notes, type_id))
         
         self.conn.commit()
         violation_id = cursor.lastrowid
@@ -169,6 +202,27 @@ class Database:
         logger.info(f"Violation logged: {violation_type} (ID: {violation_id})")
         return violation_id
     
+    def _get_violation_type_id(self, violation_type: Optional[str]) -> Optional[int]:
+        """Integer code of a violation type, registering unknown types as low severity"""
+        if not violation_type:
+            return None
+        type_id = VIOLATION_TYPE_IDS.get(violation_type) or self._violation_type_ids.get(violation_type)
+        if type_id is not None:
+            return type_id
+        
+        # Same resolution (existing code, keyword, new type) as the API's trigger and backfill
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT {resolve_code_sql(":name")}', {'name': violation_type})
+        code = cursor.fetchone()[0]
+        cursor.execute(
+            'INSERT OR IGNORE INTO violation_types (code, display_name, severity) VALUES (?, ?, ?)',
+            (code, violation_type, SEVERITY_LOW)
+        )
+        cursor.execute('SELECT id FROM violation_types WHERE code = ?', (code,))
+        type_id = cursor.fetchone()[0]
+        self._violation_type_ids[violation_type] = type_id
+        return type_id
+    
     def log_alert(self, violation_id: int, alert_type: str, 
                   recipient: str, status: str, message: str) -> int:
         """
@@ -195,23 +249,77 @@ class Database:
         return cursor.lastrowid
     
     def get_violations(self, limit: int = 100, resolved: bool = None,
-                      start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
+                      start_date: datetime = None, end_date: datetime = None,
+                      before: Optional[Tuple[str, int]] = None,
+                      columns: Optional[List[str]] = None) -> List[Dict]:
         """
-        Retrieve violations from database
+        Retrieve violations from database, newest first
         
         Args:
             limit: Maximum number of records to retrieve
             resolved: Filter by resolved status (None = all)
             start_date: Start date filter
             end_date: End date filter
+            before: (timestamp, id) of the last record of the previous page
+            columns: Columns to return (None = all)
             
         Returns:
             List of violation records
         """
         cursor = self.conn.cursor()
+        query, params = self._violations_query(resolved, start_date, end_date, before, columns)
+        cursor.execute(query + " LIMIT ?", params + [limit])
+        cursor.arraysize = limit
         
-        query = "SELECT * FROM violations WHERE 1=1"
-        params = []
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+    
+    def iter_violations(self, batch_size: int = 1000, resolved: bool = None,
+                        start_date: datetime = None, end_date: datetime = None,
+                        columns: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """
+        Iterate over all matching violations in batches, newest first
+        
+        Each batch is a separate keyset query, so memory use stays bounded
+        and no read transaction is held between batches.
+        
+        Args:
+            batch_size: Records per batch
+            resolved: Filter by resolved status (None = all)
+            start_date: Start date filter
+            end_date: End date filter
+            columns: Columns to return (None = all; 'timestamp' and 'id' are always included)
+            
+        Yields:
+            Lists of violation records
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ['timestamp', 'id']))
+        
+        before = None
+        while True:
+            batch = self.get_violations(batch_size, resolved, start_date, end_date, before, columns)
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            before = (batch[-1]['timestamp'], batch[-1]['id'])
+    
+    def _violations_query(self, resolved: bool, start_date: datetime, end_date: datetime,
+                          before: Optional[Tuple[str, int]],
+                          columns: Optional[List[str]]) -> Tuple[str, List[Any]]:
+        if columns:
+            known = self._violation_columns()
+            unknown = [column for column in columns if column not in known]
+            if unknown:
+                raise ValueError(f"Unknown violation columns: {unknown}")
+            select = ", ".join(columns)
+        else:
+            select = "*"
+        
+        query = f"SELECT {select} FROM violations WHERE 1=1"
+        params: List[Any] = []
         
         if resolved is not None:
             query += " AND resolved = ?"
@@ -225,13 +333,16 @@ class Database:
             query += " AND timestamp <= ?"
             params.append(end_date.isoformat())
         
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if before is not None:
+            query += " AND (timestamp, id) < (?, ?)"
+            params.extend(before)
         
-        return [dict(row) for row in rows]
+        query += " ORDER BY timestamp DESC, id DESC"
+        return query, params
+    
+    def _violation_columns(self) -> List[str]:
+        cursor = self.conn.execute("PRAGMA table_info(violations)")
+        return [row[1] for row in cursor.fetchall()]
     
     def get_statistics(self, days: int = 7) -> Dict[str, Any]:
         """
@@ -3,23 +3,60 @@
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Callable, Tuple, Optional
 import logging
-from ultralytics import YOLO
 
+from inference_server import InferenceClient, parse_result, yolo_predict
+from preprocess import LetterboxPreprocessor
 from utils import (
     draw_bbox, get_violation_color, save_frame,
     is_wearing_ppe, validate_bbox
 )
+from video_writer import AsyncVideoWriter
 
 logger = logging.getLogger(__name__)
 
 
+class AnnotatedFrame:
+    """
+    Lazily rendered annotation view of a frame
+
+    Bounding boxes and the info overlay are drawn the first time a consumer
+    (preview, stream, evidence, recorder) asks for the image, and the result
+    is reused by every later consumer of the same frame.
+    """
+
+    def __init__(self, frame: np.ndarray, render: Callable[[np.ndarray], np.ndarray]):
+        """
+        Args:
+            frame: Raw frame (BGR format)
+            render: Function that returns an annotated copy of the frame
+        """
+        self.raw = frame
+        self._render = render
+        self._image: Optional[np.ndarray] = None
+
+    @property
+    def image(self) -> np.ndarray:
+        """Annotated frame, rendered on first access"""
+        if self._image is None:
+            self._image = self._render(self.raw)
+        return self._image
+
+    @property
+    def is_rendered(self) -> bool:
+        return self._image is not None
+
+    def __call__(self) -> np.ndarray:
+        return self.image
+
+
 class PPEDetector:
     
     
     def __init__(self, model_path: str, confidence: float = 0.5,
-                 iou_threshold: float = 0.45, device: str = 'cpu'):
+                 iou_threshold: float = 0.45, device: str = 'cpu',
+                 client: Optional[InferenceClient] = None, img_size: int = 640):
         """
         Initialize PPE detector
         
@@ -28,28 +65,38 @@ class PPEDetector:
             confidence: Confidence threshold for detections
             iou_threshold: IoU threshold for NMS
             device: Device to run inference on ('cpu' or 'cuda')
+            client: Inference server connection; when given, no model is loaded here
+            img_size: Model input size
         """
         self.model_path = model_path
         self.confidence = confidence
         self.iou_threshold = iou_threshold
         self.device = device
+        self.client = client
         
-        # Load model
-        self.model = self._load_model()
+        # Load model (the inference server holds it otherwise)
+        self.model = self._load_model() if client is None else None
+        # Letterboxes frames into input buffers reused across frames
+        self.preprocessor = LetterboxPreprocessor(img_size) if client is None else None
         
         # Detection classes
         self.ppe_classes = ['helmet', 'vest', 'gloves', 'boots']
         self.violation_classes = ['no_helmet', 'no_vest', 'no_gloves']
         self.person_class = 'person'
         
+        # Box color per model class id, resolved once per class
+        self._class_colors: Dict[int, Tuple[int, int, int]] = {}
+        
         # Statistics
         self.total_detections = 0
         self.total_violations = 0
         
         logger.info(f"PPE Detector initialized with model: {model_path}")
     
-    def _load_model(self) -> YOLO:
-       
+    def _load_model(self) -> 'YOLO':
+        # Imported here so that inference server clients do not load torch
+        from ultralytics import YOLO
+        
         try:
             if not Path(self.model_path).exists():
                 logger.warning(f"Model not found at {self.model_path}, using default YOLOv8n")
@@ -75,12 +122,12 @@ class PPEDetector:
         Returns:
             Tuple of (annotated frame, list of detections)
         """
-        # Run inference
-        results = self.model(frame, conf=self.confidence, iou=self.iou_threshold,
-                           device=self.device, verbose=False)
-        
-        # Parse results
-        detections = self._parse_results(results[0])
+        # Run inference (locally or on the inference server)
+        if self.client is not None:
+            detections = self.client.detect(frame, self.confidence, self.iou_threshold)
+        else:
+            detections = yolo_predict(self.model, self.preprocessor, [frame], self.confidence,
+                                      self.iou_threshold, self.device)[0]
         
         # Analyze PPE compliance
         compliance_results = self._analyze_compliance(detections)
@@ -96,6 +143,23 @@ class PPEDetector:
         
         return frame, compliance_results
     
+    def annotate(self, frame: np.ndarray, compliance_results: Dict) -> AnnotatedFrame:
+        """
+        Create a lazy annotation view for detection results
+        
+        Args:
+            frame: Input frame (BGR format)
+            compliance_results: Results returned by detect()
+            
+        Returns:
+            AnnotatedFrame that draws detections only when its image is used
+        """
+        return AnnotatedFrame(
+            frame,
+            lambda raw: self._draw_detections(raw, compliance_results['all_detections'],
+                                              compliance_results)
+        )
+    
     def _parse_results(self, result) -> List[Dict]:
         """
         Parse YOLO detection results
@@ -106,30 +170,7 @@ class PPEDetector:
         Returns:
             List of detection dictionaries
         """
-        detections = []
-        
-        if result.boxes is None or len(result.boxes) == 0:
-            return detections
-        
-        boxes = result.boxes.xyxy.cpu().numpy()
-        confidences = result.boxes.conf.cpu().numpy()
-        class_ids = result.boxes.cls.cpu().numpy().astype(int)
-        
-        for i, (box, conf, cls_id) in enumerate(zip(boxes, confidences, class_ids)):
-            # Get class name
-            class_name = result.names[cls_id]
-            
-            detection = {
-                'id': i,
-                'class': class_name,
-                'confidence': float(conf),
-                'bbox': box.tolist(),
-                'class_id': int(cls_id)
-            }
-            
-            detections.append(detection)
-        
-        return detections
+        return parse_result(result)
     
     def _analyze_compliance(self, detections: List[Dict]) -> Dict[str, Any]:
         """
@@ -250,7 +291,10 @@ class PPEDetector:
             confidence = detection['confidence']
             
             # Get color based on class
-            color = get_violation_color(class_name)
+            color = self._class_colors.get(detection['class_id'])
+            if color is None:
+                color = get_violation_color(class_name)
+                self._class_colors[detection['class_id']] = color
             
             # Draw bounding box
             annotated_frame = draw_bbox(
@@ -270,12 +314,14 @@ class PPEDetector:
         }
         
         from utils import create_info_overlay
-        annotated_frame = create_info_overlay(annotated_frame, summary, position='top-left')
+        annotated_frame = create_info_overlay(annotated_frame, summary, position='top-left',
+                                              inplace=True)
         
         return annotated_frame
     
     def process_video(self, video_source: Any, output_path: str = None,
-                     show_preview: bool = True, save_violations: bool = True) -> Dict[str, Any]:
+                     show_preview: bool = True, save_violations: bool = True,
+                     writer_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process video stream for PPE detection
         
@@ -284,6 +330,8 @@ class PPEDetector:
             output_path: Path to save output video (optional)
             show_preview: Whether to show live preview
             save_violations: Whether to save violation frames
+            writer_options: Extra AsyncVideoWriter options (codec, quality,
+                            segment_seconds, queue_size, hw_acceleration)
             
         Returns:
             Dictionary with processing statistics
@@ -302,11 +350,11 @@ class PPEDetector:
         
         logger.info(f"Video source opened: {width}x{height} @ {fps} FPS")
         
-        # Initialize video writer if output path provided
+        # Initialize background video writer if output path provided
         writer = None
         if output_path:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            writer = AsyncVideoWriter(output_path, fps, (width, height),
+                                      **(writer_options or {})).start()
         
         # Processing statistics
         stats = {
@@ -324,8 +372,9 @@ class PPEDetector:
                 
                 stats['total_frames'] += 1
                 
-                # Perform detection
-                annotated_frame, results = self.detect(frame, visualize=True)
+                # Perform detection (annotation is drawn only if something uses it)
+                _, results = self.detect(frame, visualize=False)
+                annotated = self.annotate(frame, results)
                 
                 # Check for violations
                 if results['violations']:
@@ -333,16 +382,16 @@ class PPEDetector:
                     
                     # Save violation frame
                     if save_violations:
-                        violation_path = save_frame(annotated_frame, prefix='violation')
+                        violation_path = save_frame(annotated.image, prefix='violation')
                         stats['violation_frames'].append(violation_path)
                 
-                # Write to output video
+                # Queue for output video (dropped if the encoder falls behind)
                 if writer:
-                    writer.write(annotated_frame)
+                    writer.write(annotated.image)
                 
                 # Show preview
                 if show_preview:
-                    cv2.imshow('PPE Detection', annotated_frame)
+                    cv2.imshow('PPE Detection', annotated.image)
                     
                     # Break on 'q' key
                     if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -352,6 +401,9 @@ class PPEDetector:
             cap.release()
             if writer:
                 writer.release()
+                writer_stats = writer.get_statistics()
+                stats['frames_dropped'] = writer_stats['frames_dropped']
+                stats['output_segments'] = writer_stats['segments']
             if show_preview:
                 cv2.destroyAllWindows()
         
@@ -376,20 +428,41 @@ class PPEDetector:
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Test PPE Detector')
+    parser.add_argument('--webcam', action='store_true', help='Run detection on webcam 0')
+    parser.add_argument('--video', type=str, default=None, help='Run detection on a video file')
+    parser.add_argument('--inference-server', type=str, default=None, metavar='SOCKET',
+                        help='Use a running inference server instead of loading the model')
+    args = parser.parse_args()
+    
     # Test detector
     logging.basicConfig(level=logging.INFO)
     
     print("🔍 Testing PPE Detector...")
     
+    client = InferenceClient(socket_path=args.inference_server) if args.inference_server else None
+    
     # Initialize detector (will use default YOLOv8n if custom model not found)
     detector = PPEDetector(
         model_path="models/best.pt",
         confidence=0.5,
-        device='cpu'
+        device='cpu',
+        client=client
     )
     
     print("✅ Detector initialized successfully!")
-    print("\nTo test with webcam, run:")
-    print("  python src/detector.py --webcam")
-    print("\nTo test with video file, run:")
-    print("  python src/detector.py --video path/to/video.mp4")
+    
+    source = 0 if args.webcam else args.video
+    if source is None:
+        print("\nTo test with webcam, run:")
+        print("  python src/detector.py --webcam")
+        print("\nTo test with video file, run:")
+        print("  python src/detector.py --video path/to/video.mp4")
+        print("\nAdd --inference-server logs/smartapd-inference.sock to use a running inference server")
+    else:
+        print(detector.process_video(source))
+    
+    if client is not None:
+        client.close()
@@ -0,0 +1,189 @@
+"""
+Event Bus Module
+Publishes detector events (detections, violations, camera status, stats)
+to the API over a local socket, with an in-process fallback
+"""
+
+import sys
+import json
+import time
+import queue
+import socket
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Event types shared with api/events.py
+EVENT_DETECTION = 'detection'
+EVENT_VIOLATION = 'violation'
+EVENT_CAMERA_STATUS = 'camera_status'
+EVENT_STATS = 'stats'
+
+
+def unix_sockets_supported() -> bool:
+    """Whether a Unix domain socket can be used on this platform"""
+    return sys.platform != 'win32' and hasattr(socket, 'AF_UNIX')
+
+
+def encode_event(event_type: str, data: Dict[str, Any]) -> bytes:
+    """
+    Encode an event as one NDJSON line
+
+    Args:
+        event_type: Event type
+        data: Event payload
+
+    Returns:
+        UTF-8 encoded JSON line
+    """
+    event = {
+        'type': event_type,
+        'data': data,
+        'timestamp': datetime.now().isoformat()
+    }
+    return (json.dumps(event, default=str) + "\n").encode('utf-8')
+
+
+class InProcessEventBus:
+    """Synchronous in-process event bus"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """
+        Register an event listener
+
+        Args:
+            callback: Function called with (event_type, data)
+        """
+        self._subscribers.append(callback)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """
+        Publish an event to local subscribers
+
+        Args:
+            event_type: Event type
+            data: Event payload
+        """
+        for callback in self._subscribers:
+            try:
+                callback(event_type, data)
+            except Exception as e:
+                logger.error(f"Event subscriber error ({event_type}): {e}")
+
+    def close(self):
+        """Release resources"""
+        self._subscribers.clear()
+
+
+class EventPublisher(InProcessEventBus):
+    """
+    Event bus that also forwards events to the API event server.
+
+    Events are queued and sent by a background thread, so publishing never
+    blocks detection. When the API is unreachable or the queue is full,
+    events are dropped (and counted) while local subscribers still get them.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+                 port: int = 8766, queue_size: int = 1000, reconnect_seconds: float = 3.0):
+        """
+        Initialize event publisher
+
+        Args:
+            socket_path: Unix socket path of the API event server
+            host: TCP host, used when Unix sockets are unavailable
+            port: TCP port, used when Unix sockets are unavailable
+            queue_size: Maximum number of events waiting to be sent
+            reconnect_seconds: Delay between connection attempts
+        """
+        super().__init__()
+        self.socket_path = socket_path if socket_path and unix_sockets_supported() else None
+        self.host = host
+        self.port = port
+        self.reconnect_seconds = reconnect_seconds
+
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=queue_size)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='event-publisher', daemon=True)
+        self._thread.start()
+
+        # Statistics
+        self.events_sent = 0
+        self.events_dropped = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        super().publish(event_type, data)
+        try:
+            self._queue.put_nowait(encode_event(event_type, data))
+        except queue.Full:
+            self.events_dropped += 1
+
+    def close(self, timeout: float = 2.0):
+        """Flush queued events (best effort) and stop the sender"""
+        self._running = False
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        super().close()
+
+    def _connect(self) -> socket.socket:
+        if self.socket_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.reconnect_seconds)
+            sock.connect(self.socket_path)
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.reconnect_seconds)
+        sock.settimeout(None)
+        return sock
+
+    def _run(self):
+        sock: Optional[socket.socket] = None
+        pending: Optional[bytes] = None
+
+        while True:
+            if pending is None:
+                pending = self._queue.get()
+                if pending is None:
+                    break
+
+            if sock is None:
+                try:
+                    sock = self._connect()
+                    logger.info("Event bus connected to API")
+                except OSError:
+                    # API not running: drop what is queued rather than replaying stale events
+                    self.events_dropped += 1 + self._queue.qsize()
+                    self._drain()
+                    pending = None
+                    if not self._running:
+                        break
+                    time.sleep(self.reconnect_seconds)
+                    continue
+
+            try:
+                sock.sendall(pending)
+                self.events_sent += 1
+                pending = None
+            except OSError as e:
+                logger.warning(f"Event bus connection lost: {e}")
+                sock.close()
+                sock = None
+
+        if sock is not None:
+            sock.close()
+
+    def _drain(self):
+        while True:
+            try:
+                if self._queue.get_nowait() is None:
+                    self._running = False
+            except queue.Empty:
+                return
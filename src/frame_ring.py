@@ -0,0 +1,355 @@
+"""
+Shared-Memory Frame Ring Module
+Moves frames from a capture process to an inference process without
+copying or pickling them: preallocated frame slots in shared memory,
+small slot-index messages over a pipe, and explicit slot ownership
+"""
+
+import time
+import struct
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Slot states; each transition is made by exactly one side:
+# producer FREE -> WRITING -> READY (or back to FREE), consumer READY -> READING -> FREE
+SLOT_FREE = 0
+SLOT_WRITING = 1
+SLOT_READY = 2
+SLOT_READING = 3
+
+# Per-slot header: state, height, width, channels, sequence, timestamp
+_HEADER_FIELDS = 6
+_HEADER_BYTES = 64
+_ALIGN = 64
+
+# Slot index message: slot, sequence, timestamp (slot -1 = producer closed)
+_MESSAGE = struct.Struct('<iqd')
+
+DEFAULT_SLOT_BYTES = 1920 * 1080 * 3
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class FrameView:
+    """
+    A received frame; the consumer owns its slot until release()
+
+    The array is a view into shared memory: it must not be used after
+    release(), and anything that outlives the frame must copy it.
+    """
+
+    def __init__(self, ring: 'FrameRing', slot: int, seq: int, timestamp: float, array: np.ndarray):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp
+        self.array = array
+        self._released = False
+
+    def release(self):
+        """Hand the slot back to the producer"""
+        if not self._released:
+            self._released = True
+            self.array = None
+            self.ring.release(self.slot)
+
+    def __enter__(self) -> 'FrameView':
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class FrameRing:
+    """
+    Single-producer, single-consumer ring of frame slots in shared memory.
+
+    The producer acquire()s a free slot, writes the frame straight into
+    buffer() (e.g. cap.read(buffer)), and publish()es it; only the slot
+    index crosses the pipe. The consumer get()s a FrameView, reads the
+    array in place and release()s the slot. When every slot is busy the
+    producer drops the new frame instead of waiting, so a slow consumer
+    never builds up latency.
+
+    Create the ring in the parent process and pass it to both worker
+    processes (it attaches to the same shared memory when unpickled).
+    """
+
+    def __init__(self, slots: int = 4, slot_bytes: int = DEFAULT_SLOT_BYTES, ctx=None):
+        """
+        Create a frame ring
+
+        Args:
+            slots: Number of frame slots
+            slot_bytes: Capacity of a slot (largest height x width x channels)
+            ctx: multiprocessing context used for the message pipe
+        """
+        if slots < 2:
+            raise ValueError("A frame ring needs at least 2 slots")
+        ctx = ctx or mp.get_context()
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=self._size(slots, slot_bytes))
+        self._owner = True
+        self._receiver, self._sender = ctx.Pipe(duplex=False)
+        self._attach()
+        self._header[:] = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            'name': self._shm.name,
+            'slots': self.slots,
+            'slot_bytes': self.slot_bytes,
+            'receiver': self._receiver,
+            'sender': self._sender,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.slots = state['slots']
+        self.slot_bytes = state['slot_bytes']
+        self._receiver = state['receiver']
+        self._sender = state['sender']
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self._attach()
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # Producer side
+
+    def acquire(self) -> Optional[int]:
+        """
+        Take a free slot for writing
+
+        Returns:
+            Slot index, or None when every slot is still owned by the consumer
+        """
+        for offset in range(self.slots):
+            slot = (self._next + offset) % self.slots
+            if self._header[slot, 0] == SLOT_FREE:
+                self._header[slot, 0] = SLOT_WRITING
+                self._next = (slot + 1) % self.slots
+                return slot
+        self.frames_dropped += 1
+        return None
+
+    def buffer(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Writable view of a slot the producer holds
+
+        Args:
+            slot: Slot from acquire()
+            shape: Frame shape, e.g. (720, 1280, 3)
+        """
+        height, width = shape[0], shape[1]
+        channels = shape[2] if len(shape) > 2 else 1
+        if height * width * channels > self.slot_bytes:
+            raise ValueError(f"Frame {shape} does not fit a {self.slot_bytes} byte slot")
+        self._header[slot, 1:4] = (height, width, channels)
+        return self._view(slot, shape)
+
+    def publish(self, slot: int, timestamp: Optional[float] = None) -> int:
+        """
+        Hand a written slot to the consumer
+
+        Returns:
+            Sequence number of the frame
+        """
+        self._seq += 1
+        timestamp = time.time() if timestamp is None else timestamp
+        self._header[slot, 4] = self._seq
+        self._header[slot, 5] = int(timestamp * 1e6)
+        self._header[slot, 0] = SLOT_READY
+        self._sender.send_bytes(_MESSAGE.pack(slot, self._seq, timestamp))
+        self.frames_published += 1
+        return self._seq
+
+    def abandon(self, slot: int):
+        """Return an acquired slot without publishing it (e.g. a failed read)"""
+        self._header[slot, 0] = SLOT_FREE
+
+    def put(self, frame: np.ndarray, timestamp: Optional[float] = None) -> Optional[int]:
+        """
+        Copy a frame into a free slot and publish it (for sources that
+        return their own arrays; prefer writing into buffer() directly)
+
+        Returns:
+            Sequence number, or None if the frame was dropped
+        """
+        slot = self.acquire()
+        if slot is None:
+            return None
+        np.copyto(self.buffer(slot, frame.shape), frame)
+        return self.publish(slot, timestamp)
+
+    def close_producer(self):
+        """Tell the consumer no more frames will come"""
+        try:
+            self._sender.send_bytes(_MESSAGE.pack(-1, 0, 0.0))
+        except (OSError, ValueError):
+            pass
+
+    # Consumer side
+
+    def get(self, timeout: Optional[float] = None, latest: bool = False) -> Optional[FrameView]:
+        """
+        Receive the next frame
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+            latest: Skip (and release) frames that are already superseded
+
+        Returns:
+            FrameView, or None on timeout or when the producer closed
+        """
+        view = None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if view is not None:
+                # Only take what is already waiting
+                remaining = 0.0
+            if not self._receiver.poll(remaining):
+                return view
+            slot, seq, timestamp = _MESSAGE.unpack(self._receiver.recv_bytes())
+            if slot < 0:
+                self.closed = True
+                return view
+            # Messages left over from before a recover() are ignored
+            if self._header[slot, 0] != SLOT_READY or self._header[slot, 4] != seq:
+                continue
+            self._header[slot, 0] = SLOT_READING
+            height, width, channels = (int(v) for v in self._header[slot, 1:4])
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            if view is not None:
+                self.frames_skipped += 1
+                view.release()
+            view = FrameView(self, slot, seq, timestamp, self._view(slot, shape))
+            self.frames_received += 1
+            if not latest:
+                return view
+
+    def release(self, slot: int):
+        """Return a slot to the producer"""
+        self._header[slot, 0] = SLOT_FREE
+
+    # Both sides
+
+    def recover(self, producer: bool):
+        """
+        Reclaim slots a crashed peer left behind (call when a restarted
+        producer or consumer attaches)
+
+        Args:
+            producer: True when the producer restarted, False for the consumer
+        """
+        stuck = (SLOT_WRITING,) if producer else (SLOT_READY, SLOT_READING)
+        reclaimed = 0
+        for slot in range(self.slots):
+            if self._header[slot, 0] in stuck:
+                self._header[slot, 0] = SLOT_FREE
+                reclaimed += 1
+        if producer:
+            self._seq = int(self._header[:, 4].max())
+        if reclaimed:
+            logger.info(f"Frame ring {self.name}: reclaimed {reclaimed} slot(s)")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        states = self._header[:, 0]
+        return {
+            'slots': self.slots,
+            'free': int((states == SLOT_FREE).sum()),
+            'published': self.frames_published,
+            'dropped': self.frames_dropped,
+            'received': self.frames_received,
+            'skipped': self.frames_skipped,
+        }
+
+    def close(self):
+        """Detach from the shared memory (the creator also frees it)"""
+        self._header = None
+        self._data = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _size(slots: int, slot_bytes: int) -> int:
+        return _aligned(slots * _HEADER_BYTES) + slots * _aligned(slot_bytes)
+
+    def _attach(self):
+        header_size = _aligned(self.slots * _HEADER_BYTES)
+        self._header = np.ndarray((self.slots, _HEADER_BYTES // 8), dtype=np.int64,
+                                  buffer=self._shm.buf)[:, :_HEADER_FIELDS]
+        self._data = self._shm.buf[header_size:]
+        self._stride = _aligned(self.slot_bytes)
+        self._next = 0
+        self._seq = int(self._header[:, 4].max()) if not self._owner else 0
+        self.closed = False
+
+        # Statistics (per process)
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.frames_received = 0
+        self.frames_skipped = 0
+
+    def _view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._data, offset=slot * self._stride)
+
+
+def grab_frames(read: Callable[[Optional[np.ndarray]], Tuple[bool, Optional[np.ndarray]]],
+                ring: FrameRing, stop_event=None, heartbeat=None,
+                on_frame: Optional[Callable[[], None]] = None) -> bool:
+    """
+    Capture loop feeding a ring: frames are decoded straight into slots
+
+    Args:
+        read: cap.read-style function; called with the slot buffer to fill
+            (None for the first frame, whose shape is not known yet)
+        ring: Frame ring (producer side)
+        stop_event: Event that ends the loop
+        heartbeat: Supervisor heartbeat, beaten per captured frame
+        on_frame: Optional callback per captured frame
+
+    Returns:
+        True when stopped, False when a read failed
+    """
+    shape = None
+    spare = None
+    while stop_event is None or not stop_event.is_set():
+        slot = ring.acquire()
+        if slot is None:
+            # Consumer is behind: decode into a spare array and drop it, so
+            # the camera buffer does not fill up with stale frames
+            ok, spare = read(spare)
+            if not ok:
+                return False
+        else:
+            target = ring.buffer(slot, shape) if shape is not None else None
+            ok, frame = read(target)
+            if not ok:
+                ring.abandon(slot)
+                return False
+            if target is None or frame.ctypes.data != target.ctypes.data:
+                # First frame or a resolution change: the reader allocated its own array
+                shape = frame.shape
+                np.copyto(ring.buffer(slot, shape), frame)
+            ring.publish(slot)
+        if heartbeat is not None:
+            heartbeat.beat()
+        if on_frame is not None:
+            on_frame()
+    return True
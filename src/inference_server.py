@@ -0,0 +1,594 @@
+"""
+Inference Server Module
+One process per machine holds the YOLO model(s); local detector clients
+send frames through shared memory and get parsed detections back, with
+requests from several clients batched into one model call
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from batch_scheduler import EdfBatchScheduler, Pending
+from event_bus import unix_sockets_supported
+from preprocess import LetterboxPreprocessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'default'
+
+# Backend: (frames, confidence, iou) -> detections per frame
+Backend = Callable[[List[np.ndarray], float, float], List[List[Dict]]]
+
+
+def parse_result(result) -> List[Dict]:
+    """
+    Parse a YOLO result into detection dicts
+
+    Args:
+        result: YOLO result object of one frame
+
+    Returns:
+        List of detection dictionaries
+    """
+    detections = []
+
+    if result.boxes is None or len(result.boxes) == 0:
+        return detections
+
+    boxes = result.boxes.xyxy.cpu().numpy()
+    confidences = result.boxes.conf.cpu().numpy()
+    class_ids = result.boxes.cls.cpu().numpy().astype(int)
+
+    for i, (box, conf, cls_id) in enumerate(zip(boxes, confidences, class_ids)):
+        detections.append({
+            'id': i,
+            'class': result.names[cls_id],
+            'confidence': float(conf),
+            'bbox': box.tolist(),
+            'class_id': int(cls_id)
+        })
+
+    return detections
+
+
+def yolo_predict(model, preprocessor: LetterboxPreprocessor, frames: List[np.ndarray],
+                 confidence: float, iou: float, device: str = 'cpu') -> List[List[Dict]]:
+    """
+    Run a YOLO model on frames letterboxed by a preprocessor
+
+    The model gets the prepared BCHW tensor (ultralytics skips its own
+    letterbox and normalization for tensors) and the boxes are mapped back
+    with the cached geometry of each frame.
+
+    torch.from_numpy does not copy: the tensor is a view of the
+    preprocessor's reused input buffer, so the next prepare() on the same
+    preprocessor overwrites it. The results are parsed here before
+    returning; callers must not run another batch on the same
+    preprocessor while a model call is still reading the tensor.
+
+    Args:
+        model: YOLO model
+        preprocessor: Owner of the reusable input buffers
+        frames: BGR frames
+        confidence: Confidence threshold
+        iou: IoU threshold for NMS
+        device: Device to run inference on ('cpu' or 'cuda')
+
+    Returns:
+        Detections per frame, in frame coordinates
+    """
+    import torch
+
+    inputs, geometries = preprocessor.prepare(frames)
+    results = model(torch.from_numpy(inputs), conf=confidence, iou=iou, device=device, verbose=False)
+    return [geometry.unmap_detections(parse_result(result))
+            for result, geometry in zip(results, geometries)]
+
+
+def yolo_backend(weights: str, device: str = 'cpu', img_size: int = 640) -> Backend:
+    """
+    Load YOLO weights as a batching backend
+
+    Args:
+        weights: Path to the model weights (falls back to yolov8n.pt)
+        device: Device to run inference on ('cpu' or 'cuda')
+        img_size: Model input size
+    """
+    from ultralytics import YOLO
+
+    if not Path(weights).exists():
+        logger.warning(f"Model not found at {weights}, using default YOLOv8n")
+        weights = 'yolov8n.pt'
+    model = YOLO(weights)
+    logger.info(f"Model {weights} loaded on {device}")
+    preprocessor = LetterboxPreprocessor(img_size)
+
+    def infer(frames: List[np.ndarray], confidence: float, iou: float) -> List[List[Dict]]:
+        return yolo_predict(model, preprocessor, frames, confidence, iou, device)
+
+    return infer
+
+
+def _untracked(shm: shared_memory.SharedMemory) -> shared_memory.SharedMemory:
+    """
+    Take a segment out of the resource tracker: client and server free it
+    explicitly, and a tracker that is shared between them (or not) must not
+    unlink it or warn about it on its own
+    """
+    if os.name == 'posix':
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _unlink(shm: shared_memory.SharedMemory):
+    """Free an untracked segment (either side may do it first)"""
+    if os.name == 'posix':
+        # unlink() unregisters; keep the tracker balanced
+        resource_tracker.register(shm._name, 'shared_memory')
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        if os.name == 'posix':
+            resource_tracker.unregister(shm._name, 'shared_memory')
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+
+
+class _Client:
+    """Server-side state of one connected client"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.inflight = 0
+        self.closed = False
+
+    def reply(self, message: Dict[str, Any]):
+        with self.lock:
+            try:
+                _send(self.sock, message)
+            except OSError:
+                pass
+
+    def detach(self, unlink: bool = False):
+        if self.shm is not None:
+            self.shm.close()
+            if unlink:
+                # A crashed client cannot free its buffer
+                _unlink(self.shm)
+            self.shm = None
+
+
+class _Request:
+    __slots__ = ('client', 'id', 'frame')
+
+    def __init__(self, client: _Client, request_id: int, frame: np.ndarray):
+        self.client = client
+        self.id = request_id
+        self.frame = frame
+
+
+class InferenceServer:
+    """
+    Local inference service shared by the detector processes of a machine.
+
+    Each client owns a shared-memory frame buffer and sends one small JSON
+    request per frame; the frame stays in place until the reply arrives.
+    Requests for the same model and thresholds are batched by deadline
+    (see EdfBatchScheduler); every reply tells the camera at which frame
+    stride and resolution scale to submit while the server is overloaded.
+    """
+
+    def __init__(self, backends: Dict[str, Backend], socket_path: Optional[str] = None,
+                 host: str = '127.0.0.1', port: int = 8767, max_batch: int = 8,
+                 max_wait_ms: float = 5.0, scheduler: Optional[EdfBatchScheduler] = None):
+        """
+        Initialize inference server
+
+        Args:
+            backends: Loaded models by name
+            socket_path: Unix socket path to listen on
+            host: TCP host, used when Unix sockets are unavailable
+            port: TCP port, used when Unix sockets are unavailable
+            max_batch: Maximum frames per model call
+            max_wait_ms: Longest a request waits for a batch to fill
+            scheduler: Batch scheduler with camera priorities (default: every
+                camera in one class)
+        """
+        self.backends = backends
+        self.socket_path = socket_path if socket_path and unix_sockets_supported() else None
+        self.host = host
+        self.port = port
+        self.scheduler = scheduler or EdfBatchScheduler(max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.max_batch = self.scheduler.max_batch
+
+        self._cond = threading.Condition()
+        self._clients: List[_Client] = []
+        self._listener: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        # Statistics
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._wait_total = 0.0
+
+    @property
+    def address(self):
+        return self.socket_path or (self.host, self.port)
+
+    def start(self) -> 'InferenceServer':
+        """Listen for clients and start batching"""
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+            self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._listener.bind(self.socket_path)
+        else:
+            self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._listener.bind((self.host, self.port))
+            self.port = self._listener.getsockname()[1]
+        self._listener.listen()
+        self._running = True
+        for target, name in ((self._accept, 'inference-accept'), (self._batch_loop, 'inference-batch')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Inference server listening on {self.address} "
+                    f"(models: {', '.join(self.backends)}, max batch {self.max_batch})")
+        return self
+
+    def serve(self, stop_event=None, heartbeat=None, stats_interval: float = 60.0) -> int:
+        """
+        Run until stop_event is set (supervised worker loop)
+
+        Args:
+            stop_event: Event that ends serving
+            heartbeat: Supervisor heartbeat
+            stats_interval: Seconds between statistics log lines
+
+        Returns:
+            Exit code: 0 when stopped, 1 when the batching thread died
+        """
+        if not self._running:
+            self.start()
+        last_stats = time.monotonic()
+        try:
+            while stop_event is None or not stop_event.wait(1.0):
+                if not self._threads[1].is_alive():
+                    logger.error("Inference batching thread stopped")
+                    return 1
+                if heartbeat is not None:
+                    heartbeat.beat()
+                if time.monotonic() - last_stats >= stats_interval:
+                    last_stats = time.monotonic()
+                    logger.info(f"Inference statistics: {self.get_statistics()}")
+            return 0
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop listening and disconnect every client"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        for client in list(self._clients):
+            try:
+                client.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(2.0)
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        logger.info(f"Inference server stopped: {self.get_statistics()}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'clients': len(self._clients),
+            'requests': self.requests,
+            'batches': self.batches,
+            'avg_batch_size': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'avg_wait_ms': round(self._wait_total / self.requests * 1000, 2) if self.requests else 0.0,
+            'errors': self.errors,
+            'scheduler': self.scheduler.get_statistics(),
+        }
+
+    def _accept(self):
+        listener = self._listener
+        listener.settimeout(0.5)
+        while self._running:
+            try:
+                sock, _ = listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            client = _Client(sock)
+            with self._cond:
+                self._clients.append(client)
+            threading.Thread(target=self._handle, args=(client,), name='inference-client',
+                             daemon=True).start()
+
+    def _handle(self, client: _Client):
+        try:
+            for line in client.sock.makefile('rb'):
+                message = None
+                try:
+                    message = json.loads(line)
+                    if message.get('op') == 'attach':
+                        client.detach()
+                        client.shm = _untracked(shared_memory.SharedMemory(name=message['name']))
+                        continue
+
+                    key = (message.get('model', DEFAULT_MODEL), float(message['conf']), float(message['iou']))
+                    shape = tuple(int(n) for n in message['shape'])
+                    request_id = message['id']
+                    if key[0] not in self.backends or client.shm is None or np.prod(shape) > client.shm.size:
+                        self.errors += 1
+                        client.reply({'id': request_id, 'error': f"Invalid request for model {key[0]}"})
+                        continue
+                    frame = np.ndarray(shape, dtype=np.uint8, buffer=client.shm.buf)
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    # Malformed message: report it and keep serving the connection
+                    self.errors += 1
+                    request_id = message.get('id') if isinstance(message, dict) else None
+                    logger.warning(f"Malformed inference request: {e!r}")
+                    client.reply({'id': request_id, 'error': f"Malformed request: {e!r}"})
+                    continue
+
+                with self._cond:
+                    client.inflight += 1
+                    self.scheduler.submit(
+                        _Request(client, request_id, frame), str(message.get('camera', '')), key
+                    )
+                    self._cond.notify()
+                # The buffer cannot be closed while a view of it is left here
+                del frame
+        except (OSError, ValueError) as e:
+            if self._running:
+                logger.debug(f"Inference client disconnected: {e}")
+        finally:
+            with self._cond:
+                self._clients.remove(client)
+                client.closed = True
+                queued = self.scheduler.discard(lambda request: request.client is client)
+                for pending in queued:
+                    pending.item.frame = None
+                client.inflight -= len(queued)
+                # A batch still running on the buffer detaches it when done
+                if not client.inflight:
+                    client.detach(unlink=True)
+                self._cond.notify()
+            client.sock.close()
+
+    def _next_batch(self) -> Optional[List[Pending]]:
+        """Wait for a batch to be due; None when stopping"""
+        with self._cond:
+            while self._running:
+                batch, wait = self.scheduler.next_batch(len(self._clients))
+                if batch is not None:
+                    return batch
+                self._cond.wait(0.5 if wait is None else wait)
+        return None
+
+    def _batch_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            requests = [pending.item for pending in batch]
+            model, confidence, iou = batch[0].key
+            started = time.monotonic()
+            try:
+                results = self.backends[model]([r.frame for r in requests], confidence, iou)
+                finished = time.monotonic()
+                with self._cond:
+                    self.scheduler.complete(batch, started, finished)
+                replies = []
+                for pending, detections in zip(batch, results):
+                    stride, scale = self.scheduler.degradation(pending.camera_id)
+                    replies.append({'id': pending.item.id, 'detections': detections,
+                                    'stride': stride, 'scale': scale})
+                self.batches += 1
+                self.requests += len(batch)
+                self._wait_total += sum(started - p.arrived for p in batch)
+            except Exception as e:
+                logger.error(f"Inference failed ({model}, batch of {len(batch)}): {e}")
+                self.errors += len(batch)
+                replies = [{'id': r.id, 'error': str(e)} for r in requests]
+
+            with self._cond:
+                for request in requests:
+                    request.frame = None
+                    request.client.inflight -= 1
+                    if request.client.closed and not request.client.inflight:
+                        request.client.detach(unlink=True)
+            for request, reply in zip(requests, replies):
+                request.client.reply(reply)
+
+
+class InferenceClient:
+    """
+    Detector-side connection to the inference server
+
+    detect() blocks until the server replies; the client then reuses its
+    shared-memory buffer for the next frame. While the server degrades this
+    camera, only every stride-th frame is sent (the others get the latest
+    detections) and frames are downscaled before sending.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+                 port: int = 8767, model: str = DEFAULT_MODEL, connect_timeout: float = 120.0,
+                 timeout: float = 10.0, camera_id: str = ''):
+        """
+        Initialize inference client
+
+        Args:
+            socket_path: Unix socket path of the server
+            host: TCP host, used when Unix sockets are unavailable
+            port: TCP port, used when Unix sockets are unavailable
+            model: Name of the server model to use
+            connect_timeout: How long to wait for the server (it may still be loading models)
+            timeout: Maximum time for one detection
+            camera_id: Camera identifier, selects the priority class on the server
+        """
+        self.socket_path = socket_path if socket_path and unix_sockets_supported() else None
+        self.host = host
+        self.port = port
+        self.model = model
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.camera_id = camera_id
+
+        # Degradation requested by the server
+        self.stride = 1
+        self.scale = 1.0
+        self.frames_skipped = 0
+        self._frames = 0
+        self._last: List[Dict] = []
+
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._next_id = 0
+
+    def detect(self, frame: np.ndarray, confidence: float = 0.5, iou: float = 0.45) -> List[Dict]:
+        """
+        Run detection on a frame
+
+        Args:
+            frame: Input frame (BGR format, uint8)
+            confidence: Confidence threshold
+            iou: IoU threshold for NMS
+
+        Returns:
+            List of detection dictionaries (as PPEDetector._parse_results)
+
+        Raises:
+            ConnectionError: Server unreachable
+            RuntimeError: Server failed the request
+        """
+        self._frames += 1
+        if self.stride > 1 and self._frames % self.stride:
+            self.frames_skipped += 1
+            return list(self._last)
+        for attempt in range(2):
+            try:
+                return self._request(frame, confidence, iou)
+            except OSError as e:
+                self._disconnect()
+                if attempt:
+                    raise ConnectionError(f"Inference server unavailable: {e}") from e
+                logger.warning(f"Inference server connection lost, reconnecting: {e}")
+
+    def close(self):
+        """Disconnect and free the frame buffer"""
+        if self._shm is not None:
+            self._shm.close()
+            _unlink(self._shm)
+            self._shm = None
+        self._disconnect()
+
+    def _request(self, frame: np.ndarray, confidence: float, iou: float) -> List[Dict]:
+        if self._sock is None:
+            self.connect()
+        height, width = frame.shape[:2]
+        shape = frame.shape
+        if self.scale < 1.0:
+            shape = (max(1, int(height * self.scale)), max(1, int(width * self.scale))) + frame.shape[2:]
+        nbytes = int(np.prod(shape))
+        if self._shm is None or self._shm.size < nbytes:
+            if self._shm is not None:
+                self._shm.close()
+                _unlink(self._shm)
+            self._shm = _untracked(shared_memory.SharedMemory(create=True, size=nbytes))
+            _send(self._sock, {'op': 'attach', 'name': self._shm.name})
+
+        target = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        if shape == frame.shape:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, (shape[1], shape[0]), dst=target, interpolation=cv2.INTER_AREA)
+        del target
+        self._next_id += 1
+        _send(self._sock, {
+            'op': 'detect', 'id': self._next_id, 'shape': list(shape), 'camera': self.camera_id,
+            'model': self.model, 'conf': confidence, 'iou': iou
+        })
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionResetError("Inference server closed the connection")
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(f"Inference failed: {reply['error']}")
+
+        detections = reply['detections']
+        if shape != frame.shape:
+            # Boxes back to the coordinates of the full frame
+            fx, fy = width / shape[1], height / shape[0]
+            for detection in detections:
+                x1, y1, x2, y2 = detection['bbox']
+                detection['bbox'] = [x1 * fx, y1 * fy, x2 * fx, y2 * fy]
+        if (reply.get('stride', 1), reply.get('scale', 1.0)) != (self.stride, self.scale):
+            logger.info(f"Inference server asks camera {self.camera_id or '-'} for stride "
+                        f"{reply.get('stride', 1)}, scale {reply.get('scale', 1.0)}")
+        self.stride = reply.get('stride', 1)
+        self.scale = reply.get('scale', 1.0)
+        self._last = detections
+        return detections
+
+    def connect(self):
+        """Connect to the server, waiting up to connect_timeout for it to come up"""
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                if self.socket_path:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    try:
+                        sock.connect(self.socket_path)
+                    except OSError:
+                        sock.close()
+                        raise
+                else:
+                    sock = socket.create_connection((self.host, self.port))
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+        sock.settimeout(self.timeout)
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        if self._shm is not None:
+            # The server freed the buffer of the lost connection
+            self._shm.close()
+            _unlink(self._shm)
+            self._shm = None
+        logger.info(f"Connected to inference server {self.socket_path or (self.host, self.port)}")
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+            self._reader = None
@@ -3,8 +3,10 @@ import time
 import json
 import requests
 import logging
+import argparse
 from datetime import datetime
-from ultralytics import YOLO
+
+from inference_server import InferenceClient
 
 # Configure logging
 logging.basicConfig(
@@ -20,13 +22,15 @@ class SmartAPDSystem:
     and manual keyboard input to toggle violation states.
     """
     
-    def __init__(self, camera_id=0, model_path='yolov8n.pt'):
+    def __init__(self, camera_id=0, model_path='yolov8n.pt', inference_server=None, server_model='default'):
         """
         Initialize the detector.
         
         Args:
             camera_id (int): ID of the webcam (usually 0).
             model_path (str): Path to YOLO weights.
+            inference_server (str): Socket of a running inference server; replaces loading model_path.
+            server_model (str): Name of the (COCO) model on the inference server.
         """
         self.camera_id = camera_id
         self.is_helmet_missing = False  # Default state: SAFE
@@ -34,13 +38,21 @@ class SmartAPDSystem:
         self.intruder_mode = False     # Default: No intruder simulation
         self.last_log_time = time.time()
         
-        # Initialize YOLO model
-        try:
-            logger.info(f"Loading YOLO model from {model_path}...")
-            self.model = YOLO(model_path)
-        except Exception as e:
-            logger.error(f"Failed to load model: {e}")
-            raise
+        # Initialize YOLO model, or share the one of the inference server
+        self.model = None
+        self.client = None
+        if inference_server:
+            logger.info(f"Using inference server {inference_server} (model '{server_model}')...")
+            self.client = InferenceClient(socket_path=inference_server, model=server_model)
+            self.client.connect()
+        else:
+            try:
+                from ultralytics import YOLO
+                logger.info(f"Loading YOLO model from {model_path}...")
+                self.model = YOLO(model_path)
+            except Exception as e:
+                logger.error(f"Failed to load model: {e}")
+                raise
 
         # Initialize Webcam
         logger.info(f"Opening camera {camera_id}...")
@@ -63,6 +75,22 @@ class SmartAPDSystem:
         # Placeholder for alert sending logic
         pass
 
+    def _detect_persons(self, frame):
+        """
+        Detect persons (Class 0) in a frame.
+        
+        Returns:
+            list: (x1, y1, x2, y2) integer boxes.
+        """
+        if self.client is not None:
+            # Same thresholds as the ultralytics defaults used below
+            detections = self.client.detect(frame, confidence=0.25, iou=0.7)
+            return [tuple(int(v) for v in d['bbox']) for d in detections if d['class_id'] == 0]
+        
+        # verbose=False keeps the terminal clean
+        results = self.model(frame, classes=[0], verbose=False)
+        return [tuple(int(v) for v in box.xyxy[0]) for result in results for box in result.boxes]
+
     def process_frame(self):
         """
         Main processing loop:
@@ -79,40 +107,31 @@ class SmartAPDSystem:
                 break
 
             # Run YOLO inference - Filter for 'person' class only (class 0)
-            # verbose=False keeps the terminal clean
-            results = self.model(frame, classes=[0], verbose=False)
+            boxes = self._detect_persons(frame)
 
             # Person count in current frame
-            person_count = 0
+            person_count = len(boxes)
             
             # Process detections
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    person_count += 1
-                    
-                    # Get coordinates
-                    x1, y1, x2, y2 = box.xyxy[0]
-                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-
-                    # Determine Visuals based on Mock State
-                    if self.is_helmet_missing or self.intruder_mode:
-                        color = self.COLOR_VIOLATION
-                        label = "VIOLATION: NO HELMET" if not self.intruder_mode else "INTRUDER DETECTED"
-                    else:
-                        color = self.COLOR_SAFE
-                        label = "SAFE"
-
-                    # Draw Bounding Box
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-
-                    # Draw Label Background
-                    (w, h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-                    cv2.rectangle(frame, (x1, y1 - 20), (x1 + w, y1), color, -1)
-                    
-                    # Draw Text
-                    cv2.putText(frame, label, (x1, y1 - 5), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            for x1, y1, x2, y2 in boxes:
+                # Determine Visuals based on Mock State
+                if self.is_helmet_missing or self.intruder_mode:
+                    color = self.COLOR_VIOLATION
+                    label = "VIOLATION: NO HELMET" if not self.intruder_mode else "INTRUDER DETECTED"
+                else:
+                    color = self.COLOR_SAFE
+                    label = "SAFE"
+
+                # Draw Bounding Box
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+
+                # Draw Label Background
+                (w, h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+                cv2.rectangle(frame, (x1, y1 - 20), (x1 + w, y1), color, -1)
+                
+                # Draw Text
+                cv2.putText(frame, label, (x1, y1 - 5), 
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
             # Display Help Instructions
             cv2.putText(frame, "Controls: 'M' Violation | 'N' Night Mode | 'I' Intruder | 'S' Safe", 
@@ -198,12 +217,23 @@ class SmartAPDSystem:
     def cleanup(self):
         """Release resources."""
         self.cap.release()
+        if self.client is not None:
+            self.client.close()
         cv2.destroyAllWindows()
         logger.info("Resources released. Exiting.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SmartAPD Mock Detector")
+    parser.add_argument("--camera", type=int, default=0, help="Webcam ID")
+    parser.add_argument("--inference-server", type=str, default=None, metavar="SOCKET",
+                        help="Use a running inference server instead of loading YOLO here")
+    parser.add_argument("--server-model", type=str, default="default",
+                        help="Model name on the inference server (a COCO model, for the person class)")
+    args = parser.parse_args()
+
     try:
-        app = SmartAPDSystem()
+        app = SmartAPDSystem(camera_id=args.camera, inference_server=args.inference_server,
+                             server_model=args.server_model)
         app.process_frame()
     except KeyboardInterrupt:
         logger.info("Interrupted by user.")
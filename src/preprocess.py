@@ -0,0 +1,187 @@
+"""
+Preprocessing Module
+Letterboxes frames into preallocated model input buffers (BCHW, RGB,
+float32 0-1), so resizing, padding and normalizing do not allocate new
+arrays per frame, and maps detections back to frame coordinates
+"""
+
+import logging
+from typing import Dict, List, NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PAD_VALUE = 114
+_NORMALIZE = np.float32(1.0 / 255.0)
+
+
+class Letterbox(NamedTuple):
+    """Geometry of one source resolution in the model input"""
+    scale: float
+    pad_left: int
+    pad_top: int
+    width: int  # Resized frame size
+    height: int
+    input_width: int  # Model input size (multiples of the stride)
+    input_height: int
+    source_width: int
+    source_height: int
+
+    def unmap(self, bbox: List[float]) -> List[float]:
+        """Bounding box from model input to source frame coordinates (clipped)"""
+        x1, y1, x2, y2 = bbox
+        return [
+            min(max((x1 - self.pad_left) / self.scale, 0.0), self.source_width),
+            min(max((y1 - self.pad_top) / self.scale, 0.0), self.source_height),
+            min(max((x2 - self.pad_left) / self.scale, 0.0), self.source_width),
+            min(max((y2 - self.pad_top) / self.scale, 0.0), self.source_height),
+        ]
+
+    def unmap_detections(self, detections: List[Dict]) -> List[Dict]:
+        """Detections (as PPEDetector._parse_results) back to source coordinates"""
+        for detection in detections:
+            detection['bbox'] = self.unmap(detection['bbox'])
+        return detections
+
+
+def letterbox_geometry(height: int, width: int, size: int = 640, stride: int = 32,
+                       rect: bool = True) -> Letterbox:
+    """
+    Letterbox geometry of a resolution (same rounding as ultralytics' LetterBox)
+
+    Args:
+        height: Source frame height
+        width: Source frame width
+        size: Model input size
+        stride: Model stride; the input is padded to a multiple of it
+        rect: Pad to the smallest stride multiple instead of a size x size square
+    """
+    scale = min(size / height, size / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    pad_w, pad_h = size - new_width, size - new_height
+    if rect:
+        pad_w, pad_h = pad_w % stride, pad_h % stride
+    pad_left = int(round(pad_w / 2 - 0.1))
+    pad_top = int(round(pad_h / 2 - 0.1))
+    return Letterbox(scale, pad_left, pad_top, new_width, new_height,
+                     new_width + pad_w, new_height + pad_h, width, height)
+
+
+class LetterboxPreprocessor:
+    """
+    Reusable model input buffers for a camera (or for the batches of an
+    inference server).
+
+    The geometry of each source resolution is computed once. The input
+    buffer of each input shape is allocated once (and grown to the largest
+    batch seen); a slot's padding is only rewritten when the resolution in
+    that slot changes. Frames are resized and split into cached per-resolution
+    planes, which are scaled into the input in channel order RGB.
+    """
+
+    def __init__(self, size: int = 640, stride: int = 32):
+        """
+        Initialize preprocessor
+
+        Args:
+            size: Model input size (model.img_size)
+            stride: Model stride
+        """
+        self.size = size
+        self.stride = stride
+        self._geometry: Dict[Tuple[int, int, bool], Letterbox] = {}
+        self._inputs: Dict[Tuple[int, int], np.ndarray] = {}
+        self._slots: Dict[Tuple[int, int], List[Letterbox]] = {}
+        self._resized: Dict[Tuple[int, int], np.ndarray] = {}
+        self._planes: Dict[Tuple[int, int], List[np.ndarray]] = {}
+
+        # Statistics
+        self.frames = 0
+        self.allocations = 0
+
+    def geometry(self, height: int, width: int, rect: bool = True) -> Letterbox:
+        """Cached letterbox geometry of a source resolution"""
+        key = (height, width, rect)
+        geometry = self._geometry.get(key)
+        if geometry is None:
+            geometry = letterbox_geometry(height, width, self.size, self.stride, rect)
+            self._geometry[key] = geometry
+        return geometry
+
+    def prepare(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, List[Letterbox]]:
+        """
+        Letterbox frames into the model input buffer
+
+        Frames of one resolution use the smallest stride-aligned rectangle;
+        mixed resolutions share a size x size square.
+
+        Args:
+            frames: BGR uint8 frames
+
+        Returns:
+            (input array of shape (n, 3, H, W), geometry per frame). The array
+            is reused by the next call.
+
+        Raises:
+            ValueError: If frames is empty
+        """
+        if not frames:
+            raise ValueError("prepare() needs at least one frame")
+        rect = len({frame.shape[:2] for frame in frames}) == 1
+        geometries = [self.geometry(frame.shape[0], frame.shape[1], rect) for frame in frames]
+        shape = (geometries[0].input_height, geometries[0].input_width)
+        inputs = self._input(shape, len(frames))
+        slots = self._slots[shape]
+        for index, (frame, geometry) in enumerate(zip(frames, geometries)):
+            if slots[index] != geometry:
+                inputs[index].fill(PAD_VALUE * _NORMALIZE)
+                slots[index] = geometry
+            self._write(inputs[index], frame, geometry)
+        self.frames += len(frames)
+        return inputs[:len(frames)], geometries
+
+    def get_statistics(self) -> Dict[str, int]:
+        return {
+            'frames': self.frames,
+            'allocations': self.allocations,
+            'resolutions': len(self._geometry),
+            'buffer_bytes': sum(a.nbytes for a in self._inputs.values())
+            + sum(a.nbytes for a in self._resized.values())
+            + sum(3 * p[0].nbytes for p in self._planes.values()),
+        }
+
+    def _input(self, shape: Tuple[int, int], count: int) -> np.ndarray:
+        inputs = self._inputs.get(shape)
+        if inputs is None or len(inputs) < count:
+            inputs = np.empty((count, 3) + shape, dtype=np.float32)
+            self._inputs[shape] = inputs
+            self._slots[shape] = [None] * count
+            self.allocations += 1
+            logger.debug(f"Allocated model input buffer {inputs.shape}")
+        return inputs
+
+    def _write(self, target: np.ndarray, frame: np.ndarray, geometry: Letterbox):
+        key = (geometry.height, geometry.width)
+        if (geometry.width, geometry.height) != (frame.shape[1], frame.shape[0]):
+            resized = self._resized.get(key)
+            if resized is None:
+                resized = np.empty((geometry.height, geometry.width, 3), dtype=np.uint8)
+                self._resized[key] = resized
+                self.allocations += 1
+            cv2.resize(frame, (geometry.width, geometry.height), dst=resized,
+                       interpolation=cv2.INTER_LINEAR)
+            frame = resized
+
+        planes = self._planes.get(key)
+        if planes is None:
+            planes = list(np.empty((3, geometry.height, geometry.width), dtype=np.uint8))
+            self._planes[key] = planes
+            self.allocations += 1
+        # B, G, R planes -> R, G, B channels as float 0-1
+        cv2.split(frame, planes)
+        for channel, plane in enumerate(reversed(planes)):
+            region = target[channel, geometry.pad_top:geometry.pad_top + geometry.height,
+                            geometry.pad_left:geometry.pad_left + geometry.width]
+            np.multiply(plane, _NORMALIZE, out=region)
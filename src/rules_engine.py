@@ -1,6 +1,6 @@
 import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple, TypedDict
 from dataclasses import dataclass
 
 # Constants for Operational Hours
@@ -39,15 +39,19 @@ class SafetyLogicEngine:
     berdasarkan aturan waktu (temporal) dan lokasi (spatial).
     """
 
-    def __init__(self, min_violation_duration: float = 3.0):
+    def __init__(self, min_violation_duration: float = 3.0,
+                 on_alert: Optional[Callable[[VerifiedAlert], Any]] = None):
         """
         Inisialisasi SafetyLogicEngine.
 
         Args:
             min_violation_duration (float): Durasi minimum (detik) pelanggaran 
                                             sebelum dianggap valid alert. Default 3.0s.
+            on_alert (Callable, optional): Dipanggil untuk setiap alert yang sudah
+                                           divalidasi (mis. ClipRecorder.on_alert).
         """
         self.min_violation_duration = min_violation_duration
+        self.on_alert = on_alert
         
         # Melacak waktu mulai pelanggaran: {person_id: start_timestamp}
         self.violation_trackers: Dict[str, float] = {}
@@ -64,7 +68,7 @@ class SafetyLogicEngine:
             'y_max': 400
         }
 
-    def _calculate_centroid(self, bbox: BoundingBox) -> tuple[int, int]:
+    def _calculate_centroid(self, bbox: BoundingBox) -> Tuple[int, int]:
         """Menghitung titik tengah dari bounding box."""
         center_x = int((bbox['x1'] + bbox['x2']) / 2)
         center_y = int((bbox['y1'] + bbox['y2']) / 2)
@@ -195,6 +199,8 @@ class SafetyLogicEngine:
                         bbox=bbox
                     )
                     verified_alerts.append(alert)
+                    if self.on_alert:
+                        self.on_alert(alert)
 
         # Cleanup tracker
         ids_to_remove = [pid for pid in self.violation_trackers if pid not in current_frame_ids]
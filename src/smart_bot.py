@@ -1,4 +1,7 @@
+import os
+import asyncio
 import logging
+import requests
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
 
@@ -11,6 +14,32 @@ logging.basicConfig(
 # --- KREDENSIAL ---
 TOKEN = "8302407915:AAG2JSTTiJdVnrKM8jElv-6ZTIawNMtJsgM"
 
+# --- LIVE STREAM API ---
+API_BASE_URL = os.getenv("SMARTAPD_API_URL", "http://localhost:8000")
+PLACEHOLDER_CCTV = "https://placehold.co/600x400/1e293b/ffffff?text=CCTV+FEED+LIVE"
+
+
+def fetch_live_snapshot():
+    """
+    Ambil frame terbaru dari stream hub API.
+
+    Returns:
+        Tuple (camera_id, jpeg bytes) atau (None, None) jika belum ada stream.
+    """
+    try:
+        streams = requests.get(f"{API_BASE_URL}/api/stream", timeout=3).json()
+        online = [s for s in streams if s.get("online")] or streams
+        if not online:
+            return None, None
+        camera_id = online[0]["camera_id"]
+        res = requests.get(f"{API_BASE_URL}/api/stream/{camera_id}/snapshot", timeout=3)
+        if res.status_code != 200:
+            return None, None
+        return camera_id, res.content
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logging.warning(f"Snapshot CCTV gagal: {e}")
+        return None, None
+
 # --- COMMAND HANDLERS ---
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -61,13 +90,21 @@ async def button_click(update: Update, context: ContextTypes.DEFAULT_TYPE):
     data = query.data
     
     if data == 'cek_cctv':
-        # Kirim gambar dummy CCTV
-        await context.bot.send_photo(
-            chat_id=update.effective_chat.id,
-            photo="https://placehold.co/600x400/1e293b/ffffff?text=CCTV+FEED+LIVE",
-            caption="📡 **CCTV Gudang A - Online**\nKoneksi stabil. Latency: 24ms.",
-            parse_mode='Markdown'
-        )
+        # Kirim frame terbaru dari live stream (placeholder jika belum ada kamera)
+        camera_id, snapshot = await asyncio.to_thread(fetch_live_snapshot)
+        if snapshot:
+            await context.bot.send_photo(
+                chat_id=update.effective_chat.id,
+                photo=snapshot,
+                caption=f"📡 CCTV {camera_id} - Live\nLive view: {API_BASE_URL}/api/stream/{camera_id}/mjpeg"
+            )
+        else:
+            await context.bot.send_photo(
+                chat_id=update.effective_chat.id,
+                photo=PLACEHOLDER_CCTV,
+                caption="📡 **CCTV Offline**\nBelum ada kamera yang mengirim live stream.",
+                parse_mode='Markdown'
+            )
         
     elif data == 'cek_status':
         await query.edit_message_text(
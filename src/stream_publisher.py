@@ -0,0 +1,189 @@
+"""
+Live Stream Publisher Module
+Encodes annotated frames once per camera and pushes them to the API stream hub
+"""
+
+import cv2
+import json
+import time
+import socket
+import select
+import struct
+import logging
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Must match api/streaming.py
+FRAME_HEADER = struct.Struct("!I")
+
+
+class StreamPublisher:
+    """
+    Background publisher for one camera's live view.
+
+    Only the newest frame is kept; frames are encoded only while the hub
+    reports at least one viewer, at the size/quality the hub asks for.
+    """
+
+    def __init__(self, camera_id: str, host: str = '127.0.0.1', port: int = 8765,
+                 fps: float = 15.0, quality: int = 80, max_width: int = 1280,
+                 reconnect_seconds: float = 3.0):
+        """
+        Initialize stream publisher
+
+        Args:
+            camera_id: Camera identifier shown to stream viewers
+            host: Stream hub ingest host
+            port: Stream hub ingest port
+            fps: Maximum frames per second sent to the hub
+            quality: Initial JPEG quality (the hub may adjust it)
+            max_width: Initial maximum frame width (the hub may adjust it)
+            reconnect_seconds: Delay between connection attempts
+        """
+        self.camera_id = camera_id
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.quality = quality
+        self.max_width = max_width
+        self.reconnect_seconds = reconnect_seconds
+
+        # Viewers present on the hub side; nothing is rendered or encoded otherwise
+        self.active = False
+
+        self._latest: Optional[np.ndarray] = None
+        self._next_publish = 0.0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._control_buffer = b''
+
+        # Statistics
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def start(self) -> 'StreamPublisher':
+        """Start the publisher thread"""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=f'stream-{self.camera_id}',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the publisher thread"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def publish(self, frame: Union[np.ndarray, Callable[[], np.ndarray]]):
+        """
+        Offer a frame to the live stream without blocking
+
+        Args:
+            frame: Frame (BGR format), or a callable returning it that is
+                   only evaluated when the frame is actually streamed
+        """
+        if not self.active:
+            return
+
+        now = time.monotonic()
+        if now < self._next_publish:
+            return
+        self._next_publish = now + 1.0 / self.fps
+
+        if callable(frame):
+            frame = frame()
+
+        with self._cond:
+            if self._latest is not None:
+                self.frames_dropped += 1
+            self._latest = frame
+            self._cond.notify()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get publisher statistics
+
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'active': self.active,
+            'frames_sent': self.frames_sent,
+            'frames_dropped': self.frames_dropped,
+            'quality': self.quality,
+            'max_width': self.max_width
+        }
+
+    def _run(self):
+        while self._running:
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.reconnect_seconds)
+            except OSError:
+                time.sleep(self.reconnect_seconds)
+                continue
+
+            logger.info(f"Stream publisher connected: {self.camera_id} -> {self.host}:{self.port}")
+            try:
+                sock.settimeout(None)
+                hello = json.dumps({'camera_id': self.camera_id}) + "\n"
+                sock.sendall(hello.encode('utf-8'))
+                self._serve(sock)
+            except OSError as e:
+                logger.warning(f"Stream connection lost ({self.camera_id}): {e}")
+            finally:
+                self.active = False
+                self._control_buffer = b''
+                sock.close()
+
+    def _serve(self, sock: socket.socket):
+        while self._running:
+            self._read_control(sock)
+
+            with self._cond:
+                if self._latest is None:
+                    self._cond.wait(timeout=0.5)
+                frame, self._latest = self._latest, None
+
+            if frame is None or not self.active:
+                continue
+
+            data = self._encode(frame)
+            if data is not None:
+                sock.sendall(FRAME_HEADER.pack(len(data)) + data)
+                self.frames_sent += 1
+
+    def _read_control(self, sock: socket.socket):
+        """Apply pending control messages from the hub"""
+        while select.select([sock], [], [], 0)[0]:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("stream hub closed the connection")
+            self._control_buffer += chunk
+
+        while b"\n" in self._control_buffer:
+            line, self._control_buffer = self._control_buffer.split(b"\n", 1)
+            try:
+                control = json.loads(line)
+            except ValueError:
+                continue
+            self.active = bool(control.get('active', self.active))
+            self.quality = int(control.get('quality', self.quality))
+            self.max_width = int(control.get('max_width', self.max_width))
+
+    def _encode(self, frame: np.ndarray) -> Optional[bytes]:
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            scale = self.max_width / w
+            frame = cv2.resize(frame, (self.max_width, int(h * scale)), interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return encoded.tobytes() if ok else None
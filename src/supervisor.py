@@ -0,0 +1,344 @@
+"""
+Process Supervisor Module
+Runs each camera pipeline in its own worker process pinned to CPU cores,
+and restarts workers that crash or stall with exponential backoff
+"""
+
+import os
+import time
+import logging
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Worker states
+STATE_STARTING = 'starting'
+STATE_RUNNING = 'running'
+STATE_BACKOFF = 'backoff'
+STATE_FINISHED = 'finished'
+STATE_STOPPED = 'stopped'
+
+
+def available_cores() -> List[int]:
+    """CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def assign_cores(workers: int, cores: Optional[Sequence[int]] = None) -> List[List[int]]:
+    """
+    Split CPU cores between workers
+
+    Each worker gets a contiguous share of the cores; with more workers
+    than cores, workers share cores round-robin.
+
+    Args:
+        workers: Number of worker processes
+        cores: Cores to distribute (default: all available)
+
+    Returns:
+        Core list per worker
+    """
+    cores = list(cores) if cores is not None else available_cores()
+    if workers <= 0 or not cores:
+        return [[] for _ in range(workers)]
+    if workers >= len(cores):
+        return [[cores[i % len(cores)]] for i in range(workers)]
+    share, extra = divmod(len(cores), workers)
+    assigned, start = [], 0
+    for index in range(workers):
+        size = share + (1 if index < extra else 0)
+        assigned.append(cores[start:start + size])
+        start += size
+    return assigned
+
+
+def pin_to_cores(cores: Sequence[int]) -> bool:
+    """Pin the current process to cores (Linux); returns whether it was applied"""
+    if not cores or not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        os.sched_setaffinity(0, set(cores))
+        return True
+    except OSError as e:
+        logger.warning(f"Could not pin process to cores {list(cores)}: {e}")
+        return False
+
+
+class Heartbeat:
+    """Liveness timestamp shared between a worker process and the supervisor"""
+
+    def __init__(self, ctx=None):
+        ctx = ctx or mp.get_context()
+        self._value = ctx.Value('d', 0.0, lock=False)
+
+    def beat(self):
+        """Signal progress (call once per processed frame)"""
+        self._value.value = time.time()
+
+    @property
+    def last(self) -> float:
+        """Time of the last beat (0 if the worker has not beaten yet)"""
+        return self._value.value
+
+    def reset(self):
+        self._value.value = 0.0
+
+
+def _worker_main(name: str, target: Callable[..., Any], args: tuple, kwargs: Dict[str, Any],
+                 cores: List[int], heartbeat: Heartbeat, stop_event):
+    """Entry point of a worker process"""
+    pin_to_cores(cores)
+    try:
+        result = target(*args, heartbeat=heartbeat, stop_event=stop_event, **kwargs)
+    except KeyboardInterrupt:
+        result = 0
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Worker {name} crashed: {e}", exc_info=True)
+        result = 1
+    raise SystemExit(result if isinstance(result, int) else 0)
+
+
+class WorkerSpec:
+    """What a supervised worker runs and how it is watched"""
+
+    def __init__(self, name: str, target: Callable[..., Any], args: tuple = (),
+                 kwargs: Optional[Dict[str, Any]] = None, stall_timeout: float = 30.0,
+                 startup_timeout: float = 120.0, restart_on_exit: bool = False):
+        """
+        Args:
+            name: Worker name (e.g. the camera id)
+            target: Module-level function called in the worker process as
+                target(*args, heartbeat=..., stop_event=..., **kwargs); its
+                int return value is the exit code
+            args: Positional arguments (must be picklable)
+            kwargs: Keyword arguments (must be picklable)
+            stall_timeout: Seconds without a heartbeat before the worker is restarted
+            startup_timeout: Allowance for the first heartbeat after start (model loading)
+            restart_on_exit: Also restart after a clean exit (code 0)
+        """
+        self.name = name
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.stall_timeout = stall_timeout
+        self.startup_timeout = startup_timeout
+        self.restart_on_exit = restart_on_exit
+
+
+class _Worker:
+    """Supervisor-side state of one worker"""
+
+    def __init__(self, spec: WorkerSpec, cores: List[int], heartbeat: Heartbeat, stop_event):
+        self.spec = spec
+        self.cores = cores
+        self.heartbeat = heartbeat
+        self.stop_event = stop_event
+        self.process: Optional[mp.process.BaseProcess] = None
+        self.state = STATE_STARTING
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.backoff = 0.0
+        self.restarts = 0
+        self.crashes = 0
+        self.stalls = 0
+        self.last_exit: Optional[int] = None
+        self.last_failure: Optional[str] = None
+
+
+class ProcessSupervisor:
+    """
+    Keeps a set of worker processes alive.
+
+    A worker that exits with an error, or stops sending heartbeats, is
+    terminated and restarted after an exponential backoff, which resets
+    once the worker has run stably. Workers are independent: a camera whose
+    stream keeps failing never affects the other cameras.
+    """
+
+    def __init__(self, auto_restart: bool = True, backoff_initial: float = 1.0,
+                 backoff_max: float = 60.0, stable_seconds: float = 60.0,
+                 check_interval: float = 1.0, pin_cores: bool = True,
+                 start_method: str = 'spawn'):
+        """
+        Initialize supervisor
+
+        Args:
+            auto_restart: Restart crashed or stalled workers
+            backoff_initial: Delay before the first restart
+            backoff_max: Longest delay between restarts
+            stable_seconds: Run time after which the backoff resets
+            check_interval: Seconds between health checks in run()
+            pin_cores: Pin each worker to its own share of CPU cores
+            start_method: multiprocessing start method ('spawn' starts
+                workers without the supervisor's threads and sockets)
+        """
+        self.auto_restart = auto_restart
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_seconds = stable_seconds
+        self.check_interval = check_interval
+        self.pin_cores = pin_cores
+        self.ctx = mp.get_context(start_method)
+        self.specs: List[WorkerSpec] = []
+        self.workers: Dict[str, _Worker] = {}
+        self._stopping = False
+
+    def add(self, spec: WorkerSpec):
+        """Register a worker (before start())"""
+        if any(existing.name == spec.name for existing in self.specs):
+            raise ValueError(f"Duplicate worker name: {spec.name}")
+        self.specs.append(spec)
+
+    def start(self):
+        """Start all registered workers, in the order they were added"""
+        cores = assign_cores(len(self.specs)) if self.pin_cores else [[] for _ in self.specs]
+        for spec, worker_cores in zip(self.specs, cores):
+            worker = _Worker(spec, worker_cores, Heartbeat(self.ctx), self.ctx.Event())
+            self.workers[spec.name] = worker
+            self._spawn(worker)
+
+    def run(self, stop_event=None, duration: Optional[float] = None):
+        """
+        Supervise until stop_event is set, duration has passed, Ctrl+C, or
+        no worker is left running or waiting for a restart
+
+        Args:
+            stop_event: Optional event ending supervision
+            duration: Optional maximum supervision time in seconds
+        """
+        if not self.workers:
+            self.start()
+        deadline = time.monotonic() + duration if duration is not None else None
+        try:
+            while not (stop_event is not None and stop_event.is_set()):
+                self.poll()
+                if all(w.state in (STATE_FINISHED, STATE_STOPPED) for w in self.workers.values()):
+                    logger.info("No workers left to supervise")
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                time.sleep(self.check_interval)
+        except KeyboardInterrupt:
+            logger.info("Supervisor interrupted by user")
+        finally:
+            self.stop()
+
+    def poll(self, now: Optional[float] = None):
+        """Check every worker once: restart crashed or stalled ones when due"""
+        now = time.time() if now is None else now
+        for worker in self.workers.values():
+            if worker.state in (STATE_FINISHED, STATE_STOPPED):
+                continue
+
+            if worker.state == STATE_BACKOFF:
+                if now >= worker.restart_at and not self._stopping:
+                    worker.restarts += 1
+                    logger.info(f"Restarting worker {worker.spec.name} (restart #{worker.restarts})")
+                    self._spawn(worker)
+                continue
+
+            process = worker.process
+            if process.is_alive():
+                if self._stalled(worker, now):
+                    worker.stalls += 1
+                    logger.warning(f"Worker {worker.spec.name} stalled "
+                                   f"(no heartbeat for {now - max(worker.heartbeat.last, worker.started_at):.0f}s), "
+                                   f"terminating")
+                    self._terminate(process)
+                    self._failed(worker, now, 'stalled')
+                elif worker.state == STATE_STARTING and worker.heartbeat.last > worker.started_at:
+                    worker.state = STATE_RUNNING
+                continue
+
+            worker.last_exit = process.exitcode
+            if process.exitcode == 0 and not worker.spec.restart_on_exit:
+                logger.info(f"Worker {worker.spec.name} finished")
+                worker.state = STATE_FINISHED
+            else:
+                worker.crashes += 1
+                logger.warning(f"Worker {worker.spec.name} exited with code {process.exitcode}")
+                self._failed(worker, now, f"exit code {process.exitcode}")
+
+    def stop(self, timeout: float = 10.0):
+        """Ask every worker to stop, then terminate the ones that do not"""
+        self._stopping = True
+        for worker in self.workers.values():
+            worker.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers.values():
+            process = worker.process
+            if process is not None and process.is_alive():
+                process.join(max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    self._terminate(process)
+            if worker.state != STATE_FINISHED:
+                worker.state = STATE_STOPPED
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """State, restarts and failures per worker"""
+        now = time.time()
+        workers = {}
+        for name, worker in self.workers.items():
+            alive = worker.process is not None and worker.process.is_alive()
+            workers[name] = {
+                'state': worker.state,
+                'pid': worker.process.pid if alive else None,
+                'cores': worker.cores,
+                'uptime': round(now - worker.started_at, 1) if alive else 0.0,
+                'last_heartbeat_age': round(now - worker.heartbeat.last, 1) if worker.heartbeat.last else None,
+                'restarts': worker.restarts,
+                'crashes': worker.crashes,
+                'stalls': worker.stalls,
+                'last_exit': worker.last_exit,
+                'last_failure': worker.last_failure,
+                'next_restart_in': (round(max(0.0, worker.restart_at - now), 1)
+                                    if worker.state == STATE_BACKOFF else None),
+            }
+        return {'workers': workers, 'auto_restart': self.auto_restart}
+
+    def _spawn(self, worker: _Worker):
+        spec = worker.spec
+        worker.heartbeat.reset()
+        worker.stop_event.clear()
+        worker.process = self.ctx.Process(
+            target=_worker_main,
+            name=f"worker-{spec.name}",
+            args=(spec.name, spec.target, spec.args, spec.kwargs, worker.cores,
+                  worker.heartbeat, worker.stop_event),
+            daemon=True,
+        )
+        worker.started_at = time.time()
+        worker.state = STATE_STARTING
+        worker.process.start()
+        logger.info(f"Worker {spec.name} started (pid {worker.process.pid}, cores {worker.cores or 'any'})")
+
+    def _stalled(self, worker: _Worker, now: float) -> bool:
+        last = worker.heartbeat.last
+        if last <= worker.started_at:
+            # No progress yet: allow for model loading and stream connection
+            return now - worker.started_at > worker.spec.startup_timeout
+        return now - last > worker.spec.stall_timeout
+
+    def _failed(self, worker: _Worker, now: float, reason: str):
+        worker.last_failure = reason
+        if not self.auto_restart or self._stopping:
+            worker.state = STATE_STOPPED
+            return
+        if now - worker.started_at >= self.stable_seconds:
+            worker.backoff = 0.0
+        worker.backoff = (min(worker.backoff * 2, self.backoff_max) if worker.backoff
+                          else self.backoff_initial)
+        worker.restart_at = now + worker.backoff
+        worker.state = STATE_BACKOFF
+        logger.info(f"Worker {worker.spec.name} restarts in {worker.backoff:.1f}s ({reason})")
+
+    @staticmethod
+    def _terminate(process, timeout: float = 5.0):
+        process.terminate()
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join(timeout)
@@ -0,0 +1,126 @@
+"""
+Violation Taxonomy Module
+Integer codes, display names and severity levels of the violation types
+stored in the violation_types dimension table. The single definition used
+by the detector and the API (api/taxonomy.py)
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+SEVERITY_LOW = 1
+SEVERITY_MEDIUM = 2
+SEVERITY_HIGH = 3
+
+SEVERITY_NAMES = {
+    SEVERITY_LOW: 'low',
+    SEVERITY_MEDIUM: 'medium',
+    SEVERITY_HIGH: 'high',
+}
+
+# (id, code, display name, severity) - ids are stored in violations.violation_type_id
+VIOLATION_TYPES: List[Tuple[int, str, str, int]] = [
+    (1, 'no_helmet', 'Tanpa Helm', SEVERITY_HIGH),
+    (2, 'no_vest', 'Tanpa Rompi', SEVERITY_MEDIUM),
+    (3, 'no_gloves', 'Tanpa Sarung Tangan', SEVERITY_LOW),
+    (4, 'no_boots', 'Tanpa Sepatu Safety', SEVERITY_LOW),
+    (5, 'no_goggles', 'Tanpa Kacamata', SEVERITY_MEDIUM),
+]
+
+VIOLATION_TYPE_IDS: Dict[str, int] = {code: type_id for type_id, code, _, _ in VIOLATION_TYPES}
+
+# Fallback for raw labels that are not a known code ('Tidak Pakai Helm'),
+# as the substring matching used before the table: first keyword found wins
+VIOLATION_KEYWORDS: List[Tuple[str, str]] = [
+    ('helm', 'no_helmet'),
+    ('vest', 'no_vest'),
+    ('rompi', 'no_vest'),
+    ('goggles', 'no_goggles'),
+    ('kacamata', 'no_goggles'),
+    ('glove', 'no_gloves'),
+    ('sarung', 'no_gloves'),
+    ('boot', 'no_boots'),
+    ('sepatu', 'no_boots'),
+]
+
+# SQL twin of normalize_code (format with value=<column>)
+NORMALIZE_SQL = "lower(replace(trim({value}), ' ', '_'))"
+
+
+def normalize_code(violation_type: str) -> str:
+    """
+    Normalize a violation type name to its code ('No Helmet' -> 'no_helmet')
+
+    Must stay in sync with NORMALIZE_SQL
+    """
+    return violation_type.strip(' ').replace(' ', '_').lower()
+
+
+def keyword_code(violation_type: str) -> Optional[str]:
+    """Built-in code whose keyword appears in a raw label, or None"""
+    lowered = violation_type.lower()
+    for keyword, code in VIOLATION_KEYWORDS:
+        if keyword in lowered:
+            return code
+    return None
+
+
+def resolve_code_sql(value: str) -> str:
+    """
+    SQL expression resolving a raw name to the code it is stored under
+
+    Same order as ViolationTaxonomy.lookup: a code already in
+    violation_types, else the built-in code of the first matching keyword,
+    else the normalized name (registered as a new type).
+
+    Args:
+        value: SQL operand holding the raw name (column or named parameter)
+    """
+    code = NORMALIZE_SQL.format(value=value)
+    keywords = " ".join(
+        f"WHEN instr(lower({value}), '{keyword}') > 0 THEN '{keyword_code}'"
+        for keyword, keyword_code in VIOLATION_KEYWORDS
+    )
+    return (f"CASE WHEN EXISTS (SELECT 1 FROM violation_types WHERE code = {code}) THEN {code} "
+            f"{keywords} ELSE {code} END")
+
+
+def create_violation_types(cursor):
+    """
+    Create the violation_types table and seed the built-in types
+
+    Args:
+        cursor: sqlite3 cursor
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS violation_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT UNIQUE NOT NULL,
+            display_name TEXT,
+            severity INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    cursor.executemany(
+        'INSERT OR IGNORE INTO violation_types (id, code, display_name, severity) VALUES (?, ?, ?, ?)',
+        VIOLATION_TYPES
+    )
+
+
+def violation_type_id(violation_type: Optional[str]) -> Optional[int]:
+    """
+    Get the integer code of a built-in violation type
+
+    Args:
+        violation_type: Violation type name or code
+
+    Returns:
+        Integer code, or None for types not in the built-in taxonomy
+        (labels are matched by code, then by keyword)
+    """
+    if not violation_type:
+        return None
+    type_id = VIOLATION_TYPE_IDS.get(violation_type)
+    if type_id is None:
+        type_id = VIOLATION_TYPE_IDS.get(normalize_code(violation_type))
+    if type_id is None:
+        type_id = VIOLATION_TYPE_IDS.get(keyword_code(violation_type))
+    return type_id
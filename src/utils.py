@@ -7,9 +7,11 @@ import cv2
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Union
 import logging
 
+from taxonomy import violation_type_id
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,27 +68,42 @@ def draw_bbox(image: np.ndarray, bbox: List[float], label: str,
     return image
 
 
-def get_violation_color(violation_type: str) -> Tuple[int, int, int]:
+# BGR colors by violation type code (see taxonomy.VIOLATION_TYPES)
+VIOLATION_COLORS = {
+    1: (0, 0, 255),        # no_helmet - Red
+    2: (0, 165, 255),      # no_vest - Orange
+    3: (0, 255, 255),      # no_gloves - Yellow
+}
+
+# BGR colors of the non-violation detection classes
+CLASS_COLORS = {
+    'helmet': (0, 255, 0),         # Green
+    'vest': (0, 255, 0),           # Green
+    'gloves': (0, 255, 0),         # Green
+    'person': (255, 0, 0),         # Blue
+}
+
+DEFAULT_COLOR = (128, 128, 128)    # Gray
+
+
+def get_violation_color(violation_type: Union[int, str]) -> Tuple[int, int, int]:
     """
     Get color for violation type
     
     Args:
-        violation_type: Type of violation
+        violation_type: Violation type code, or a detection class name
         
     Returns:
         BGR color tuple
     """
-    colors = {
-        'no_helmet': (0, 0, 255),      # Red
-        'no_vest': (0, 165, 255),      # Orange
-        'no_gloves': (0, 255, 255),    # Yellow
-        'helmet': (0, 255, 0),         # Green
-        'vest': (0, 255, 0),           # Green
-        'gloves': (0, 255, 0),         # Green
-        'person': (255, 0, 0),         # Blue
-    }
-    
-    return colors.get(violation_type, (128, 128, 128))  # Gray default
+    if isinstance(violation_type, int):
+        return VIOLATION_COLORS.get(violation_type, DEFAULT_COLOR)
+    
+    # Plain class names need no normalization
+    color = CLASS_COLORS.get(violation_type)
+    if color is not None:
+        return color
+    return VIOLATION_COLORS.get(violation_type_id(violation_type), DEFAULT_COLOR)
 
 
 def save_frame(frame: np.ndarray, output_dir: str = "logs/violations",
@@ -232,19 +249,23 @@ def format_timestamp(timestamp: datetime = None, format_str: str = "%Y-%m-%d %H:
 
 
 def create_info_overlay(frame: np.ndarray, info: Dict[str, Any],
-                       position: str = "top-left") -> np.ndarray:
+                       position: str = "top-left", inplace: bool = False) -> np.ndarray:
     """
     Create information overlay on frame
     
+    Only the overlay region is darkened, instead of blending a full-frame copy.
+    
     Args:
         frame: Input frame
         info: Dictionary with information to display
         position: Position of overlay (top-left, top-right, bottom-left, bottom-right)
+        inplace: Draw directly on the input frame instead of a copy
         
     Returns:
         Frame with overlay
     """
-    overlay = frame.copy()
+    if not inplace:
+        frame = frame.copy()
     h, w = frame.shape[:2]
     
     # Prepare text lines
@@ -276,18 +297,14 @@ def create_info_overlay(frame: np.ndarray, info: Dict[str, Any],
     else:  # bottom-right
         x, y = w - max_width - padding * 2, h - total_height - padding
     
-    # Draw semi-transparent background
-    cv2.rectangle(
-        overlay,
-        (x, y),
-        (x + max_width + padding * 2, y + total_height),
-        (0, 0, 0),
-        -1
-    )
-    
-    # Blend overlay with original frame
+    # Semi-transparent black background: darken the overlay region only
     alpha = 0.6
-    frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
+    x1, y1 = max(x, 0), max(y, 0)
+    x2 = min(x + max_width + padding * 2 + 1, w)
+    y2 = min(y + total_height + 1, h)
+    if x2 > x1 and y2 > y1:
+        roi = frame[y1:y2, x1:x2]
+        roi[:] = cv2.convertScaleAbs(roi, alpha=1 - alpha)
     
     # Draw text
     current_y = y + padding + 20
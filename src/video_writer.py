@@ -0,0 +1,207 @@
+"""
+Asynchronous Video Writer Module
+Encodes annotated frames on a background thread so recording never stalls detection
+"""
+
+import cv2
+import queue
+import threading
+import time
+import logging
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVideoWriter:
+    """
+    Video writer that runs the encoder in its own thread.
+
+    Frames are handed over through a bounded queue. When the encoder falls
+    behind, new frames are dropped (and counted) instead of blocking the
+    detection loop. Output can be split into time-based segments.
+    """
+
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 codec: str = 'mp4v', quality: Optional[int] = None,
+                 segment_seconds: float = 0, queue_size: int = 64,
+                 hw_acceleration: bool = True):
+        """
+        Initialize asynchronous video writer
+
+        Args:
+            output_path: Output file path (used as name template when segmenting)
+            fps: Frames per second of the output video
+            frame_size: Frame size as (width, height)
+            codec: FourCC codec code (e.g. 'mp4v', 'avc1', 'MJPG')
+            quality: Encoder quality 0-100, if supported by the backend
+            segment_seconds: Start a new file every N seconds (0 = single file)
+            queue_size: Maximum number of frames waiting to be encoded
+            hw_acceleration: Ask OpenCV for any available hardware encoder
+        """
+        self.output_path = Path(output_path)
+        self.fps = fps
+        self.frame_size = frame_size
+        self.codec = codec
+        self.quality = quality
+        self.segment_seconds = segment_seconds
+        self.hw_acceleration = hw_acceleration
+
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._segment_started: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.segments: List[str] = []
+
+    def start(self) -> 'AsyncVideoWriter':
+        """Start the encoder thread"""
+        if self._thread is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='video-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def write(self, frame: np.ndarray) -> bool:
+        """
+        Queue a frame for encoding without blocking
+
+        The frame must not be modified by the caller after it is queued.
+
+        Args:
+            frame: Frame to write (BGR format)
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def release(self, timeout: float = 10.0):
+        """
+        Flush queued frames and close the current file
+
+        Args:
+            timeout: Maximum seconds to wait for the encoder to finish
+        """
+        if self._thread is None:
+            return
+
+        # Sentinel must get through even when the queue is full (or the encoder died)
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+                self.frames_dropped += 1
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Video writer did not finish within {timeout}s")
+        self._thread = None
+
+        logger.info(f"Video writer closed: {self.frames_written} frames written, "
+                    f"{self.frames_dropped} dropped, {len(self.segments)} segment(s)")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get writer statistics
+
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'queued': self._queue.qsize(),
+            'segments': list(self.segments)
+        }
+
+    def _run(self):
+        """Encoder loop"""
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+
+                if self._segment_due():
+                    self._open_segment()
+
+                if self._writer is not None:
+                    self._writer.write(frame)
+                    self.frames_written += 1
+        except Exception as e:
+            logger.error(f"Video writer error: {e}", exc_info=True)
+        finally:
+            self._close_segment()
+
+    def _segment_due(self) -> bool:
+        if self._segment_started is None:
+            return True
+        if self.segment_seconds <= 0:
+            return False
+        return time.monotonic() - self._segment_started >= self.segment_seconds
+
+    def _segment_path(self) -> Path:
+        if self.segment_seconds <= 0:
+            return self.output_path
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.output_path.with_name(
+            f"{self.output_path.stem}_{timestamp}_{len(self.segments):04d}{self.output_path.suffix}"
+        )
+
+    def _writer_params(self) -> List[int]:
+        params = []
+        if self.hw_acceleration and hasattr(cv2, 'VIDEOWRITER_PROP_HW_ACCELERATION'):
+            params += [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if self.quality is not None and hasattr(cv2, 'VIDEOWRITER_PROP_QUALITY'):
+            params += [cv2.VIDEOWRITER_PROP_QUALITY, int(self.quality)]
+        return params
+
+    def _open_segment(self):
+        self._close_segment()
+
+        path = self._segment_path()
+        # Failed opens are retried at the next segment boundary, not every frame
+        self._segment_started = time.monotonic()
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+
+        params = self._writer_params()
+        writer = cv2.VideoWriter(str(path), cv2.CAP_ANY, fourcc, self.fps,
+                                 self.frame_size, params)
+        if params and not writer.isOpened():
+            # Backend rejected hardware/quality options, fall back to defaults
+            writer = cv2.VideoWriter(str(path), fourcc, self.fps, self.frame_size)
+
+        if not writer.isOpened():
+            logger.error(f"Failed to open video writer: {path}")
+            self._writer = None
+            return
+
+        self._writer = writer
+        self.segments.append(str(path))
+        logger.info(f"Recording to: {path}")
+
+    def _close_segment(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,56 @@
+"""
+Tests for the async database access layer used by the API
+"""
+
+import asyncio
+import time
+
+from api.db import AsyncDatabase
+
+
+def test_heavy_queries_do_not_starve_light_ones(tmp_path):
+    db = AsyncDatabase(str(tmp_path / "test.db"), readers=3, limits={"heavy": 1})
+
+    def heavy(conn):
+        time.sleep(0.2)
+        return "heavy"
+
+    def light(conn):
+        return conn.execute("SELECT 1").fetchone()[0]
+
+    async def scenario():
+        heavy_tasks = [asyncio.create_task(db.read(heavy, endpoint_class="heavy")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        assert await db.read(light) == 1
+        light_elapsed = time.monotonic() - started
+        assert await asyncio.gather(*heavy_tasks) == ["heavy"] * 4
+        return light_elapsed
+
+    try:
+        assert asyncio.run(scenario()) < 0.1
+    finally:
+        db.close()
+
+
+def test_writes_commit_and_roll_back(tmp_path):
+    db = AsyncDatabase(str(tmp_path / "test.db"),
+                       prepare=lambda conn: conn.execute("CREATE TABLE t (v INTEGER)"))
+
+    def insert(conn, value):
+        conn.execute("INSERT INTO t (v) VALUES (?)", (value,))
+        if value < 0:
+            raise ValueError("rejected")
+
+    async def scenario():
+        await db.write(insert, 1)
+        try:
+            await db.write(insert, -1)
+        except ValueError:
+            pass
+        return await db.read(lambda conn: [row[0] for row in conn.execute("SELECT v FROM t")])
+
+    try:
+        assert asyncio.run(scenario()) == [1]
+    finally:
+        db.close()
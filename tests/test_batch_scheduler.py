@@ -0,0 +1,100 @@
+"""
+Test EdfBatchScheduler - deadline-ordered batching, priority classes from risk scores, overload degradation
+"""
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from batch_scheduler import EdfBatchScheduler
+
+# riskScore per camera as in the API risk map
+RISK_SCORES = {'Camera_1': 88, 'Camera_3': 68, 'Camera_4': 52}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cameras_are_classified_by_risk_score():
+    scheduler = EdfBatchScheduler(risk_scores=RISK_SCORES)
+    assert scheduler.classify('Camera_1').name == 'high'
+    assert scheduler.classify('Camera_3').name == 'medium'
+    assert scheduler.classify('Camera_4').name == 'low'
+    assert scheduler.classify('Camera_9').name == 'medium'
+
+
+def test_batches_follow_earliest_deadline_and_wait_for_their_due_time():
+    clock = FakeClock()
+    scheduler = EdfBatchScheduler(max_batch=2, max_wait_ms=20, risk_scores=RISK_SCORES, clock=clock)
+    scheduler.submit('low', 'Camera_4', key='default')
+    clock.now += 0.001
+    scheduler.submit('other-model', 'Camera_1', key='helmet')
+    scheduler.submit('high', 'Camera_1', key='default')
+    scheduler.submit('medium', 'Camera_3', key='default')
+
+    # Four clients could still send: not due before max_wait of the oldest request
+    batch, wait = scheduler.next_batch(waiting=5)
+    assert batch is None and abs(wait - 0.019) < 1e-9
+    clock.now += wait
+    batch, _ = scheduler.next_batch(waiting=5)
+    # Earliest deadline first, only the same model key, at most max_batch
+    assert [p.item for p in batch] == ['other-model']
+    batch, _ = scheduler.next_batch(waiting=5)
+    assert [p.item for p in batch] == ['high', 'medium']
+    batch, _ = scheduler.next_batch(waiting=5)
+    assert [p.item for p in batch] == ['low']
+    assert scheduler.next_batch(waiting=5) == (None, None)
+
+    # Every client waiting: nothing else can join, run at once
+    scheduler.submit('a', 'Camera_3')
+    scheduler.submit('b', 'Camera_4')
+    batch, _ = scheduler.next_batch(waiting=2)
+    assert [p.item for p in batch] == ['a', 'b']
+
+
+def test_overload_degrades_low_priority_first_and_recovers_high_priority_first():
+    clock = FakeClock()
+    scheduler = EdfBatchScheduler(max_batch=8, max_wait_ms=5, risk_scores=RISK_SCORES,
+                                  recover_windows=2, clock=clock)
+
+    def window(wait, cost):
+        clock.now += 1.0 - wait - cost
+        for camera in RISK_SCORES:
+            scheduler.submit(camera, camera)
+        clock.now += wait
+        batch, _ = scheduler.next_batch(waiting=3)
+        started = clock.now
+        clock.now += cost
+        scheduler.complete(batch, started)
+
+    def levels():
+        return [scheduler.degradation(camera) for camera in ('Camera_1', 'Camera_3', 'Camera_4')]
+
+    # 350 ms latency misses the 150 ms target of the high class only
+    for _ in range(3):
+        window(0.3, 0.05)
+    assert levels() == [(1, 1.0), (1, 1.0), (4, 0.5)]
+    for _ in range(3):
+        window(0.3, 0.05)
+    assert levels() == [(1, 1.0), (4, 0.5), (4, 0.5)]
+    window(0.3, 0.05)
+    assert levels() == [(2, 1.0), (4, 0.5), (4, 0.5)]
+
+    stats = scheduler.get_statistics()['classes']
+    assert stats['high']['missed'] == 7 and stats['medium']['missed'] == 0
+    assert stats['high']['p50_ms'] == 350.0 and stats['low']['stride'] == 4
+
+    for _ in range(2):
+        window(0.0, 0.01)
+    assert levels() == [(1, 1.0), (4, 0.5), (4, 0.5)]
+    for _ in range(2):
+        window(0.0, 0.01)
+    assert levels() == [(1, 1.0), (2, 0.5), (4, 0.5)]
+    stats = scheduler.get_statistics()['classes']
+    assert stats['high']['requests'] == 11 and stats['high']['missed'] == 7
+    assert stats['medium']['scale'] == 0.5 and stats['medium']['stride'] == 2
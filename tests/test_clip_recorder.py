@@ -0,0 +1,92 @@
+"""
+Test ClipRecorder - bounded rolling buffer and pre/post-event clips
+"""
+
+import sys
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+sys.path.insert(0, 'src')
+
+from clip_recorder import ClipRecorder
+
+
+def _frame():
+    return (np.random.rand(120, 160, 3) * 255).astype(np.uint8)
+
+
+def test_buffer_is_bounded_by_window_and_memory(tmp_path):
+    recorder = ClipRecorder('cam1', pre_seconds=2, fps=10, max_buffer_mb=10,
+                            output_dir=str(tmp_path))
+    for i in range(100):
+        recorder.add_frame(_frame(), 1000 + i * 0.1)
+    assert recorder.get_statistics()['buffered_frames'] <= 21
+
+    small = ClipRecorder('cam2', pre_seconds=60, fps=10, max_buffer_mb=0.05,
+                         output_dir=str(tmp_path))
+    for i in range(100):
+        small.add_frame(_frame(), 1000 + i * 0.1)
+    assert small.get_statistics()['buffer_mb'] <= 0.05
+    recorder.close()
+    small.close()
+
+
+def test_trigger_writes_one_clip_per_cooldown(tmp_path):
+    recorder = ClipRecorder('cam1', pre_seconds=2, post_seconds=1, fps=10,
+                            cooldown_seconds=60, output_dir=str(tmp_path))
+    for i in range(50):
+        recorder.add_frame(_frame(), 1000 + i * 0.1)
+
+    path = recorder.trigger('no_helmet', 1005.0)
+    assert recorder.trigger('no_helmet', 1005.5) == path
+
+    for i in range(50, 70):
+        recorder.add_frame(_frame(), 1000 + i * 0.1)
+    recorder.close()
+
+    assert recorder.clips_written == 1
+    assert (tmp_path / path.split('/')[-1]).stat().st_size > 0
+
+
+def test_stream_url_camera_ids_give_safe_clip_names(tmp_path):
+    recorder = ClipRecorder('Camera_rtsp://user:pw@10.0.0.5:554/stream', pre_seconds=1,
+                            post_seconds=0.5, fps=10, output_dir=str(tmp_path))
+    for i in range(20):
+        recorder.add_frame(_frame(), 1000 + i * 0.1)
+    path = recorder.trigger('no_helmet', 1001.5)
+    recorder.close()
+
+    name = path.split('/')[-1]
+    assert name.startswith('Camera_rtsp___10.0.0.5_554_stream_no_helmet_')
+    assert 'user' not in name and 'pw' not in name
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+    assert (tmp_path / name).stat().st_size > 0
+
+
+def test_clips_waiting_to_be_written_count_against_the_memory_cap(tmp_path):
+    recorder = ClipRecorder('cam1', pre_seconds=2, post_seconds=0.2, fps=10, max_buffer_mb=0.5,
+                            cooldown_seconds=60, output_dir=str(tmp_path))
+    # Hold the writer, as a slow disk would
+    release = threading.Event()
+    write_clip = recorder._write_clip
+    recorder._write_clip = lambda clip, size: (release.wait(10), write_clip(clip, size))
+
+    cap = recorder.max_buffer_bytes
+    paths = []
+    for i in range(200):
+        timestamp = 1000 + i * 0.1
+        recorder.add_frame(_frame(), timestamp)
+        if i >= 20 and i % 3 == 0:
+            paths.append(recorder.trigger(f'alert_{i}', timestamp))
+        assert recorder._buffer_bytes + recorder._clip_bytes <= cap
+    assert recorder.clips_skipped > 0 and None in paths
+    assert recorder.get_statistics()['clip_mb'] <= 0.5
+
+    release.set()
+    recorder.close()
+    assert recorder._clip_bytes == 0
+    assert recorder.clips_written == len([p for p in paths if p])
@@ -0,0 +1,108 @@
+"""
+Tests for the SQL-side discipline leaderboard and its daily summaries
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+from api.discipline import ensure_worker_summary, query_leaderboard
+
+
+def _connect():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE detections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            worker_id TEXT,
+            violations INTEGER DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE violations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            worker_id TEXT,
+            violation_type TEXT
+        )
+        """
+    )
+    return conn
+
+
+def _seed(conn, today):
+    old = (datetime.now() - timedelta(days=40)).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO detections (timestamp, worker_id, violations) VALUES (?, ?, ?)",
+        [(today, "W1", 0)] * 10 + [(today, "W2", 1)] * 4 + [(old, "W1", 5)],
+    )
+    conn.executemany(
+        "INSERT INTO violations (timestamp, worker_id, violation_type) VALUES (?, ?, ?)",
+        [(today, "W1", "no_helmet")] * 2 + [(today, "W1", "no_vest")]
+        + [(today, "W2", t) for t in ("no_boots", "no_gloves", "no_gloves", "no_vest", "no_helmet")]
+        + [(today, None, "no_helmet"), (old, "W1", "no_mask")],
+    )
+
+
+def test_triggers_and_backfill_produce_the_same_leaderboard():
+    today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    live = _connect()
+    ensure_worker_summary(live)
+    _seed(live, today)
+
+    backfilled = _connect()
+    _seed(backfilled, today)
+    ensure_worker_summary(backfilled)
+    # Running setup again must not count the history twice
+    ensure_worker_summary(backfilled)
+
+    result = query_leaderboard(live, days=7)
+    assert result["leaderboard"] == query_leaderboard(backfilled, days=7)["leaderboard"]
+
+    w1, w2 = result["leaderboard"]
+    assert (w1["worker"], w1["detections"], w1["violations"]) == ("W1", 10, 3)
+    assert w1["complianceRate"] == 70.0
+    assert w1["topViolations"] == ["no_helmet", "no_vest"]
+
+    assert (w2["worker"], w2["detections"], w2["violations"]) == ("W2", 4, 9)
+    assert w2["complianceRate"] == 0.0
+    assert w2["topViolations"] == ["no_gloves", "no_boots", "no_helmet"]
+
+    # Workers without detections are left out, as before
+    assert result["summary"] == {"total_workers": 2, "average_compliance": 35.0}
+
+    longer = query_leaderboard(live, days=90)["leaderboard"]
+    assert longer[0]["detections"] == 11 and longer[0]["violations"] == 9
+
+
+def test_deleted_rows_leave_the_summaries():
+    today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    live = _connect()
+    ensure_worker_summary(live)
+    _seed(live, today)
+
+    # Retention cleanup (Database.cleanup_old_records) plus a single deleted row
+    cutoff = (datetime.now() - timedelta(days=30)).isoformat()
+    live.execute("DELETE FROM detections WHERE timestamp < ?", (cutoff,))
+    live.execute("DELETE FROM violations WHERE timestamp < ?", (cutoff,))
+    live.execute("DELETE FROM violations WHERE id = (SELECT MIN(id) FROM violations WHERE worker_id = 'W2')")
+
+    rebuilt = _connect()
+    for table in ("detections", "violations"):
+        rows = live.execute(f"SELECT * FROM {table}").fetchall()
+        marks = ", ".join("?" * len(rows[0]))
+        rebuilt.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+    ensure_worker_summary(rebuilt)
+
+    for table in ("worker_daily_stats", "worker_daily_violation_types"):
+        query = f"SELECT * FROM {table} ORDER BY 1, 2, 3"
+        assert live.execute(query).fetchall() == rebuilt.execute(query).fetchall()
+    assert query_leaderboard(live, days=90)["leaderboard"] == query_leaderboard(rebuilt, days=90)["leaderboard"]
+    no_mask = live.execute(
+        "SELECT COUNT(*) FROM worker_daily_violation_types WHERE violation_type = 'no_mask'"
+    ).fetchone()[0]
+    assert no_mask == 0
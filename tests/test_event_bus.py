@@ -0,0 +1,118 @@
+"""
+Test event bus - detector EventPublisher -> API EventBusServer -> WebSocket manager
+"""
+
+import asyncio
+import socket
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, 'src')
+
+import event_bus
+from event_bus import EVENT_CAMERA_STATUS, EVENT_DETECTION, EVENT_STATS, EVENT_VIOLATION, EventPublisher
+from api.events import EventBusServer
+
+
+class RecordingManager:
+    """Stands in for the WebSocket ConnectionManager"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def send_violation_alert(self, violation):
+        self.calls.append(("violation_alert", violation))
+
+    async def send_stats_update(self, stats):
+        self.calls.append(("stats_update", stats))
+
+    async def send_camera_status(self, camera_id, status):
+        self.calls.append(("camera_status", {"camera_id": camera_id, "status": status}))
+
+    async def broadcast(self, message, coalesce_key=None, topic=None):
+        self.calls.append((message["type"], message["data"]))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(condition, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.skipif(not event_bus.unix_sockets_supported(), reason="needs Unix sockets")
+def test_events_reach_websocket_manager_over_unix_socket(tmp_path):
+    path = str(tmp_path / "events.sock")
+
+    async def scenario():
+        manager = RecordingManager()
+        server = EventBusServer(manager)
+        seen = []
+        server.subscribe(lambda event_type, data: seen.append(event_type))
+        await server.start(path, "127.0.0.1", 0)
+        publisher = EventPublisher(socket_path=path, reconnect_seconds=0.1)
+        try:
+            publisher.publish(EVENT_VIOLATION, {"violation": "no_helmet", "camera_id": "Camera_1"})
+            publisher.publish(EVENT_STATS, {"camera_id": "Camera_1", "fps": 12.5})
+            publisher.publish(EVENT_CAMERA_STATUS, {"camera_id": "Camera_1", "status": "online"})
+            publisher.publish(EVENT_DETECTION, {"camera_id": "Camera_1", "total_persons": 2})
+            await wait_for(lambda: len(manager.calls) == 4)
+        finally:
+            publisher.close()
+            await server.stop()
+        return manager.calls, seen, publisher
+
+    calls, seen, publisher = asyncio.run(scenario())
+    assert [kind for kind, _ in calls] == ["violation_alert", "stats_update", "camera_status", "detection"]
+    assert calls[0][1]["violation"] == "no_helmet"
+    assert calls[2][1] == {"camera_id": "Camera_1", "status": "online"}
+    assert seen == ["violation", "stats", "camera_status", "detection"]
+    assert publisher.events_sent == 4 and publisher.events_dropped == 0
+
+
+def test_events_are_dropped_while_api_is_down_and_flow_after_reconnect(tmp_path, monkeypatch):
+    # No Unix sockets: the publisher falls back to TCP even with a socket path configured
+    monkeypatch.setattr(event_bus, "unix_sockets_supported", lambda: False)
+    port = free_port()
+
+    async def scenario():
+        manager = RecordingManager()
+        server = EventBusServer(manager)
+        publisher = EventPublisher(socket_path=str(tmp_path / "events.sock"), port=port,
+                                   reconnect_seconds=0.1)
+        assert publisher.socket_path is None
+        try:
+            # API down: publishing does not block, stale events are not replayed later
+            for index in range(3):
+                publisher.publish(EVENT_STATS, {"camera_id": "Camera_1", "n": index})
+            await wait_for(lambda: publisher.events_dropped == 3)
+
+            await server.start(None, "127.0.0.1", port)
+            # Keep publishing until the sender has reconnected
+            index = 3
+            while not manager.calls:
+                publisher.publish(EVENT_STATS, {"camera_id": "Camera_1", "n": index})
+                index += 1
+                await asyncio.sleep(0.05)
+            publisher.publish(EVENT_STATS, {"camera_id": "Camera_1", "n": "last"})
+            await wait_for(lambda: manager.calls[-1][1]["n"] == "last")
+        finally:
+            publisher.close()
+            await server.stop()
+        return manager.calls, publisher
+
+    calls, publisher = asyncio.run(scenario())
+    received = [data["n"] for _, data in calls]
+    assert not {0, 1, 2} & set(received)
+    assert received[-1] == "last"
+    assert publisher.events_sent == len(received)
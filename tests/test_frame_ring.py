@@ -0,0 +1,122 @@
+"""
+Test FrameRing - zero-copy shared-memory frame transport and slot ownership
+"""
+
+import multiprocessing as mp
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, 'src')
+
+from frame_ring import FrameRing, SLOT_FREE, SLOT_READING, grab_frames
+
+
+def produce(ring, count):
+    """Producer process: writes frames filled with their index straight into slots"""
+    ring.recover(producer=True)
+    sent = 0
+    while sent < count:
+        slot = ring.acquire()
+        if slot is None:
+            continue
+        ring.buffer(slot, (72, 128, 3))[:] = sent % 256
+        ring.publish(slot)
+        sent += 1
+    ring.close_producer()
+
+
+def test_frames_cross_processes_in_order_without_copies():
+    ctx = mp.get_context('spawn')
+    ring = FrameRing(slots=3, slot_bytes=72 * 128 * 3, ctx=ctx)
+    producer = ctx.Process(target=produce, args=(ring, 50))
+    producer.start()
+    try:
+        received = []
+        while True:
+            frame = ring.get(timeout=10)
+            if frame is None:
+                break
+            with frame:
+                assert frame.array.shape == (72, 128, 3)
+                # A view of the shared slot, not a copy
+                assert not frame.array.flags.owndata
+                assert np.shares_memory(frame.array, ring._view(frame.slot, (72, 128, 3)))
+                assert (frame.array == frame.seq - 1).all()
+                received.append(frame.seq)
+        assert ring.closed
+        assert received == list(range(1, 51))
+    finally:
+        producer.join(10)
+        ring.close()
+    assert producer.exitcode == 0
+
+
+def test_full_ring_drops_new_frames_and_latest_skips_stale_ones():
+    ring = FrameRing(slots=2, slot_bytes=16)
+    try:
+        frame = np.arange(16, dtype=np.uint8).reshape(4, 4)
+        assert ring.put(frame) == 1
+        assert ring.put(frame + 1) == 2
+        # Both slots belong to the consumer now
+        assert ring.put(frame + 2) is None
+        assert ring.get_statistics()['dropped'] == 1
+
+        latest = ring.get(timeout=1, latest=True)
+        assert latest.seq == 2 and (latest.array == frame + 1).all()
+        assert ring.get_statistics()['skipped'] == 1
+        assert ring.put(frame + 3) == 3
+        latest.release()
+        assert ring.get(timeout=0.01).seq == 3
+        with pytest.raises(ValueError):
+            ring.put(np.zeros((5, 5), dtype=np.uint8))
+    finally:
+        ring.close()
+
+
+def test_recover_reclaims_slots_of_a_crashed_consumer():
+    ring = FrameRing(slots=2, slot_bytes=4)
+    try:
+        ring.put(np.ones((2, 2), dtype=np.uint8))
+        ring.put(np.ones((2, 2), dtype=np.uint8))
+        held = ring.get(timeout=1)
+        assert ring._header[held.slot, 0] == SLOT_READING
+
+        # A restarted consumer reclaims every slot; the stale message is ignored
+        ring.recover(producer=False)
+        assert (ring._header[:, 0] == SLOT_FREE).all()
+        assert ring.get(timeout=0.01) is None
+        assert ring.put(np.full((2, 2), 7, dtype=np.uint8)) == 3
+        assert (ring.get(timeout=1).array == 7).all()
+    finally:
+        ring.close()
+
+
+def test_grab_frames_decodes_into_slots():
+    ring = FrameRing(slots=4, slot_bytes=6 * 8 * 3)
+    reads = {'count': 0, 'into_slot': 0}
+
+    def read(buffer):
+        reads['count'] += 1
+        if reads['count'] > 3:
+            return False, None
+        if buffer is None:
+            return True, np.full((6, 8, 3), reads['count'], dtype=np.uint8)
+        reads['into_slot'] += 1
+        buffer[:] = reads['count']
+        return True, buffer
+
+    try:
+        assert grab_frames(read, ring) is False
+        # Only the first frame (unknown shape) was copied
+        assert reads['into_slot'] == 2
+        values = []
+        for _ in range(3):
+            with ring.get(timeout=1) as frame:
+                values.append(int(frame.array[0, 0, 0]))
+        assert values == [1, 2, 3]
+        assert ring.get_statistics()['free'] == 4
+    finally:
+        ring.close()
@@ -0,0 +1,214 @@
+"""
+Test InferenceServer - shared model process, dynamic batching across detector clients
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, 'src')
+
+from batch_scheduler import EdfBatchScheduler
+from inference_server import InferenceClient, InferenceServer, parse_result
+
+
+class RecordingBackend:
+    """Stands in for a YOLO model: one 'person' box per frame, labelled with the frame value"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def __call__(self, frames, confidence, iou):
+        self.batch_sizes.append(len(frames))
+        time.sleep(self.delay)
+        return [[{
+            'id': 0, 'class': 'person', 'confidence': float(frame[0, 0, 0]) / 100,
+            'bbox': [0.0, 0.0, float(frame.shape[1]), float(frame.shape[0])], 'class_id': 0
+        }] for frame in frames]
+
+
+def failing_backend(frames, confidence, iou):
+    raise RuntimeError("CUDA out of memory")
+
+
+def test_concurrent_clients_are_batched_and_get_their_own_results(tmp_path):
+    backend = RecordingBackend(delay=0.005)
+    server = InferenceServer({'default': backend}, socket_path=str(tmp_path / "infer.sock"),
+                             max_batch=4, max_wait_ms=200).start()
+    errors = []
+
+    def camera(index):
+        client = InferenceClient(socket_path=str(tmp_path / "infer.sock"), connect_timeout=5)
+        try:
+            for step in range(10):
+                value = index * 10 + step
+                frame = np.full((48 + index, 64, 3), value, dtype=np.uint8)
+                detections = client.detect(frame, 0.5, 0.45)
+                assert detections[0]['confidence'] == pytest.approx(value / 100)
+                assert detections[0]['bbox'] == [0.0, 0.0, 64.0, 48.0 + index]
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+        finally:
+            client.close()
+
+    try:
+        threads = [threading.Thread(target=camera, args=(i,)) for i in range(4)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(20)
+        elapsed = time.monotonic() - started
+    finally:
+        server.stop()
+
+    assert not errors
+    stats = server.get_statistics()
+    assert stats['requests'] == 40 and stats['errors'] == 0
+    assert max(backend.batch_sizes) == 4
+    assert stats['avg_batch_size'] > 2
+    # Batches go out once every client is waiting, not after max_wait_ms
+    assert elapsed < 40 * 0.2 / 4
+
+
+def test_lone_request_waits_at_most_max_wait(tmp_path):
+    backend = RecordingBackend()
+    server = InferenceServer({'default': backend}, socket_path=str(tmp_path / "infer.sock"),
+                             max_batch=8, max_wait_ms=50).start()
+    idle = InferenceClient(socket_path=str(tmp_path / "infer.sock"), connect_timeout=5)
+    busy = InferenceClient(socket_path=str(tmp_path / "infer.sock"), connect_timeout=5)
+    try:
+        idle.connect()
+        busy.detect(np.zeros((8, 8, 3), dtype=np.uint8))
+        started = time.monotonic()
+        busy.detect(np.zeros((8, 8, 3), dtype=np.uint8))
+        elapsed = time.monotonic() - started
+    finally:
+        idle.close()
+        busy.close()
+        server.stop()
+    assert 0.04 <= elapsed < 1.0
+    assert backend.batch_sizes == [1, 1]
+
+
+def test_failures_are_reported_and_crashed_client_buffers_freed():
+    server = InferenceServer({'default': RecordingBackend(), 'broken': failing_backend},
+                             port=0, max_wait_ms=1).start()
+    client = InferenceClient(port=server.port, connect_timeout=5)
+    try:
+        frame = np.ones((4, 4, 3), dtype=np.uint8)
+        broken = InferenceClient(port=server.port, model='broken')
+        with pytest.raises(RuntimeError, match="out of memory"):
+            broken.detect(frame)
+        broken.close()
+        client.model = 'missing'
+        with pytest.raises(RuntimeError, match="missing"):
+            client.detect(frame)
+        client.model = 'default'
+        assert client.detect(frame)[0]['class'] == 'person'
+
+        # Client process dies without close(): the server frees its buffer
+        name = client._shm.name
+        client._disconnect()
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                shared_memory.SharedMemory(name=name).close()
+            except FileNotFoundError:
+                break
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        # ...and a reconnecting client gets a fresh one
+        assert client.detect(frame)[0]['class'] == 'person'
+        assert client._shm.name != name
+    finally:
+        client.close()
+        server.stop()
+    assert server.get_statistics()['errors'] == 2
+
+
+def test_parse_result_matches_detector_format():
+    class Tensor:
+        def __init__(self, values):
+            self.values = np.asarray(values)
+
+        def cpu(self):
+            return self
+
+        def numpy(self):
+            return self.values
+
+    class Boxes:
+        xyxy = Tensor([[10, 20, 110, 220]])
+        conf = Tensor([0.87])
+        cls = Tensor([2.0])
+
+        def __len__(self):
+            return 1
+
+    class Result:
+        boxes = Boxes()
+        names = {2: 'helmet'}
+
+    assert parse_result(Result()) == [{
+        'id': 0, 'class': 'helmet', 'confidence': pytest.approx(0.87),
+        'bbox': [10, 20, 110, 220], 'class_id': 2
+    }]
+
+
+def test_degraded_camera_sends_fewer_and_smaller_frames(tmp_path):
+    backend = RecordingBackend()
+    scheduler = EdfBatchScheduler(max_wait_ms=1, risk_scores={'Gudang': 52})
+    # As after sustained overload
+    scheduler._levels['low'] = 2
+    server = InferenceServer({'default': backend}, socket_path=str(tmp_path / "infer.sock"),
+                             scheduler=scheduler).start()
+    client = InferenceClient(socket_path=str(tmp_path / "infer.sock"), connect_timeout=5,
+                             camera_id='Gudang')
+    try:
+        frame = np.full((100, 200, 3), 50, dtype=np.uint8)
+        first = client.detect(frame)
+        assert first[0]['bbox'] == [0.0, 0.0, 200.0, 100.0]
+        assert (client.stride, client.scale) == (2, 0.5)
+        # Half resolution on the server, boxes mapped back; every second frame skipped
+        client.detect(frame)
+        second = client.detect(frame)
+        assert client.frames_skipped == 1
+        assert second[0]['bbox'] == [0.0, 0.0, 200.0, 100.0]
+    finally:
+        client.close()
+        server.stop()
+    assert backend.batch_sizes == [1, 1]
+    stats = server.get_statistics()['scheduler']['classes']['low']
+    assert stats['cameras'] == 1 and stats['requests'] == 2
+
+
+def test_malformed_requests_get_an_error_reply_and_keep_the_connection():
+    server = InferenceServer({'default': RecordingBackend()}, port=0, max_wait_ms=1).start()
+    sock = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+    replies = sock.makefile('rb')
+    client = InferenceClient(port=server.port, connect_timeout=5)
+    try:
+        for message in (b'{"id": 1, "conf": 0.5, "iou": 0.45}', b'{"conf": 0.5}',
+                        b'{"id": 3, "conf": 0.5, "iou": 0.45, "shape": 7}', b'[1, 2]', b'not json'):
+            sock.sendall(message + b"\n")
+            reply = json.loads(replies.readline())
+            assert "Malformed request" in reply['error']
+        assert reply['id'] is None
+        # Other clients are unaffected
+        assert client.detect(np.ones((4, 4, 3), dtype=np.uint8))[0]['class'] == 'person'
+    finally:
+        replies.close()
+        sock.close()
+        client.close()
+        server.stop()
+    assert server.get_statistics()['errors'] == 5
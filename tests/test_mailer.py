@@ -0,0 +1,181 @@
+"""
+Tests for pooled SMTP report delivery, against a local SMTP stand-in
+"""
+
+import email
+import socketserver
+import threading
+from email import policy
+
+from api.mailer import Mailer
+
+
+class LocalSmtpServer(socketserver.ThreadingTCPServer):
+    """
+    Minimal SMTP server on 127.0.0.1 recording connections and messages.
+
+    replies maps a recipient to the RCPT replies it gets on successive
+    attempts (e.g. ["451 busy"] fails once, then accepts); drop_after closes
+    the connection with a 421 after that many messages on it; auth_reply
+    advertises AUTH and answers every login attempt with it.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, replies=None, drop_after=None, auth_reply=None):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.replies = {address: list(codes) for address, codes in (replies or {}).items()}
+        self.drop_after = drop_after
+        self.auth_reply = auth_reply
+        self.connections = 0
+        self.messages = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def send(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.send("220 localhost SMTP stand-in")
+        sender, recipients, delivered = None, [], 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in {"EHLO", "HELO"}:
+                if server.auth_reply:
+                    self.send("250-localhost")
+                    self.send("250 AUTH PLAIN LOGIN")
+                else:
+                    self.send("250 localhost")
+            elif verb == "AUTH":
+                self.send(server.auth_reply)
+            elif verb == "MAIL":
+                if server.drop_after and delivered >= server.drop_after:
+                    self.send("421 Too many messages, closing connection")
+                    return
+                sender, recipients = command.split(":", 1)[1].strip("<> "), []
+                self.send("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                with server.lock:
+                    queued = server.replies.get(address)
+                    reply = queued.pop(0) if queued else "250 OK"
+                if reply.startswith("250"):
+                    recipients.append(address)
+                self.send(reply)
+            elif verb == "DATA":
+                self.send("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in {b".\r\n", b""}:
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                with server.lock:
+                    server.messages.append((sender, recipients, b"".join(lines)))
+                delivered += 1
+                self.send("250 Queued")
+            elif verb == "RSET":
+                recipients = []
+                self.send("250 OK")
+            elif verb == "NOOP":
+                self.send("250 OK")
+            elif verb == "QUIT":
+                self.send("221 Bye")
+                return
+            else:
+                self.send("502 Command not implemented")
+
+
+def _mailer(server, **kwargs):
+    return Mailer("127.0.0.1", server.port, sender="reports@smartapd.id", starttls=False,
+                  retry_delay=0.0, timeout=5, **kwargs)
+
+
+def test_forty_recipients_share_one_connection(tmp_path):
+    pdf = tmp_path / "weekly_report.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n" + bytes(range(256)) * 64)
+    server = LocalSmtpServer()
+    mailer = _mailer(server)
+    recipients = [f"supervisor{i}@smartapd.id" for i in range(40)] + ["Supervisor0@smartapd.id"]
+    try:
+        delivery = mailer.submit(recipients, "SmartAPD Weekly Safety Report", "<h1>Laporan</h1>", str(pdf))
+        assert delivery.done.wait(10)
+    finally:
+        mailer.shutdown()
+        server.stop()
+
+    assert delivery.status == "sent" and len(delivery.sent) == 40
+    assert server.connections == 1 and delivery.connections == 1
+    assert len(server.messages) == 40
+
+    for sender, rcpts, raw in server.messages:
+        message = email.message_from_bytes(raw, policy=policy.default)
+        assert sender == "reports@smartapd.id"
+        # Individual copies: recipients do not see each other
+        assert message["To"] == rcpts[0]
+        attachment = next(message.iter_attachments())
+        assert attachment.get_filename() == "weekly_report.pdf"
+        assert attachment.get_content() == pdf.read_bytes()
+        assert "<h1>Laporan</h1>" in message.get_body(("html",)).get_content()
+    assert len({email.message_from_bytes(raw)["Message-ID"] for _, _, raw in server.messages}) == 40
+
+
+def test_batches_retry_transient_failures_and_reconnect():
+    server = LocalSmtpServer(
+        replies={
+            "busy@smartapd.id": ["451 Try again later"],
+            "gone@smartapd.id": ["550 No such user"],
+        },
+        drop_after=4,
+    )
+    mailer = _mailer(server, batch_size=10, max_retries=2)
+    recipients = [f"user{i}@smartapd.id" for i in range(12)] + ["busy@smartapd.id", "gone@smartapd.id", "bad"]
+    try:
+        delivery = mailer.submit(recipients, "Laporan", "<p>isi</p>")
+        assert delivery.done.wait(10)
+    finally:
+        mailer.shutdown()
+        server.stop()
+
+    assert delivery.status == "partial"
+    assert sorted(delivery.sent) == sorted([f"user{i}@smartapd.id" for i in range(12)] + ["busy@smartapd.id"])
+    assert delivery.failed["gone@smartapd.id"].startswith("550")
+    assert delivery.failed["bad"] == "Alamat email tidak valid"
+    # busy once, plus the recipient in flight at each of the 2 closed connections
+    assert delivery.retries == 3
+    assert sorted(rcpts[0] for _, rcpts, _ in server.messages) == sorted(delivery.sent)
+    # Batches of 10 and 4 valid recipients; the server closes after every 4th message
+    assert server.connections == delivery.connections == mailer.get_statistics()["connections"] == 3 + 1
+
+
+def test_rejected_login_fails_the_batch_without_reconnecting():
+    server = LocalSmtpServer(auth_reply="535 Authentication failed")
+    mailer = _mailer(server, max_retries=3)
+    mailer.username, mailer.password = "user", "wrong"
+    try:
+        delivery = mailer.submit([f"user{i}@smartapd.id" for i in range(5)], "Laporan", "<p>isi</p>")
+        assert delivery.done.wait(10)
+    finally:
+        mailer.shutdown()
+        server.stop()
+
+    assert delivery.status == "failed" and len(delivery.failed) == 5
+    assert server.connections == 1 and not server.messages
@@ -0,0 +1,37 @@
+"""
+Tests for keyset pagination of violation history
+"""
+
+import sys
+
+import pytest
+
+sys.path.insert(0, 'src')
+
+from database import Database
+from api.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = encode_cursor("2024-01-02 03:04:05", 42)
+    assert decode_cursor(cursor) == ("2024-01-02 03:04:05", 42)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_iter_violations_pages_through_equal_timestamps(tmp_path):
+    db = Database(str(tmp_path / "detections.db"))
+    try:
+        # Inserted within the same second: pages must break ties on id
+        for i in range(25):
+            db.log_violation("Camera_0", "no_helmet", i, 0.9, [0, 0, 1, 1])
+
+        batches = list(db.iter_violations(batch_size=10, columns=["person_id"]))
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+
+        ids = [row["id"] for batch in batches for row in batch]
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 25
+        assert set(batches[0][0]) == {"person_id", "timestamp", "id"}
+    finally:
+        db.close()
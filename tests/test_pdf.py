@@ -0,0 +1,117 @@
+"""
+Tests for the native PDF report renderer
+"""
+
+import re
+import sys
+import zlib
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, 'src')
+
+from database import Database
+from api.pdf import ReportSection, render_report_pdf, text_width, wrap_text
+from api.reports import ReportGenerator
+
+
+def _objects(pdf: bytes):
+    """Object number -> byte offset, parsed from the file itself"""
+    return {int(m.group(1)): m.start() for m in re.finditer(rb"(?m)^(\d+) 0 obj\n", pdf)}
+
+
+def _site_data(index, cameras=60):
+    return {
+        'total_detections': 1000 + index,
+        'total_violations': 120,
+        'compliance_rate': 88.5,
+        'compliant_workers': 885,
+        'top_violations': [
+            {'type': "Tanpa Helm", 'count': 80, 'percentage': 66.7, 'severity': "high"},
+            {'type': "Tanpa Rompi (area)", 'count': 40, 'percentage': 33.3, 'severity': "medium"},
+        ],
+        'daily': [{'date': f"2024-06-{day:02d}", 'violations': day % 7} for day in range(1, 31)],
+        'cameras': [{'camera': f"Kamera {c}", 'violations': cameras - c} for c in range(cameras)],
+        'recommendations': ["Tingkatkan pengawasan di area Gudang 1 (12 pelanggaran)"],
+        'trend_summary': "Tingkat kepatuhan meningkat 2.0% dibanding bulan lalu.",
+    }
+
+
+def test_multi_site_pdf_is_well_formed_and_reuses_charts(tmp_path):
+    path = str(tmp_path / "report.pdf")
+    sections = [ReportSection(f"Lokasi {i}", "01 Jun - 30 Jun 2024", _site_data(i)) for i in range(3)]
+    stats = render_report_pdf(path, "Laporan Keselamatan Bulanan", sections, "01 Jun - 30 Jun 2024")
+    pdf = open(path, "rb").read()
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    # Cross-reference table points at every object
+    startxref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert pdf[startxref:].startswith(b"xref\n")
+    offsets = _objects(pdf)
+    xref = pdf[startxref:].split(b"\n")
+    count = int(xref[1].split()[1])
+    assert count == len(offsets) + 1
+    for obj_id in range(1, count):
+        assert int(xref[2 + obj_id][:10]) == offsets[obj_id]
+
+    assert stats['pages'] == pdf.count(b"/Type /Page ") == len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+    assert f"/Count {stats['pages']}".encode() in pdf
+    # Cover + (3 sites x 2+ pages: the 60-camera tables span pages)
+    assert stats['pages'] >= 7
+    # Comparison chart drawn once, placed on the cover and in every section
+    assert stats['charts_rendered'] == 1 + 3 * 2
+    assert stats['charts_placed'] == stats['charts_rendered'] + 3
+    assert pdf.count(b"/Subtype /Form") == stats['charts_rendered']
+
+    content = b"".join(
+        zlib.decompress(m.group(1))
+        for m in re.finditer(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    )
+    assert b"(Lokasi 2)" in content and b"(Tanpa Rompi \\(area\\))" in content
+    # Table header repeated on the continuation page
+    assert content.count(b"(Kamera / Area)") > 3
+
+
+def test_failed_render_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(b"previous report")
+    broken = _site_data(0)
+    del broken['total_violations']
+
+    with pytest.raises(KeyError):
+        render_report_pdf(str(path), "Laporan", [ReportSection("Lokasi", "Juni", broken)] * 2)
+
+    assert path.read_bytes() == b"previous report"
+    assert [p.name for p in tmp_path.iterdir()] == ["report.pdf"]
+
+
+def test_text_metrics_and_wrapping():
+    assert text_width("iiii", 10) < text_width("MMMM", 10)
+    assert text_width("Helm", 10, bold=True) > text_width("Helm", 10)
+    lines = wrap_text("Pasang signage peringatan APD di pintu masuk area kerja", 9, 100)
+    assert len(lines) > 1 and all(text_width(line, 9) <= 100 for line in lines)
+
+
+def test_generator_saves_report_as_pdf(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = Database("detections.db")
+    db.conn.execute(
+        "INSERT INTO detections (timestamp, camera_source, total_persons, compliant_persons, violations) "
+        "VALUES ('2024-06-15 08:00:00', 'Gudang ✓', 10, 8, 2)"
+    )
+    db.conn.execute(
+        "INSERT INTO violations (timestamp, camera_source, violation_type, violation_type_id) "
+        "VALUES ('2024-06-15 09:00:00', 'Gudang ✓', 'no_helmet', 1)"
+    )
+    db.conn.commit()
+    db.close()
+
+    generator = ReportGenerator(db_path="detections.db")
+    report = generator.build_report("weekly", end_date=date(2024, 6, 16))
+    assert report['data']['cameras'] == [{'camera': "Gudang ✓", 'violations': 1}]
+    assert len(report['data']['daily']) == 7
+    path = generator.save_pdf(report, "weekly_report")
+    assert path == "logs/reports/weekly_report.pdf"
+    pdf = open(path, "rb").read()
+    assert pdf.startswith(b"%PDF-") and b"/Count 1" in pdf
@@ -0,0 +1,99 @@
+"""
+Test LetterboxPreprocessor - letterbox geometry, reusable input buffers, box un-mapping
+"""
+
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+sys.path.insert(0, 'src')
+
+from preprocess import LetterboxPreprocessor, letterbox_geometry
+
+
+def reference_letterbox(frame, size=640, stride=32, rect=True):
+    """Allocating letterbox as ultralytics does it for numpy input"""
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    pad_w, pad_h = size - new_width, size - new_height
+    if rect:
+        pad_w, pad_h = pad_w % stride, pad_h % stride
+    if (width, height) != (new_width, new_height):
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h / 2 - 0.1)), int(round(pad_h / 2 + 0.1))
+    left, right = int(round(pad_w / 2 - 0.1)), int(round(pad_w / 2 + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT,
+                               value=(114, 114, 114))
+    return frame[..., ::-1].transpose(2, 0, 1).astype(np.float32) / 255
+
+
+def random_frame(height, width, seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_geometry_is_stride_aligned():
+    geometry = letterbox_geometry(720, 1280)
+    assert geometry.scale == 0.5
+    assert (geometry.width, geometry.height) == (640, 360)
+    assert (geometry.input_width, geometry.input_height) == (640, 384)
+    assert (geometry.pad_left, geometry.pad_top) == (0, 12)
+
+    square = letterbox_geometry(720, 1280, rect=False)
+    assert (square.input_width, square.input_height, square.pad_top) == (640, 640, 140)
+
+
+def test_prepared_input_matches_ultralytics_letterbox():
+    preprocessor = LetterboxPreprocessor()
+    hd, vga = random_frame(720, 1280), random_frame(480, 640, seed=1)
+
+    inputs, _ = preprocessor.prepare([hd])
+    assert inputs.shape == (1, 3, 384, 640) and inputs.dtype == np.float32
+    np.testing.assert_allclose(inputs[0], reference_letterbox(hd), atol=1e-6)
+
+    # Mixed resolutions share a square input
+    inputs, geometries = preprocessor.prepare([hd, vga])
+    assert inputs.shape == (2, 3, 640, 640)
+    np.testing.assert_allclose(inputs[0], reference_letterbox(hd, rect=False), atol=1e-6)
+    np.testing.assert_allclose(inputs[1], reference_letterbox(vga, rect=False), atol=1e-6)
+
+    # A slot whose resolution changed gets its padding rewritten
+    inputs, _ = preprocessor.prepare([vga, hd])
+    np.testing.assert_allclose(inputs[0], reference_letterbox(vga, rect=False), atol=1e-6)
+    np.testing.assert_allclose(inputs[1], reference_letterbox(hd, rect=False), atol=1e-6)
+
+
+def test_buffers_are_reused_across_frames():
+    preprocessor = LetterboxPreprocessor()
+    first, _ = preprocessor.prepare([random_frame(720, 1280)])
+    allocations = preprocessor.allocations
+
+    for seed in range(5):
+        frame = random_frame(720, 1280, seed)
+        inputs, _ = preprocessor.prepare([frame])
+        assert np.shares_memory(inputs, first)
+        np.testing.assert_allclose(inputs[0], reference_letterbox(frame), atol=1e-6)
+
+    stats = preprocessor.get_statistics()
+    assert preprocessor.allocations == allocations
+    assert stats['frames'] == 6 and stats['resolutions'] == 1
+
+
+def test_boxes_are_mapped_back_to_the_frame():
+    geometry = LetterboxPreprocessor().geometry(720, 1280)
+    detections = [
+        {'class': 'person', 'bbox': [100.0, 62.0, 200.0, 212.0]},
+        {'class': 'helmet', 'bbox': [-4.0, 0.0, 640.0, 384.0]},
+    ]
+    geometry.unmap_detections(detections)
+    assert detections[0]['bbox'] == [200.0, 100.0, 400.0, 400.0]
+    # Boxes reaching into the padding are clipped to the frame
+    assert detections[1]['bbox'] == [0.0, 0.0, 1280.0, 720.0]
+
+
+def test_empty_batch_is_rejected():
+    with pytest.raises(ValueError, match="at least one frame"):
+        LetterboxPreprocessor().prepare([])
@@ -0,0 +1,90 @@
+"""
+Tests for the incremental pulse KPI state and its SQL reconciliation
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+from api.kpi import PulseKPIs
+from api.taxonomy import taxonomy
+
+
+def _connect():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE violations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            violation_type TEXT,
+            resolved BOOLEAN DEFAULT 0,
+            status TEXT DEFAULT 'unresolved'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE alert_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            violation_id INTEGER,
+            action TEXT,
+            created_at DATETIME
+        )
+        """
+    )
+    taxonomy.ensure_table(conn)
+    return conn
+
+
+def _fmt(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def test_incremental_updates_match_reconciliation():
+    now = datetime.now().replace(microsecond=0)
+    conn = _connect()
+    live = PulseKPIs()
+    live.reconcile(conn)
+
+    writes = [
+        (now - timedelta(minutes=30), "no_helmet"),
+        (now - timedelta(minutes=20), "no_vest"),
+        (now - timedelta(days=2), "no_helmet"),
+        (now - timedelta(days=20), "no_gloves"),
+    ]
+    for timestamp, violation_type in writes:
+        conn.execute(
+            "INSERT INTO violations (timestamp, violation_type) VALUES (?, ?)",
+            (_fmt(timestamp), violation_type),
+        )
+        live.record_violation(_fmt(timestamp), violation_type)
+
+    # Resolve the first violation twice and the third once; only first resolves count
+    for violation_id, delay in ((1, 120), (1, 600), (3, 60)):
+        timestamp, violation_type = writes[violation_id - 1]
+        was_unresolved = conn.execute(
+            "SELECT resolved = 0 FROM violations WHERE id = ?", (violation_id,)
+        ).fetchone()[0]
+        first = not conn.execute(
+            "SELECT COUNT(*) FROM alert_actions WHERE violation_id = ?", (violation_id,)
+        ).fetchone()[0]
+        resolved_at = _fmt(timestamp + timedelta(seconds=delay))
+        conn.execute("UPDATE violations SET resolved = 1, status = 'resolved' WHERE id = ?", (violation_id,))
+        conn.execute(
+            "INSERT INTO alert_actions (violation_id, action, created_at) VALUES (?, 'resolve', ?)",
+            (violation_id, resolved_at),
+        )
+        live.record_resolution(_fmt(timestamp), violation_type, resolved_at, first, bool(was_unresolved))
+
+    reconciled = PulseKPIs()
+    reconciled.reconcile(conn)
+
+    for days in (1, 7, 30):
+        assert live.snapshot(days, now) == reconciled.snapshot(days, now)
+
+    week = live.snapshot(7, now)
+    assert week["avg_per_day"] == round(3 / 7, 2)
+    assert week["avg_response_time_sec"] == 90
+    assert week["unresolved_high"] == 0
+    assert week["lti_free_days"] == 0
+    assert live.snapshot(30, now)["avg_per_day"] == round(4 / 30, 2)
@@ -0,0 +1,90 @@
+"""
+Tests for the report job runner
+"""
+
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+
+from api.jobs import ReportJobRunner
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.status in {"queued", "running"}:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+def test_concurrency_limit_dedup_and_result_reuse():
+    release = threading.Event()
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0, "calls": 0}
+
+    def report(report_type, start, end, progress):
+        with lock:
+            running["now"] += 1
+            running["calls"] += 1
+            running["max"] = max(running["max"], running["now"])
+        progress(50, "rendering")
+        release.wait(5)
+        with lock:
+            running["now"] -= 1
+        return {"file_path": f"{report_type}_{start}_{end}.html"}
+
+    runner = ReportJobRunner(report, max_workers=2, result_ttl=60)
+    past = date(2024, 1, 7)
+    jobs = [runner.submit("custom", past - timedelta(days=i), past)[0] for i in range(4)]
+    duplicate, reused = runner.submit("custom", past, past)
+    assert reused and duplicate is jobs[0]
+
+    time.sleep(0.1)
+    assert running["now"] == 2
+    assert [job.status for job in jobs].count("queued") == 2
+    assert jobs[0].progress == 50 and jobs[0].stage == "rendering"
+
+    release.set()
+    for job in jobs:
+        _wait(job)
+    assert running["max"] == 2
+    assert all(job.status == "success" and job.progress == 100 for job in jobs)
+
+    # A finished report for a closed period is served again without regenerating
+    again, reused = runner.submit("custom", past, past)
+    assert reused and again is jobs[0] and running["calls"] == 4
+    assert runner.get(jobs[1].id).result == {"file_path": f"custom_{past - timedelta(days=1)}_{past}.html"}
+    runner.shutdown()
+
+
+def test_failed_job_is_retried_and_event_loop_stays_responsive():
+    attempts = []
+
+    def report(report_type, start, end, progress):
+        attempts.append(1)
+        time.sleep(0.2)
+        if len(attempts) == 1:
+            raise RuntimeError("disk full")
+        return {"file_path": "weekly.html"}
+
+    runner = ReportJobRunner(report, max_workers=1, result_ttl=60)
+    today = date.today()
+
+    async def scenario():
+        job, _ = runner.submit("weekly", today - timedelta(days=6), today)
+        ticks = 0
+        while job.status in {"queued", "running"}:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return job, ticks
+
+    job, ticks = asyncio.run(scenario())
+    assert job.status == "failed" and job.error == "disk full"
+    assert ticks >= 10
+
+    retry, reused = runner.submit("weekly", today - timedelta(days=6), today)
+    assert not reused and retry is not job
+    _wait(retry)
+    assert retry.status == "success"
+    assert runner.get_statistics()["failed"] == 1
+    runner.shutdown()
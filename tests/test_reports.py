@@ -0,0 +1,143 @@
+"""
+Tests for data-backed report aggregation and template rendering
+"""
+
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, 'src')
+
+from database import Database
+from api.reports import ReportGenerator, report_period
+
+
+def _seed(db_path, end):
+    db = Database(db_path)
+    previous = end - timedelta(days=8)
+    rows = [
+        # (day, camera, persons, compliant)
+        (end, "Gudang <B>", 40, 30),
+        (end - timedelta(days=3), "Workshop A", 60, 60),
+        (previous, "Workshop A", 50, 25),
+    ]
+    for day, camera, persons, compliant in rows:
+        db.conn.execute(
+            "INSERT INTO detections (timestamp, camera_source, total_persons, compliant_persons, violations) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (f"{day} 08:00:00", camera, persons, compliant, persons - compliant),
+        )
+    violations = (
+        [(end, "Gudang <B>", "no_helmet", 1)] * 6
+        + [(end, "Gudang <B>", "no_vest", 2)] * 3
+        + [(end, "Workshop A", None, None)]
+        + [(previous, "Workshop A", "no_helmet", 1)] * 12
+    )
+    for day, camera, name, type_id in violations:
+        db.conn.execute(
+            "INSERT INTO violations (timestamp, camera_source, violation_type, violation_type_id) "
+            "VALUES (?, ?, ?, ?)",
+            (f"{day} 09:30:00", camera, name, type_id),
+        )
+    # Outside both periods
+    db.conn.execute(
+        "INSERT INTO violations (timestamp, camera_source, violation_type, violation_type_id) "
+        "VALUES (?, 'Workshop A', 'no_helmet', 1)",
+        (f"{end + timedelta(days=1)} 09:30:00",),
+    )
+    db.conn.commit()
+    db.close()
+
+
+def test_weekly_report_aggregates_period_and_trend(tmp_path):
+    end = date(2024, 6, 16)
+    db_path = str(tmp_path / "detections.db")
+    _seed(db_path, end)
+
+    generator = ReportGenerator(db_path=db_path)
+    data = generator._get_report_data(end - timedelta(days=6), end, previous_label="minggu lalu")
+
+    assert data['total_detections'] == 100
+    assert data['compliant_workers'] == 90
+    assert data['compliance_rate'] == 90.0
+    assert data['total_violations'] == 10
+    assert [(v['type'], v['count'], v['severity']) for v in data['top_violations']] == [
+        ("Tanpa Helm", 6, "high"),
+        ("Tanpa Rompi", 3, "medium"),
+        ("unknown_violation", 1, "low"),
+    ]
+    assert data['top_violations'][0]['percentage'] == 60.0
+    assert data['trend']['compliance_change'] == 40.0
+    assert data['trend']['violations_change_pct'] == round((10 - 12) / 12 * 100, 1)
+    assert "meningkat 40.0% dibanding minggu lalu" in data['trend_summary']
+    assert "Pelanggaran Tanpa Helm menurun 50.0%" in data['trend_summary']
+    assert data['recommendations'][0] == "Tingkatkan pengawasan di area Gudang <B> (9 pelanggaran)"
+
+    html = generator.generate_weekly_report(end)
+    assert "Laporan Keselamatan Mingguan" in html
+    assert "10 Jun - 16 Jun 2024" in html
+    assert "Gudang &lt;B&gt;" in html and "Gudang <B>" not in html
+    assert '<span class="badge badge-high">HIGH</span>' in html
+    assert "{" not in html.split("<style>")[0]
+
+
+def test_missing_database_gives_empty_report(tmp_path):
+    generator = ReportGenerator(db_path=str(tmp_path / "missing.db"))
+    html = generator.generate_weekly_report(date(2024, 6, 16))
+    assert "Belum ada data minggu lalu untuk perbandingan." in html
+
+
+def test_monthly_report_reuses_cached_days_and_recomputes_changed_ones(tmp_path):
+    end = date(2024, 6, 16)
+    db_path = str(tmp_path / "detections.db")
+    _seed(db_path, end)
+    generator = ReportGenerator(db_path=db_path)
+    cache = generator.daily_cache
+
+    generator._get_report_data(end - timedelta(days=6), end)
+    assert (cache.reused_days, cache.computed_days) == (0, 14)
+
+    start, finish, previous_start, previous_end = report_period("monthly", end, today=end)
+    data = ReportGenerator(db_path=db_path)._get_report_data(
+        start, finish, "bulan lalu", previous_start, previous_end
+    )
+    # June 1-16 vs May 1-16: June 3-16 were already aggregated by the weekly report
+    assert cache.reused_days == 14
+    assert cache.computed_days == 14 + 16 + 2
+    assert data['total_violations'] == 22
+
+    db = Database(db_path)
+    db.conn.execute(
+        "INSERT INTO violations (timestamp, camera_source, violation_type, violation_type_id) "
+        "VALUES (?, 'Workshop A', 'no_vest', 2)",
+        (f"{end - timedelta(days=2)} 10:00:00",),
+    )
+    db.conn.commit()
+    db.close()
+
+    computed = cache.computed_days
+    data = generator._get_report_data(end - timedelta(days=6), end)
+    assert cache.computed_days == computed + 1
+    assert data['total_violations'] == 11
+
+
+def test_report_periods():
+    today = date(2024, 3, 20)
+    assert report_period("weekly", today=today)[:2] == (date(2024, 3, 14), today)
+    # Month to date, compared with the same days of a shorter month
+    assert report_period("monthly", today=today) == (
+        date(2024, 3, 1), today, date(2024, 2, 1), date(2024, 2, 20)
+    )
+    assert report_period("monthly", date(2024, 2, 10), today=today) == (
+        date(2024, 2, 1), date(2024, 2, 29), date(2024, 1, 1), date(2024, 1, 29)
+    )
+    assert report_period("custom", date(2024, 1, 1), date(2024, 1, 10), today=today)[2:] == (
+        date(2023, 12, 22), date(2023, 12, 31)
+    )
+    with pytest.raises(ValueError):
+        report_period("custom", date(2024, 1, 10), date(2024, 1, 1))
+    with pytest.raises(ValueError):
+        report_period("custom", date(2023, 1, 1), date(2024, 3, 1))
+    with pytest.raises(ValueError):
+        report_period("yearly")
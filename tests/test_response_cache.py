@@ -0,0 +1,95 @@
+"""
+Tests for the dashboard response cache
+"""
+
+import asyncio
+
+from api.cache import ResponseCache
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute(("stats",), compute, 10) for _ in range(8)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert len({entry.etag for entry in results}) == 1
+    assert results[0].body == b'{"value":42}'
+    assert results[0].matches(results[0].etag)
+
+
+def test_write_invalidates_only_dependent_entries():
+    cache = ResponseCache()
+    counter = {"n": 0}
+
+    async def compute():
+        counter["n"] += 1
+        return counter["n"]
+
+    async def scenario():
+        await cache.get_or_compute(("pulse", 7), compute, 60, ("violations", "alert_actions"))
+        teams = await cache.get_or_compute(("teams",), compute, 60, ("teams",))
+
+        cache.invalidate("alert_actions")
+        pulse = await cache.get_or_compute(("pulse", 7), compute, 60, ("violations", "alert_actions"))
+        assert pulse.body == b"3"
+        assert await cache.get_or_compute(("teams",), compute, 60, ("teams",)) is teams
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_hands_computation_to_a_waiter():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": len(calls)}
+
+    async def scenario():
+        leader = asyncio.ensure_future(cache.get_or_compute(("stats",), compute, 10))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(cache.get_or_compute(("stats",), compute, 10)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader, results
+
+    leader, results = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert len(calls) == 2
+    assert {entry.body for entry in results} == {b'{"value":2}'}
+
+
+def test_waiters_after_an_invalidation_do_not_share_a_stale_computation():
+    cache = ResponseCache()
+    state = {"value": "old"}
+
+    async def compute():
+        value = state["value"]
+        await asyncio.sleep(0.05)
+        return value
+
+    async def scenario():
+        stale = asyncio.ensure_future(cache.get_or_compute(("stats",), compute, 10, ("violations",)))
+        await asyncio.sleep(0.01)
+        state["value"] = "new"
+        cache.invalidate("violations")
+        fresh = await cache.get_or_compute(("stats",), compute, 10, ("violations",))
+        await stale
+        cached = await cache.get_or_compute(("stats",), compute, 10, ("violations",))
+        return (await stale), fresh, cached
+
+    stale, fresh, cached = asyncio.run(scenario())
+    assert stale.body == b'"old"'
+    assert fresh.body == b'"new"'
+    assert cached is fresh
@@ -0,0 +1,56 @@
+"""
+Test stream hub - shared fan-out and per-viewer frame dropping
+"""
+
+import asyncio
+
+from api.streaming import FRAME_HEADER, CameraStream, StreamHub
+
+
+def test_frames_are_shared_and_slow_viewers_only_get_latest():
+    async def scenario():
+        stream = CameraStream("Camera_1")
+        fast = stream.subscribe()
+        slow = stream.subscribe()
+
+        stream.publish_frame(b"jpeg-1")
+        first_fast = await fast.next_frame()
+
+        stream.publish_frame(b"jpeg-2")
+        stream.publish_frame(b"jpeg-3")
+        latest_slow = await slow.next_frame()
+
+        return first_fast, latest_slow, slow.dropped, fast.dropped
+
+    first_fast, latest_slow, slow_dropped, fast_dropped = asyncio.run(scenario())
+
+    assert first_fast[0] == b"jpeg-1"
+    assert latest_slow[0] == b"jpeg-3"
+    assert latest_slow[1].endswith(b"jpeg-3\r\n")
+    assert slow_dropped == 2
+    assert fast_dropped == 1
+
+
+def test_viewers_cannot_register_cameras_only_publishers_can():
+    async def scenario():
+        hub = StreamHub()
+        await hub.start_ingest("127.0.0.1", 0)
+        port = hub._server.sockets[0].getsockname()[1]
+        unknown = hub.find("Camera_X")
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"camera_id": "Camera_1"}\n' + FRAME_HEADER.pack(6) + b"jpeg-1")
+        await writer.drain()
+        for _ in range(100):
+            stream = hub.find("Camera_1")
+            if stream is not None and stream.latest is not None:
+                break
+            await asyncio.sleep(0.01)
+        writer.close()
+        await hub.stop()
+        return unknown, stream, sorted(hub.cameras)
+
+    unknown, stream, cameras = asyncio.run(scenario())
+    assert unknown is None
+    assert stream.latest == b"jpeg-1"
+    assert cameras == ["Camera_1"]
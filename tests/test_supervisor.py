@@ -0,0 +1,117 @@
+"""
+Test ProcessSupervisor - per-worker isolation, crash/stall restarts with backoff
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, 'src')
+
+from supervisor import ProcessSupervisor, WorkerSpec, assign_cores
+
+
+def steady_worker(heartbeat=None, stop_event=None):
+    """Beats until asked to stop"""
+    while not stop_event.is_set():
+        heartbeat.beat()
+        time.sleep(0.02)
+    return 0
+
+
+def flaky_worker(runs_file, fail_runs, heartbeat=None, stop_event=None):
+    """Crashes on its first fail_runs starts (like a bad RTSP stream), then runs"""
+    runs = int(Path(runs_file).read_text()) if Path(runs_file).exists() else 0
+    Path(runs_file).write_text(str(runs + 1))
+    heartbeat.beat()
+    if runs < fail_runs:
+        raise RuntimeError("Failed to read frame")
+    while not stop_event.is_set():
+        heartbeat.beat()
+        time.sleep(0.02)
+    return 0
+
+
+def hanging_worker(runs_file, heartbeat=None, stop_event=None):
+    """Beats once, then hangs (e.g. a blocked cap.read()) on its first run"""
+    runs = int(Path(runs_file).read_text()) if Path(runs_file).exists() else 0
+    Path(runs_file).write_text(str(runs + 1))
+    heartbeat.beat()
+    if runs == 0:
+        time.sleep(60)
+    while not stop_event.is_set():
+        heartbeat.beat()
+        time.sleep(0.02)
+    return 0
+
+
+def finite_worker(heartbeat=None, stop_event=None):
+    """A video file that ends"""
+    heartbeat.beat()
+    return 0
+
+
+def _wait_for(condition, supervisor, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, supervisor.get_statistics()
+        supervisor.poll()
+        time.sleep(0.05)
+
+
+def test_crashing_camera_restarts_with_backoff_without_affecting_others(tmp_path):
+    supervisor = ProcessSupervisor(backoff_initial=0.2, backoff_max=0.4, pin_cores=False)
+    supervisor.add(WorkerSpec("steady", steady_worker))
+    supervisor.add(WorkerSpec("flaky", flaky_worker, args=(str(tmp_path / "runs"), 3)))
+    supervisor.start()
+    try:
+        steady_pid = supervisor.workers["steady"].process.pid
+        _wait_for(lambda: supervisor.workers["flaky"].state == "running"
+                  and supervisor.workers["flaky"].restarts == 3, supervisor)
+        flaky = supervisor.workers["flaky"]
+        assert flaky.crashes == 3 and flaky.last_exit == 1
+        # 0.2, 0.4, then capped at 0.4
+        assert flaky.backoff == 0.4
+
+        steady = supervisor.workers["steady"]
+        assert steady.process.pid == steady_pid and steady.restarts == 0
+        before = steady.heartbeat.last
+        time.sleep(0.3)
+        assert steady.heartbeat.last > before
+    finally:
+        supervisor.stop()
+
+    stats = supervisor.get_statistics()["workers"]
+    assert stats["flaky"]["restarts"] == 3 and stats["steady"]["state"] == "stopped"
+    assert not any(w.process.is_alive() for w in supervisor.workers.values())
+
+
+def test_stalled_worker_is_terminated_and_restarted(tmp_path):
+    supervisor = ProcessSupervisor(backoff_initial=0.1, pin_cores=False)
+    supervisor.add(WorkerSpec("hanging", hanging_worker, args=(str(tmp_path / "runs"),), stall_timeout=0.5))
+    supervisor.start()
+    try:
+        first_pid = supervisor.workers["hanging"].process.pid
+        _wait_for(lambda: supervisor.workers["hanging"].restarts == 1
+                  and supervisor.workers["hanging"].state == "running", supervisor)
+        worker = supervisor.workers["hanging"]
+        assert worker.stalls == 1 and worker.last_failure == "stalled"
+        assert worker.process.pid != first_pid
+    finally:
+        supervisor.stop()
+
+
+def test_clean_exit_finishes_and_restart_can_be_disabled(tmp_path):
+    supervisor = ProcessSupervisor(auto_restart=False, check_interval=0.05, pin_cores=False)
+    supervisor.add(WorkerSpec("video", finite_worker))
+    supervisor.add(WorkerSpec("broken", flaky_worker, args=(str(tmp_path / "runs"), 5)))
+    supervisor.run(duration=20)
+    states = {name: w["state"] for name, w in supervisor.get_statistics()["workers"].items()}
+    assert states == {"video": "finished", "broken": "stopped"}
+    assert (tmp_path / "runs").read_text() == "1"
+
+
+def test_assign_cores():
+    assert assign_cores(2, range(8)) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert assign_cores(3, range(4)) == [[0, 1], [2], [3]]
+    assert assign_cores(5, [0, 1]) == [[0], [1], [0], [1], [0]]
@@ -0,0 +1,95 @@
+"""
+Tests for the violation type dimension table and integer codes
+"""
+
+import sys
+
+sys.path.insert(0, 'src')
+
+from database import Database
+from api.taxonomy import SEVERITY_HIGH, ViolationTaxonomy
+
+
+def test_codes_are_assigned_by_detector_trigger_and_backfill(tmp_path):
+    db = Database(str(tmp_path / "detections.db"))
+    conn = db.conn
+    # Written before the API ever added its trigger: backfilled later
+    conn.execute("INSERT INTO violations (camera_source, violation_type) VALUES ('cam1', 'No Vest')")
+
+    known = db.log_violation("cam1", "no_helmet", 1, 0.9, [0, 0, 1, 1])
+    custom = db.log_violation("cam1", "Restricted Area", 2, 0.8, [0, 0, 1, 1])
+
+    taxonomy = ViolationTaxonomy()
+    taxonomy.ensure_table(conn)
+    # Other writers that only set the name get a code from the trigger
+    conn.execute("INSERT INTO violations (camera_source, violation_type) VALUES ('cam2', 'restricted_area')")
+    conn.commit()
+    taxonomy.load(conn)
+
+    codes = dict(conn.execute("SELECT id, violation_type_id FROM violations").fetchall())
+    assert codes[known] == 1
+    assert codes[1] == taxonomy.lookup("no_vest").id
+    assert codes[custom] == codes[4] == taxonomy.lookup("restricted_area").id
+
+    assert taxonomy.severity_name("No Helmet") == "high"
+    assert taxonomy.severity_name("no_vest") == "medium"
+    assert taxonomy.severity_name("Restricted Area") == "low"
+    assert taxonomy.severity_name("something new") == "low"
+    # Free-form labels still match by keyword
+    assert taxonomy.severity_name("Tidak Pakai Helm") == "high"
+    assert taxonomy.severity_name("Rompi hilang") == "medium"
+    assert taxonomy.ids_with_severity(SEVERITY_HIGH) == [1]
+
+    plan = " ".join(
+        row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM violations WHERE violation_type_id IN "
+            "(SELECT id FROM violation_types WHERE severity >= 3)"
+        )
+    )
+    assert "idx_violations_type" in plan
+    db.close()
+
+
+def test_free_text_labels_resolve_alike_in_sql_and_lookup(tmp_path):
+    db = Database(str(tmp_path / "detections.db"))
+    conn = db.conn
+    # Backfill path
+    conn.execute("INSERT INTO violations (camera_source, violation_type) VALUES ('cam1', 'Tidak Pakai Helm')")
+    taxonomy = ViolationTaxonomy()
+    taxonomy.ensure_table(conn)
+    # Trigger path and detector path
+    conn.execute("INSERT INTO violations (camera_source, violation_type) VALUES ('cam2', 'Rompi Hilang')")
+    conn.execute("INSERT INTO violations (camera_source, violation_type) VALUES ('cam2', 'Area Terlarang')")
+    detector = db.log_violation("cam3", "Helm Tidak Dipakai", 1, 0.9, [0, 0, 1, 1])
+    conn.commit()
+    taxonomy.load(conn)
+
+    rows = conn.execute(
+        "SELECT v.id, v.violation_type, v.violation_type_id, t.severity "
+        "FROM violations v JOIN violation_types t ON t.id = v.violation_type_id ORDER BY v.id"
+    ).fetchall()
+    assert len(rows) == 4
+    for _, label, type_id, severity in rows:
+        found = taxonomy.lookup(label)
+        assert (type_id, severity) == (found.id, found.severity)
+    assert [row[2] for row in rows][:2] == [1, 2]
+    assert rows[-1][0] == detector and rows[-1][2] == 1
+    assert taxonomy.lookup("Area Terlarang").code == "area_terlarang"
+
+    # Severity filters in SQL see the free-text helmet rows
+    high = conn.execute(
+        "SELECT COUNT(*) FROM violations WHERE violation_type_id IN "
+        "(SELECT id FROM violation_types WHERE severity >= 3)"
+    ).fetchone()[0]
+    assert high == 2
+    db.close()
+
+
+def test_violation_colors_by_class_name_code_and_keyword():
+    from utils import CLASS_COLORS, VIOLATION_COLORS, get_violation_color
+
+    assert get_violation_color('helmet') == CLASS_COLORS['helmet']
+    assert get_violation_color('person') == CLASS_COLORS['person']
+    assert get_violation_color('no_helmet') == get_violation_color(1) == VIOLATION_COLORS[1]
+    assert get_violation_color('Tidak Pakai Helm') == VIOLATION_COLORS[1]
+    assert get_violation_color('unknown') == (128, 128, 128)
@@ -0,0 +1,63 @@
+"""
+Test AsyncVideoWriter - backpressure and segment rotation
+"""
+
+import sys
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+sys.path.insert(0, 'src')
+
+from video_writer import AsyncVideoWriter
+
+
+def _frame():
+    return np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def test_full_queue_drops_frames_instead_of_blocking(tmp_path):
+    writer = AsyncVideoWriter(str(tmp_path / "out.avi"), 10, (64, 48),
+                              codec='MJPG', queue_size=2)
+    # Not started: nothing drains the queue
+    assert writer.write(_frame())
+    assert writer.write(_frame())
+    assert not writer.write(_frame())
+    assert writer.frames_dropped == 1
+
+    writer.start()
+    writer.release(timeout=5)
+    assert writer.frames_written == 2
+
+
+def test_segments_rotate_by_time(tmp_path):
+    writer = AsyncVideoWriter(str(tmp_path / "out.avi"), 10, (64, 48),
+                              codec='MJPG', segment_seconds=0.05).start()
+    for _ in range(3):
+        writer.write(_frame())
+        time.sleep(0.1)
+    writer.release(timeout=5)
+
+    stats = writer.get_statistics()
+    assert stats['frames_written'] == 3
+    assert len(stats['segments']) == 3
+    assert all(path.endswith('.avi') for path in stats['segments'])
+
+
+def test_release_does_not_hang_when_encoder_died(tmp_path):
+    writer = AsyncVideoWriter(str(tmp_path / "out.avi"), 10, (64, 48),
+                              codec='MJPG', queue_size=2)
+    writer.start()
+    # Encoder gone with a full queue, as after a crash in _run
+    writer._queue.put(None)
+    writer._thread.join(5)
+    writer.write(_frame())
+    writer.write(_frame())
+
+    started = time.monotonic()
+    writer.release(timeout=0.2)
+    assert time.monotonic() - started < 2
+    assert writer.frames_dropped == 1
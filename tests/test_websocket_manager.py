@@ -0,0 +1,153 @@
+"""
+Tests for per-client WebSocket send queues in the connection manager
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from api.websocket import AlertDedupCache, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+
+def test_slow_client_does_not_block_and_stats_are_coalesced():
+    async def scenario():
+        manager = ConnectionManager()
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.2)
+        await manager.connect(fast)
+        await manager.connect(slow)
+        await asyncio.sleep(0)
+
+        for i in range(50):
+            await manager.send_stats_update({"n": i})
+            await asyncio.sleep(0.002)
+
+        await asyncio.sleep(0.5)
+        for ws in (fast, slow):
+            manager.disconnect(ws)
+        return fast.sent, slow.sent
+
+    fast_sent, slow_sent = asyncio.run(scenario())
+    assert len(fast_sent) == 50
+    assert fast_sent[-1]["data"]["n"] == 49
+    # The slow client skips intermediate stats but still ends on the newest
+    assert len(slow_sent) <= 3
+    assert slow_sent[-1]["data"]["n"] == 49
+
+
+def test_stats_are_coalesced_per_camera():
+    async def scenario():
+        manager = ConnectionManager()
+        slow = FakeWebSocket(delay=0.2)
+        await manager.connect(slow)
+        await asyncio.sleep(0)
+
+        for i in range(10):
+            await manager.send_stats_update({"camera_id": "Camera_A", "n": i})
+            await manager.send_stats_update({"camera_id": "Camera_B", "n": i})
+            await asyncio.sleep(0.002)
+
+        await asyncio.sleep(0.7)
+        manager.disconnect(slow)
+        return slow.sent
+
+    slow_sent = asyncio.run(scenario())
+    # Camera_B's stats never replace the queued stats of Camera_A
+    last = {m["data"]["camera_id"]: m["data"]["n"] for m in slow_sent}
+    assert last == {"Camera_A": 9, "Camera_B": 9}
+    assert len(slow_sent) < 20
+
+
+def test_subscriptions_route_by_camera_and_severity():
+    async def scenario():
+        manager = ConnectionManager()
+        everyone, area_a, critical = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        for ws in (everyone, area_a, critical):
+            await manager.connect(ws)
+        manager.subscribe(area_a, {"cameras": ["Camera_A"]})
+        manager.subscribe(critical, {"severities": ["high"], "types": ["violation_alert"]})
+
+        await manager.send_violation_alert(
+            {"worker": "1", "violation": "no_vest", "location": "Camera_B", "camera_id": "Camera_B"})
+        await manager.send_violation_alert(
+            {"worker": "2", "violation": "no_helmet", "location": "Camera_A", "camera_id": "Camera_A"})
+        await manager.send_camera_status("Camera_B", "offline")
+        await asyncio.sleep(0.05)
+
+        for ws in (everyone, area_a, critical):
+            manager.disconnect(ws)
+        return everyone.sent, area_a.sent, critical.sent
+
+    everyone_sent, area_sent, critical_sent = asyncio.run(scenario())
+    assert [m["type"] for m in everyone_sent] == ["violation_alert", "violation_alert", "camera_status"]
+    assert [m["data"]["camera_id"] for m in area_sent] == ["Camera_A"]
+    assert [m["severity"] for m in critical_sent] == ["high"]
+
+
+def test_alert_cache_expires_and_stays_bounded():
+    cache = AlertDedupCache(max_size=3)
+    assert cache.check_and_add("a", 0.05)
+    assert not cache.check_and_add("a", 0.05)
+    time.sleep(0.06)
+    # Repeat alerts are allowed again once the cooldown has passed
+    assert cache.check_and_add("a", 60)
+
+    for alert_id in ("b", "c", "d", "e"):
+        assert cache.check_and_add(alert_id, 60)
+    assert len(cache) == 3
+
+    stats = cache.get_statistics()
+    assert stats["hits"] == 1
+    assert stats["expired"] == 1
+    assert stats["evicted"] == 2
+
+
+def test_delta_stats_send_snapshot_then_changed_fields(monkeypatch):
+    monkeypatch.setattr("api.websocket.STATS_TICK_SECONDS", 0.01)
+
+    async def scenario():
+        manager = ConnectionManager()
+        full, delta = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(full)
+        await manager.connect(delta)
+
+        await manager.send_stats_update({"camera_id": "Camera_A", "fps": 10, "violations": 1})
+        await asyncio.sleep(0.05)
+        manager.subscribe(delta, {"stats_mode": "delta"})
+
+        # Batched within one tick: only the last update is diffed
+        await manager.send_stats_update({"camera_id": "Camera_A", "fps": 11, "violations": 1})
+        await manager.send_stats_update({"camera_id": "Camera_A", "fps": 12, "violations": 1})
+        await asyncio.sleep(0.05)
+        manager.resync(delta)
+        await asyncio.sleep(0.01)
+
+        for ws in (full, delta):
+            manager.disconnect(ws)
+        return full.sent, delta.sent
+
+    full_sent, delta_sent = asyncio.run(scenario())
+    assert {m["type"] for m in full_sent} == {"stats_update"}
+    assert full_sent[-1]["data"]["fps"] == 12
+    # The first update reached the delta client as a normal stats_update before it opted in
+    assert [m["type"] for m in delta_sent] == ["stats_update", "stats_snapshot", "stats_delta", "stats_snapshot"]
+    snapshot, change, resync = delta_sent[1:]
+    assert snapshot["seq"] == 1 and snapshot["data"]["fps"] == 10
+    assert change["seq"] == 2 and change["changes"] == {"fps": 12} and change["removed"] == []
+    assert resync["seq"] == 2 and resync["data"]["fps"] == 12